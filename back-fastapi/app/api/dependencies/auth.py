@@ -1,17 +1,19 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
 
-from app.core.security import SECRET_KEY, ALGORITHM
+from app.core.security import decode_access_token
 from app.api.schemas.token import TokenPayload
 from app.api.schemas.user import User
-from app.db.session import get_db
+from app.db.session import SessionLocal, engine, get_db, get_read_db
 from app.db.models.user import User as UserModel
 from app.core.config import settings
+from app.services.token_revocation import revocation_index
+from app.services.user_cache import user_cache
 
 # Configuración del esquema OAuth2 para autenticación
 oauth2_scheme = OAuth2PasswordBearer(
@@ -19,12 +21,97 @@ oauth2_scheme = OAuth2PasswordBearer(
 )
 
 
+def _decode_token(token: str) -> TokenPayload:
+    """
+    Decodifica y valida el token JWT.
+    
+    Args:
+        token: Token JWT.
+        
+    Returns:
+        Payload del token.
+        
+    Raises:
+        HTTPException: Si el token es inválido o su sesión está revocada.
+    """
+    try:
+        payload = TokenPayload(**decode_access_token(token))
+    except (JWTError, ValidationError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No se pudo validar las credenciales",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # Sesión cerrada (logout): comprobación en memoria, sin consultar la base de datos
+    if payload.sid and revocation_index.is_revoked(payload.sid):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="La sesión ha sido cerrada",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+
+def _user_not_found() -> HTTPException:
+    return HTTPException(status_code=404, detail="Usuario no encontrado")
+
+
+def _cache_user(sub: str, user: Optional[UserModel]) -> Optional[User]:
+    """
+    Guarda en la caché de usuarios una copia del usuario cargado de la base de datos.
+    
+    Args:
+        sub: Identificador del usuario en el token.
+        user: Usuario cargado, o None si no existe.
+        
+    Returns:
+        Copia del usuario (esquema sin contraseña), o None si no existe.
+    """
+    if user is None:
+        return None
+    cached = User.model_validate(user)
+    user_cache.set(sub, cached)
+    return cached
+
+
+async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> UUID:
+    """
+    Dependency que solo valida el token JWT y devuelve el ID del usuario.
+    
+    No consulta la base de datos: es para endpoints que solo necesitan el ID
+    (p. ej. para filtrar por propietario). No comprueba que el usuario siga existiendo.
+    
+    Args:
+        token: Token JWT.
+        
+    Returns:
+        ID del usuario actual.
+        
+    Raises:
+        HTTPException: Si el token es inválido.
+    """
+    token_data = _decode_token(token)
+    try:
+        return UUID(token_data.sub)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No se pudo validar las credenciales",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
 async def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
 ) -> User:
     """
     Dependency para obtener el usuario actual a partir del token JWT.
     
+    El usuario se lee de la caché de usuarios si está disponible; solo se
+    consulta la base de datos en un fallo de caché. El usuario devuelto es una
+    copia de solo lectura: para modificarlo hay que cargarlo del repositorio.
+    
     Args:
         db: Sesión de base de datos.
         token: Token JWT.
@@ -35,20 +122,51 @@ async def get_current_user(
     Raises:
         HTTPException: Si el token es inválido o el usuario no existe.
     """
-    try:
-        payload = jwt.decode(
-            token, SECRET_KEY, algorithms=[ALGORITHM]
+    token_data = _decode_token(token)
+    user = user_cache.get(token_data.sub)
+    if user is None:
+        user = _cache_user(
+            token_data.sub,
+            db.query(UserModel).filter(UserModel.id == token_data.sub).first(),
         )
-        token_data = TokenPayload(**payload)
-    except (JWTError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="No se pudo validar las credenciales",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    user = db.query(UserModel).filter(UserModel.id == token_data.sub).first()
     if not user:
-        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+        raise _user_not_found()
+    return user
+
+
+async def get_current_user_read(
+    db: Session = Depends(get_read_db), token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    Variante de `get_current_user` para endpoints de solo lectura.
+    
+    En un fallo de la caché de usuarios lo busca en una réplica de lectura. Si
+    la réplica todavía no tiene el usuario (p. ej. se acaba de registrar) se
+    consulta el primario.
+    El usuario devuelto no debe modificarse.
+    
+    Args:
+        db: Sesión de lectura.
+        token: Token JWT.
+        
+    Returns:
+        Usuario actual.
+        
+    Raises:
+        HTTPException: Si el token es inválido o el usuario no existe.
+    """
+    token_data = _decode_token(token)
+    user = user_cache.get(token_data.sub)
+    if user is not None:
+        return user
+    
+    db_user = db.query(UserModel).filter(UserModel.id == token_data.sub).first()
+    if not db_user and db.get_bind() is not engine:
+        with SessionLocal() as primary:
+            db_user = primary.query(UserModel).filter(UserModel.id == token_data.sub).first()
+    user = _cache_user(token_data.sub, db_user)
+    if not user:
+        raise _user_not_found()
     return user
 
 
@@ -68,4 +186,42 @@ def get_current_active_user(
         HTTPException: Si el usuario no está activo.
     """
     # Aquí se puede agregar lógica adicional para verificar si el usuario está activo
-    return current_user 
\ No newline at end of file
+    return current_user 
+
+
+def get_current_active_user_read(
+    current_user: User = Depends(get_current_user_read),
+) -> User:
+    """
+    Variante de `get_current_active_user` para endpoints de solo lectura.
+    
+    Args:
+        current_user: Usuario actual leído de una réplica.
+        
+    Returns:
+        Usuario actual si está activo.
+    """
+    return current_user
+
+def get_current_admin_user(
+    current_user: User = Depends(get_current_active_user),
+) -> User:
+    """
+    Dependency para los endpoints de administración.
+    
+    Args:
+        current_user: Usuario actual.
+        
+    Returns:
+        Usuario actual si es administrador (`is_admin`, que solo se asigna con
+        manage_admins.py).
+        
+    Raises:
+        HTTPException: Si el usuario no es administrador.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Se requieren permisos de administrador",
+        )
+    return current_user
@@ -0,0 +1,45 @@
+from fastapi import HTTPException, Query, Response, status
+from typing import Optional
+
+# Header con el cursor opaco de la página siguiente (ausente en la última página)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class CursorParams:
+    """
+    Dependency con los parámetros de paginación por cursor.
+    
+    Args:
+        cursor: Cursor devuelto en el header X-Next-Cursor de la página anterior.
+        limit: Número máximo de registros por página.
+    """
+    
+    def __init__(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=500),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """
+    Añade a la respuesta el header con el cursor de la página siguiente.
+    
+    Args:
+        response: Respuesta del endpoint.
+        next_cursor: Cursor de la página siguiente, o None si es la última.
+    """
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+def invalid_cursor_exception() -> HTTPException:
+    """
+    Error devuelto cuando el cliente envía un cursor que no se puede decodificar.
+    """
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Cursor de paginación inválido",
+    )
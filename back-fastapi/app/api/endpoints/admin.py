@@ -0,0 +1,57 @@
+"""
+Endpoints de administración.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Any
+
+from app.api.dependencies.auth import get_current_admin_user
+from app.api.schemas.admin import RuntimeConfig, RuntimeConfigUpdate
+from app.api.schemas.user import User
+from app.db.session import get_db
+from app.services.runtime_config import runtime_config
+
+router = APIRouter()
+
+
+@router.get("/runtime-config", response_model=RuntimeConfig)
+def get_runtime_config(
+    current_user: User = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Obtiene la configuración modificable en caliente vigente.
+    """
+    return runtime_config.current
+
+
+@router.patch("/runtime-config", response_model=RuntimeConfig)
+def update_runtime_config(
+    *,
+    db: Session = Depends(get_db),
+    config_in: RuntimeConfigUpdate,
+    current_user: User = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Cambia la configuración en caliente sin reiniciar.
+    
+    Solo se modifican los campos enviados. El cambio se guarda en la base de
+    datos y se aplica de inmediato en este worker; el resto de workers lo
+    aplican en como mucho RUNTIME_CONFIG_CHECK_SECONDS.
+    """
+    try:
+        return runtime_config.update(db, **config_in.model_dump(exclude_unset=True, exclude_none=True))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+
+@router.delete("/runtime-config", response_model=RuntimeConfig)
+def reset_runtime_config(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Descarta los cambios en caliente y vuelve a la configuración del entorno
+    en todos los workers.
+    """
+    return runtime_config.reset(db)
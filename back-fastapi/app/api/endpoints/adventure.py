@@ -1,41 +1,161 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Optional
 from uuid import UUID
 
 from app.api.schemas.adventure import (
-    Adventure, CharacterProgressCreate, CharacterProgressResponse
+    Adventure, CharacterProgressChoice, CharacterProgressCreate, CharacterProgressResponse
 )
-from app.api.dependencies.auth import get_current_active_user
-from app.api.schemas.user import User
-from app.db.session import get_db
-from app.db.repositories.adventure import adventure_repository, character_progress_repository
+from app.api.schemas.artifact import CharacterArtifactCreate
+from app.api.dependencies.auth import get_current_user_id
+from app.db.session import get_db, get_read_db
+from app.db.unit_of_work import unit_of_work
+from app.db.repositories.adventure import character_progress_repository
+from app.db.repositories.artifact import character_artifact_repository
 from app.db.repositories.character import character_repository
+from app.services.adventure_steps import CompiledAdventure, adventure_step_cache
+from app.services.artifact_catalog import artifact_catalog
 
 router = APIRouter()
 
 
+# Header con el número total de pasos, para paginar la historia por rangos
+TOTAL_STEPS_HEADER = "X-Total-Steps"
+
+
+def _get_compiled_adventure(db: Session, adventure_id: UUID) -> CompiledAdventure:
+    """
+    Obtiene los pasos compilados de una aventura o responde 404.
+    """
+    compiled = adventure_step_cache.get(db, adventure_id)
+    if compiled is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Aventura no encontrada",
+        )
+    return compiled
+
+
+def _get_user_character(db: Session, user_id: UUID, character_id: UUID):
+    """
+    Obtiene un personaje del usuario o responde 404.
+    """
+    character = character_repository.get_user_character(
+        db=db, user_id=user_id, character_id=character_id, options=()
+    )
+    if not character:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Personaje no encontrado",
+        )
+    return character
+
+
+def _progress_conflict() -> HTTPException:
+    """
+    Error para una elección hecha sobre un progreso que ha cambiado.
+    """
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="El progreso de la aventura ha cambiado",
+    )
+
+
+def _grant_artifact(db: Session, character_id: UUID, reward: Dict[str, Any]) -> bool:
+    """
+    Asigna al personaje el artefacto de una recompensa.
+    
+    Returns:
+        True si el personaje no tenía el artefacto y se le ha asignado.
+    """
+    try:
+        artifact_id = UUID(str(reward.get("id")))
+    except ValueError:
+        return False
+    if not artifact_catalog.get(db, artifact_id):
+        return False
+    return character_artifact_repository.create(
+        db=db, obj_in=CharacterArtifactCreate(artifact_id=artifact_id), character_id=character_id
+    ) is not None
+
+
+def _apply_rewards(db: Session, character, adventure: CompiledAdventure, step: int, choice: int):
+    """
+    Calcula las recompensas de una elección y las aplica al personaje.
+    
+    La experiencia se incrementa con un único UPDATE atómico y los artefactos se
+    asignan con INSERT ... ON CONFLICT DO NOTHING, ambos dentro de la
+    transacción en curso. Solo se devuelven los artefactos que el personaje no
+    tenía ya.
+    
+    Args:
+        step: Paso en el que se hizo la elección.
+        choice: Índice de la opción elegida.
+    
+    Returns:
+        Tupla con la lista de recompensas y la experiencia total del personaje.
+    """
+    rewards = [
+        reward
+        for reward in character_progress_repository.calculate_rewards(adventure, step=step, choice=choice)
+        if reward["type"] != "artifact" or _grant_artifact(db, character.id, reward)
+    ]
+    
+    gained = sum(reward["value"] for reward in rewards if reward["type"] == "experience")
+    if not gained:
+        return rewards, character.experience or 0
+    
+    experience = character_repository.add_experience(
+        db=db, character_id=character.id, amount=gained
+    )
+    return rewards, experience
+
+
 @router.get("/story", response_model=List[Dict])
 async def get_adventure_story(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     adventure_id: UUID,
-    current_user: User = Depends(get_current_active_user),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    current_user_id: UUID = Depends(get_current_user_id),
 ) -> Any:
     """
     Obtiene los pasos de una historia de aventura.
+    
+    Sin `limit` se devuelven todos los pasos desde `offset`. El número total de
+    pasos se indica en el header X-Total-Steps.
     """
-    # Verificar que la aventura existe
-    adventure = adventure_repository.get(db=db, id=adventure_id)
-    if not adventure:
+    compiled = _get_compiled_adventure(db, adventure_id)
+    return Response(
+        content=compiled.range_json(offset, limit),
+        media_type="application/json",
+        headers={TOTAL_STEPS_HEADER: str(len(compiled))},
+    )
+
+
+@router.get("/story/steps/{step_index}", response_model=Dict)
+async def get_adventure_step(
+    *,
+    db: Session = Depends(get_read_db),
+    adventure_id: UUID,
+    step_index: int,
+    current_user_id: UUID = Depends(get_current_user_id),
+) -> Any:
+    """
+    Obtiene un único paso de una historia de aventura.
+    """
+    compiled = _get_compiled_adventure(db, adventure_id)
+    if not compiled.has_step(step_index):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Aventura no encontrada",
+            detail="Paso no encontrado",
         )
-    
-    # Obtener los pasos de la aventura
-    steps = adventure_repository.get_adventure_steps(db=db, adventure_id=adventure_id)
-    return steps
+    return Response(
+        content=compiled.step_json(step_index),
+        media_type="application/json",
+        headers={TOTAL_STEPS_HEADER: str(len(compiled))},
+    )
 
 
 @router.post("/progress", response_model=CharacterProgressResponse)
@@ -43,55 +163,99 @@ async def save_adventure_progress(
     *,
     db: Session = Depends(get_db),
     progress: CharacterProgressCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user_id: UUID = Depends(get_current_user_id),
 ) -> Any:
     """
     Guarda el progreso de un personaje en una aventura.
     """
     # Verificar que el personaje existe y pertenece al usuario
-    character = character_repository.get_user_character(
-        db=db, user_id=current_user.id, character_id=progress.character_id
-    )
-    if not character:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Personaje no encontrado",
-        )
+    character = _get_user_character(db, current_user_id, progress.character_id)
     
     # Verificar que la aventura existe
-    adventure = adventure_repository.get(db=db, id=progress.adventure_id)
-    if not adventure:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Aventura no encontrada",
+    adventure = _get_compiled_adventure(db, progress.adventure_id)
+    
+    # Progreso y recompensas se confirman en una única transacción
+    with unit_of_work(db):
+        # Guardar o actualizar el progreso
+        saved_progress = character_progress_repository.create_or_update(
+            db=db, obj_in=progress
         )
+        
+        # Recompensar la última elección, hecha en el paso al que llevan las anteriores
+        rewards, experience = [], character.experience or 0
+        if progress.choices:
+            step = adventure.follow(progress.choices[:-1])
+            if step is not None:
+                rewards, experience = _apply_rewards(
+                    db, character, adventure, step, progress.choices[-1]
+                )
     
-    # Guardar o actualizar el progreso
-    saved_progress = character_progress_repository.create_or_update(
-        db=db, obj_in=progress
+    # Crear respuesta
+    response = CharacterProgressResponse(
+        character_id=character.id,
+        current_step=saved_progress.current_step,
+        experience=experience,
+        rewards=rewards
     )
     
-    # Calcular recompensas basadas en el progreso
-    rewards = character_progress_repository.calculate_rewards(
-        character_progress=saved_progress, adventure=adventure
-    )
+    return response
+
+
+@router.post("/progress/choice", response_model=CharacterProgressResponse)
+async def save_adventure_choice(
+    *,
+    db: Session = Depends(get_db),
+    choice_in: CharacterProgressChoice,
+    current_user_id: UUID = Depends(get_current_user_id),
+) -> Any:
+    """
+    Registra una única elección de un personaje y avanza al paso al que lleva.
+    
+    Solo se envía la nueva elección: se añade al historial guardado sin reescribirlo.
+    El paso siguiente se obtiene del grafo de la aventura (`next_step` de la
+    opción); si la opción no existe en el paso actual se responde 422. Si se
+    indica `expected_step` y no coincide con el paso guardado (p. ej. por una
+    petición duplicada o concurrente) se responde 409 sin modificar nada.
+    """
+    # Verificar que el personaje existe y pertenece al usuario
+    character = _get_user_character(db, current_user_id, choice_in.character_id)
     
-    # Aplicar recompensas (por ejemplo, experiencia)
-    for reward in rewards:
-        if reward["type"] == "experience":
-            character.experience += reward["value"]
+    # Verificar que la aventura existe
+    adventure = _get_compiled_adventure(db, choice_in.adventure_id)
     
-    # Guardar los cambios del personaje
-    db.add(character)
-    db.commit()
-    db.refresh(character)
+    current_step = character_progress_repository.get_current_step(
+        db, character_id=character.id, adventure_id=adventure.id
+    ) or 0
+    if choice_in.expected_step is not None and choice_in.expected_step != current_step:
+        raise _progress_conflict()
     
-    # Crear respuesta
-    response = CharacterProgressResponse(
+    next_step = adventure.transitions.get((current_step, choice_in.choice))
+    if next_step is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="La opción elegida no existe en el paso actual",
+        )
+    
+    # Progreso y recompensas se confirman en una única transacción
+    with unit_of_work(db):
+        # El paso leído protege la actualización: si otra petición ha movido el
+        # progreso entretanto, la transición calculada ya no es válida
+        saved_progress = character_progress_repository.append_choice(
+            db=db,
+            character_id=character.id,
+            adventure_id=adventure.id,
+            choice=choice_in.choice,
+            next_step=next_step,
+            expected_step=current_step,
+        )
+        if not saved_progress:
+            raise _progress_conflict()
+        
+        rewards, experience = _apply_rewards(db, character, adventure, current_step, choice_in.choice)
+    
+    return CharacterProgressResponse(
         character_id=character.id,
         current_step=saved_progress.current_step,
-        experience=character.experience,
+        experience=experience,
         rewards=rewards
     )
-    
-    return response 
\ No newline at end of file
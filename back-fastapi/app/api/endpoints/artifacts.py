@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import Any, List
 from uuid import UUID
@@ -8,11 +8,13 @@ from app.api.schemas.artifact import (
     CharacterArtifactUpdate
 )
 from app.api.schemas.character import Character
-from app.api.dependencies.auth import get_current_active_user
-from app.api.schemas.user import User
-from app.db.session import get_db
-from app.db.repositories.artifact import artifact_repository, character_artifact_repository
+from app.api.dependencies.auth import get_current_user_id
+from app.api.dependencies.pagination import CursorParams, invalid_cursor_exception, set_next_cursor
+from app.db.session import get_db, get_read_db
+from app.db.unit_of_work import unit_of_work
+from app.db.repositories.artifact import character_artifact_repository
 from app.db.repositories.character import character_repository
+from app.services.artifact_catalog import artifact_catalog
 
 router = APIRouter()
 
@@ -20,15 +22,30 @@ router = APIRouter()
 @router.get("", response_model=List[Artifact])
 async def get_artifacts(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+    response: Response,
+    page: CursorParams = Depends(),
     skip: int = 0,
-    limit: int = 100,
 ) -> Any:
     """
     Obtiene la lista de artefactos disponibles.
     Este endpoint es público y no requiere autenticación.
+    
+    La paginación es por cursor (header X-Next-Cursor y parámetro `cursor`).
+    El parámetro `skip` se mantiene por compatibilidad y usa paginación por offset.
+    Los artefactos se sirven desde el catálogo en memoria.
     """
-    artifacts = artifact_repository.get_multi(db, skip=skip, limit=limit)
+    if skip:
+        return artifact_catalog.get_multi(db, skip=skip, limit=page.limit)
+    
+    try:
+        artifacts, next_cursor = artifact_catalog.list_page(
+            db, cursor=page.cursor, limit=page.limit
+        )
+    except ValueError:
+        raise invalid_cursor_exception()
+    
+    set_next_cursor(response, next_cursor)
     return artifacts
 
 
@@ -38,14 +55,14 @@ async def add_artifact_to_character(
     db: Session = Depends(get_db),
     character_id: UUID,
     artifact_in: CharacterArtifactCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user_id: UUID = Depends(get_current_user_id),
 ) -> Any:
     """
     Agrega un artefacto a un personaje.
     """
     # Verificar que el personaje existe y pertenece al usuario
     character = character_repository.get_user_character(
-        db=db, user_id=current_user.id, character_id=character_id
+        db=db, user_id=current_user_id, character_id=character_id, options=()
     )
     if not character:
         raise HTTPException(
@@ -54,28 +71,24 @@ async def add_artifact_to_character(
         )
     
     # Verificar que el artefacto existe
-    artifact = artifact_repository.get(db=db, id=artifact_in.artifact_id)
+    artifact = artifact_catalog.get(db, artifact_in.artifact_id)
     if not artifact:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Artefacto no encontrado",
         )
     
-    # Verificar si el personaje ya tiene este artefacto
-    existing_artifact = character_artifact_repository.get(
-        db=db, character_id=character_id, artifact_id=artifact_in.artifact_id
-    )
-    if existing_artifact:
+    # Crear la relación entre personaje y artefacto (None si ya la tenía)
+    with unit_of_work(db):
+        character_artifact = character_artifact_repository.create(
+            db=db, obj_in=artifact_in, character_id=character_id
+        )
+    if not character_artifact:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El personaje ya tiene este artefacto",
         )
     
-    # Crear la relación entre personaje y artefacto
-    character_artifact_repository.create(
-        db=db, obj_in=artifact_in, character_id=character_id
-    )
-    
     # Obtener el personaje actualizado
     character = character_repository.get(db=db, id=character_id)
     return character
@@ -88,14 +101,14 @@ async def update_character_artifact(
     character_id: UUID,
     artifact_id: UUID,
     artifact_in: CharacterArtifactUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user_id: UUID = Depends(get_current_user_id),
 ) -> Any:
     """
     Actualiza el estado de un artefacto de un personaje (activar/desactivar).
     """
     # Verificar que el personaje existe y pertenece al usuario
     character = character_repository.get_user_character(
-        db=db, user_id=current_user.id, character_id=character_id
+        db=db, user_id=current_user_id, character_id=character_id, options=()
     )
     if not character:
         raise HTTPException(
@@ -114,9 +127,10 @@ async def update_character_artifact(
         )
     
     # Actualizar el estado del artefacto
-    character_artifact_repository.update(
-        db=db, db_obj=character_artifact, obj_in=artifact_in
-    )
+    with unit_of_work(db):
+        character_artifact_repository.update(
+            db=db, db_obj=character_artifact, obj_in=artifact_in
+        )
     
     # Obtener el personaje actualizado
     character = character_repository.get(db=db, id=character_id)
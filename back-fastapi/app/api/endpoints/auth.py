@@ -1,17 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from typing import Any
 
 from app.api.schemas.user import User, UserCreate, UserWithToken
-from app.api.schemas.token import Token
-from app.core.security import create_access_token
+from app.api.schemas.token import RefreshTokenRequest, Token
+from app.core.rate_limit import login_rate_limiter
+from app.core.security import PasswordHasherBusyError, create_access_token, get_password_hash_async
 from app.db.session import get_db
+from app.db.unit_of_work import unit_of_work
 from app.db.repositories.user import user_repository
+from app.db.repositories.refresh_token import refresh_token_repository
+from app.services.token_revocation import revocation_index
 
 router = APIRouter()
 
 
+def _user_with_token(db: Session, user) -> dict:
+    """
+    Abre una sesión para el usuario y construye la respuesta con sus tokens.
+    
+    Se llama dentro de la unidad de trabajo del endpoint.
+    """
+    session, refresh_token = refresh_token_repository.create(db, user_id=user.id)
+    access_token = create_access_token(subject=str(user.id), session_id=session.id)
+    return {
+        **User.model_validate(user).model_dump(),
+        "token": access_token,
+        "refresh_token": refresh_token,
+    }
+
+
+def _password_hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servidor ocupado, inténtalo de nuevo en unos segundos",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/register", response_model=UserWithToken, status_code=status.HTTP_201_CREATED)
 async def register(*, db: Session = Depends(get_db), user_in: UserCreate) -> Any:
     """
@@ -24,33 +53,48 @@ async def register(*, db: Session = Depends(get_db), user_in: UserCreate) -> Any
             detail="El correo electrónico ya está registrado.",
         )
     
-    user = user_repository.create(db, obj_in=user_in)
+    # bcrypt se ejecuta en el pool de hashing para no bloquear el event loop
+    try:
+        hashed_password = await get_password_hash_async(user_in.password)
+    except PasswordHasherBusyError:
+        raise _password_hasher_busy()
     
-    # Crear token de acceso
-    access_token = create_access_token(subject=str(user.id))
+    # Usuario y sesión se crean en una única transacción
+    with unit_of_work(db):
+        user = user_repository.create(db, obj_in=user_in, hashed_password=hashed_password)
+        response = _user_with_token(db, user)
     
-    return {
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "image_url": user.image_url,
-        "provider": user.provider,
-        "created_at": user.created_at,
-        "updated_at": user.updated_at,
-        "token": access_token
-    }
+    return response
 
 
 @router.post("/login", response_model=UserWithToken)
 async def login(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+    request: Request,
+    db: Session = Depends(get_db),
+    form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> Any:
     """
     Autentica un usuario con email y contraseña.
+    
+    Los intentos se limitan por IP y por email antes de verificar la contraseña;
+    al superar el límite se responde 429 con el header Retry-After.
     """
-    user = user_repository.authenticate(
-        db, email=form_data.username, password=form_data.password
+    retry_after = login_rate_limiter.check(
+        ip=request.client.host if request.client else None, email=form_data.username
     )
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiados intentos de inicio de sesión, inténtalo más tarde",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+    
+    try:
+        user = await user_repository.authenticate_async(
+            db, email=form_data.username, password=form_data.password
+        )
+    except PasswordHasherBusyError:
+        raise _password_hasher_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -58,21 +102,53 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Crear token de acceso
-    access_token = create_access_token(subject=str(user.id))
+    # Abrir una sesión con su token de acceso y su refresh token
+    with unit_of_work(db):
+        response = _user_with_token(db, user)
     
+    return response
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    *, db: Session = Depends(get_db), token_in: RefreshTokenRequest
+) -> Any:
+    """
+    Renueva el token de acceso con un refresh token.
+    
+    El refresh token se rota: el recibido deja de ser válido y se devuelve uno nuevo.
+    """
+    with unit_of_work(db):
+        rotated = refresh_token_repository.rotate(db, token=token_in.refresh_token)
+    if not rotated:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token inválido o caducado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    session, refresh_token = rotated
     return {
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "image_url": user.image_url,
-        "provider": user.provider,
-        "created_at": user.created_at,
-        "updated_at": user.updated_at,
-        "token": access_token
+        "access_token": create_access_token(subject=str(session.user_id), session_id=session.id),
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
     }
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(*, db: Session = Depends(get_db), token_in: RefreshTokenRequest) -> None:
+    """
+    Cierra la sesión del refresh token.
+    
+    El refresh token deja de servir y los tokens de acceso de la sesión se
+    rechazan aunque todavía no hayan caducado.
+    """
+    with unit_of_work(db):
+        session_id = refresh_token_repository.revoke(db, token=token_in.refresh_token)
+    if session_id:
+        revocation_index.add(session_id)
+
+
 @router.post("/social-login", response_model=UserWithToken)
 async def social_login(
     *, db: Session = Depends(get_db), provider_data: dict
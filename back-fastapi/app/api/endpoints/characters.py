@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import Any, List
 from uuid import UUID
 
 from app.api.schemas.character import Character, CharacterCreate, CharacterUpdate, CharacterList
-from app.api.dependencies.auth import get_current_active_user
+from app.api.dependencies.auth import get_current_active_user, get_current_user_id
+from app.api.dependencies.pagination import CursorParams, invalid_cursor_exception, set_next_cursor
 from app.api.schemas.user import User
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
+from app.db.unit_of_work import unit_of_work
+from app.db.models.character import Character as CharacterModel
 from app.db.repositories.character import character_repository
 
 router = APIRouter()
@@ -22,26 +25,36 @@ async def create_character(
     """
     Crea un nuevo personaje para el usuario autenticado.
     """
-    character = character_repository.create_with_user(
-        db=db, obj_in=character_in, user_id=current_user.id
-    )
+    with unit_of_work(db):
+        character = character_repository.create_with_user(
+            db=db, obj_in=character_in, user_id=current_user.id
+        )
     return character
 
 
 @router.get("", response_model=List[Character])
 async def get_characters(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-    skip: int = 0,
-    limit: int = 100,
+    db: Session = Depends(get_read_db),
+    response: Response,
+    current_user_id: UUID = Depends(get_current_user_id),
+    page: CursorParams = Depends(),
 ) -> Any:
     """
-    Obtiene todos los personajes del usuario autenticado.
+    Obtiene los personajes del usuario autenticado, ordenados por fecha de creación.
+    
+    La paginación es por cursor: si hay más personajes, la respuesta incluye el
+    header X-Next-Cursor, que se envía como parámetro `cursor` para pedir la
+    página siguiente.
     """
-    characters = character_repository.get_by_user_id(
-        db=db, user_id=current_user.id
-    )
+    try:
+        characters, next_cursor = character_repository.get_page_by_user_id(
+            db=db, user_id=current_user_id, cursor=page.cursor, limit=page.limit
+        )
+    except ValueError:
+        raise invalid_cursor_exception()
+    
+    set_next_cursor(response, next_cursor)
     return characters
 
 
@@ -50,13 +63,13 @@ async def get_character(
     *,
     db: Session = Depends(get_db),
     character_id: UUID,
-    current_user: User = Depends(get_current_active_user),
+    current_user_id: UUID = Depends(get_current_user_id),
 ) -> Any:
     """
     Obtiene un personaje específico del usuario autenticado.
     """
     character = character_repository.get_user_character(
-        db=db, user_id=current_user.id, character_id=character_id
+        db=db, user_id=current_user_id, character_id=character_id
     )
     if not character:
         raise HTTPException(
@@ -72,23 +85,24 @@ async def update_character(
     db: Session = Depends(get_db),
     character_id: UUID,
     character_in: CharacterUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user_id: UUID = Depends(get_current_user_id),
 ) -> Any:
     """
     Actualiza un personaje específico del usuario autenticado.
     """
-    character = character_repository.get_user_character(
-        db=db, user_id=current_user.id, character_id=character_id
-    )
+    # UPDATE ... RETURNING filtrado por propietario, sin cargar antes el personaje
+    with unit_of_work(db):
+        character = character_repository.update_by_id(
+            db=db,
+            id=character_id,
+            obj_in=character_in,
+            filters=(CharacterModel.user_id == current_user_id,),
+        )
     if not character:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Personaje no encontrado",
         )
-    
-    character = character_repository.update(
-        db=db, db_obj=character, obj_in=character_in
-    )
     return character
 
 
@@ -97,13 +111,13 @@ async def delete_character(
     *,
     db: Session = Depends(get_db),
     character_id: UUID,
-    current_user: User = Depends(get_current_active_user),
+    current_user_id: UUID = Depends(get_current_user_id),
 ) -> None:
     """
     Elimina un personaje específico del usuario autenticado.
     """
     character = character_repository.get_user_character(
-        db=db, user_id=current_user.id, character_id=character_id
+        db=db, user_id=current_user_id, character_id=character_id, options=()
     )
     if not character:
         raise HTTPException(
@@ -111,4 +125,5 @@ async def delete_character(
             detail="Personaje no encontrado",
         )
     
-    character_repository.remove(db=db, id=character_id) 
\ No newline at end of file
+    with unit_of_work(db):
+        character_repository.remove(db=db, id=character_id) 
\ No newline at end of file
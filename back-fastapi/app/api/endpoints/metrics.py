@@ -0,0 +1,58 @@
+"""
+Endpoint de métricas en formato Prometheus.
+"""
+
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.orm import Session
+
+from app.api.dependencies.auth import get_current_admin_user, get_current_user_read
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import get_read_db
+
+router = APIRouter()
+
+# Content-Type del formato de texto de Prometheus
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def require_metrics_access(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: Session = Depends(get_read_db),
+) -> None:
+    """
+    Dependency que protege /metrics: admite el token estático METRICS_TOKEN
+    (para Prometheus) o el token de un administrador.
+
+    Raises:
+        HTTPException: 401 sin credenciales válidas, 403 si el usuario no es administrador.
+    """
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No autenticado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if settings.METRICS_TOKEN and hmac.compare_digest(
+        credentials.credentials.encode("utf-8"), settings.METRICS_TOKEN.encode("utf-8")
+    ):
+        return
+    user = await get_current_user_read(db=db, token=credentials.credentials)
+    get_current_admin_user(current_user=user)
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+def get_metrics() -> PlainTextResponse:
+    """
+    Devuelve las métricas en el formato de texto de Prometheus.
+
+    Con varios workers incluye las de todos ellos (ver `app.core.metrics`).
+    """
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,28 +1,62 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
-from typing import Any, List, Dict
+from typing import Any, Awaitable, Callable, List, Dict, Optional
 import json
-import os
+import logging
 
 
 from app.api.schemas.personality import (
     PersonalityQuestion, PersonalityTestSubmit, 
     PersonalityTestResults, PersonalityStats
 )
-from app.api.dependencies.auth import get_current_active_user
-from app.api.schemas.user import User
+from app.api.dependencies.auth import get_current_user_id
 from app.db.session import get_db
 from app.db.repositories.personality import personality_repository
 from app.core.config import settings
 import asyncio
 from datetime import datetime
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 # Importar funciones del generador simple
 from app.services.simple_generator import generate_personality_question, generate_fallback_question
+from app.services.runtime_config import (
+    GENERATION_MODE_FALLBACK, GENERATION_MODE_LANGGRAPH, llm_limiter, runtime_config
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+QuestionGenerator = Callable[[str, str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def _get_question_generator(generation_mode: str) -> QuestionGenerator:
+    """
+    Devuelve el generador de preguntas del modo indicado.
+    
+    Args:
+        generation_mode: Modo de generación ("simple" o "langgraph").
+        
+    Returns:
+        Función asíncrona (tema, idioma) -> pregunta. Devuelve None si la
+        pregunta se descarta porque el LLM está al límite de concurrencia.
+    """
+    if generation_mode != GENERATION_MODE_LANGGRAPH:
+        return generate_personality_question
+    
+    from app.services.langchain_graph.personality_generator import (
+        generate_personality_question as generate_llm_question
+    )
+    
+    async def generate(theme: str, lang: str) -> Optional[Dict[str, Any]]:
+        with llm_limiter.slot() as acquired:
+            if not acquired:
+                logger.debug("LLM al límite de concurrencia, pregunta de fallback para: %s", theme)
+                return None
+            return await generate_llm_question(theme)
+    
+    return generate
+
 
 @router.get("/questions", response_model=List[PersonalityQuestion])
 
@@ -39,19 +73,21 @@ async def get_personality_questions(
     Este endpoint es público y no requiere autenticación.
     Siempre devuelve exactamente 4 preguntas.
     
-    Si GENERATE_QUESTIONS_ON_DEMAND está habilitado, genera preguntas dinámicamente.
-    Si está deshabilitado, devuelve preguntas de fallback.
+    Según el modo de generación vigente (ver /api/admin/runtime-config) genera
+    las preguntas con el generador simple o con LangGraph, o devuelve preguntas
+    de fallback. Con LangGraph, las preguntas que superan el límite de llamadas
+    concurrentes al LLM se sustituyen por preguntas de fallback.
     
     Soporta idiomas inglés (en) y español (es) a través del parámetro lang.
     """
-    print(f"Generando preguntas de personalidad en idioma: {lang}")
+    logger.debug("Generando preguntas de personalidad en idioma: %s", lang)
     # Verificar si debemos generar preguntas on-demand
-    generate_on_demand = os.getenv('GENERATE_QUESTIONS_ON_DEMAND', 'false').lower() == 'true'
-    print(f"GENERATE_QUESTIONS_ON_DEMAND: {generate_on_demand}")
+    generation_mode = runtime_config.current.generation_mode
+    logger.debug("Modo de generación: %s", generation_mode)
     # Crear una lista para almacenar las preguntas de respuesta
     final_questions = []
     
-    if generate_on_demand:
+    if generation_mode != GENERATION_MODE_FALLBACK:
         try:
             # Definir temas para las preguntas
             themes = [
@@ -61,16 +97,18 @@ async def get_personality_questions(
                 "colonización espacial"
             ]
             
-            # Importar el generador simple
+            # Importar el generador del modo vigente
             try:
-                print("Importando generador simple...")
-                from app.services.simple_generator import generate_personality_question
+                logger.debug("Importando generador %s...", generation_mode)
+                generate_question = _get_question_generator(generation_mode)
                 
                 # Generar preguntas para cada tema
                 for i in range(min(limit, len(themes))):
                     try:
-                        print(f"Generando pregunta para tema: {themes[i]}")
-                        question_data = await generate_personality_question(themes[i], lang)
+                        logger.debug("Generando pregunta para tema: %s", themes[i])
+                        question_data = await generate_question(themes[i], lang)
+                        if question_data is None:
+                            question_data = generate_fallback_question(themes[i], lang)
                         
                         # Crear objeto de pregunta
                         question = {
@@ -85,29 +123,29 @@ async def get_personality_questions(
                         
                         final_questions.append(question)
                     except Exception as e:
-                        print(f"Error generando pregunta para tema {themes[i]}: {str(e)}")
+                        logger.warning("Error generando pregunta para tema %s: %s", themes[i], e)
                 
                 # Si hemos generado preguntas, convertir y devolver
                 if final_questions:
-                    print(f"Generadas {len(final_questions)} preguntas con éxito")
+                    logger.debug("Generadas %d preguntas con éxito", len(final_questions))
                     return [PersonalityQuestion(**q) for q in final_questions]
                 
             except Exception as e:
-                print(f"Error importando generador simple: {str(e)}")
+                logger.warning("Error importando generador %s: %s", generation_mode, e)
                 # Continuar con fallback
         
         except Exception as e:
-            print(f"Error en proceso de generación: {str(e)}")
+            logger.warning("Error en proceso de generación: %s", e)
             # Continuar con fallback
     
     # Si estamos aquí, usamos fallback
-    print("Usando preguntas fallback...")
+    logger.debug("Usando preguntas fallback...")
     themes = ["viaje espacial", "encuentro alienígena", "paradoja temporal", "colonización espacial"]
     
     for i, theme in enumerate(themes[:limit]):
         try:
             # Intentar usar el generador fallback pero con idioma seleccionado
-            print(f"Generando pregunta fallback para tema: {theme}, idioma: {lang}")
+            logger.debug("Generando pregunta fallback para tema: %s, idioma: %s", theme, lang)
             fallback_question = generate_fallback_question(theme, lang)
             question = PersonalityQuestion(
                 id=uuid4(),
@@ -119,7 +157,7 @@ async def get_personality_questions(
                 options=fallback_question["options"]
             )
         except Exception as e:
-            print(f"Error al generar pregunta fallback: {e}")
+            logger.warning("Error al generar pregunta fallback: %s", e)
             # Fallback muy básico si todo lo demás falla
             options = [
                 {
@@ -172,13 +210,13 @@ async def submit_personality_test(
     *,
     db: Session = Depends(get_db),
     test_results: PersonalityTestSubmit,
-    current_user: User = Depends(get_current_active_user),
+    current_user_id: UUID = Depends(get_current_user_id),
 ) -> Any:
     """
     Envía las respuestas del test de personalidad y obtiene los resultados.
     """
     # Verificar que el usuario que envía las respuestas es el mismo que el del token
-    if str(test_results.user_id) != str(current_user.id):
+    if str(test_results.user_id) != str(current_user_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El ID de usuario en los resultados no coincide con el usuario autenticado",
@@ -3,8 +3,9 @@ from sqlalchemy.orm import Session
 from typing import Any
 
 from app.api.schemas.user import User, UserUpdate
-from app.api.dependencies.auth import get_current_active_user
+from app.api.dependencies.auth import get_current_active_user, get_current_active_user_read
 from app.db.session import get_db
+from app.db.unit_of_work import unit_of_work
 from app.db.repositories.user import user_repository
 
 router = APIRouter()
@@ -12,7 +13,7 @@ router = APIRouter()
 
 @router.get("/profile", response_model=User)
 async def get_user_profile(
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_read),
 ) -> Any:
     """
     Obtiene el perfil del usuario autenticado.
@@ -38,8 +39,14 @@ async def update_user_profile(
                 detail="El correo electrónico ya está registrado por otro usuario.",
             )
     
-    user = user_repository.update(
-        db, db_obj=current_user, obj_in=user_in
-    )
+    # `current_user` es una copia de la caché de usuarios: se carga la fila para modificarla
+    db_user = user_repository.get(db, id=current_user.id)
+    if not db_user:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    
+    with unit_of_work(db):
+        user = user_repository.update(
+            db, db_obj=db_user, obj_in=user_in
+        )
     
     return user 
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+Middleware CORS en ASGI puro.
+
+Sustituye al CORSMiddleware de Starlette y al middleware "http" que reescribía
+las cabeceras de cada respuesta. Las cabeceras se calculan una sola vez a
+partir de `Settings` como tuplas de bytes, de modo que por petición solo se
+busca la cabecera Origin y, si está permitido, se añaden las cabeceras ya
+construidas al inicio de la respuesta. Las peticiones preflight se responden
+directamente sin llegar a la aplicación.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+Headers = List[Tuple[bytes, bytes]]
+
+# Métodos con los que se sustituye "*": con credenciales los navegadores no
+# aceptan el comodín en Access-Control-Allow-Methods
+ALL_METHODS = ("DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT")
+
+
+def _join(values: Iterable[str]) -> bytes:
+    return ", ".join(values).encode("latin-1")
+
+
+def _split(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class CORSPolicy:
+    """
+    Política CORS con las cabeceras precalculadas.
+
+    Con `allow_origins` igual a ["*"] se admite cualquier origen: sin
+    credenciales se responde con "*", y con credenciales se devuelve el
+    origen de la petición (los navegadores rechazan "*" junto a credenciales).
+    Del mismo modo, "*" en `allow_methods` equivale a todos los métodos y en
+    `allow_headers` se responde con las cabeceras que pide el preflight.
+    """
+
+    def __init__(
+        self,
+        *,
+        allow_origins: Iterable[str] = ("*",),
+        allow_credentials: bool = False,
+        allow_methods: Iterable[str] = ("GET", "POST", "PUT", "DELETE", "OPTIONS"),
+        allow_headers: Iterable[str] = ("Content-Type", "Authorization"),
+        expose_headers: Iterable[str] = (),
+        max_age: int = 600,
+    ):
+        origins = [origin.rstrip("/") for origin in allow_origins]
+        self.allow_all_origins = "*" in origins
+        self.allow_origins = frozenset(origin.encode("latin-1") for origin in origins if origin != "*")
+        self.allow_credentials = allow_credentials
+        methods = [method.upper() for method in allow_methods]
+        self.allow_methods = frozenset(ALL_METHODS if "*" in methods else methods)
+        allow_headers = list(allow_headers)
+        self.allow_all_headers = "*" in allow_headers
+        # Si el origen depende de la petición, las cachés deben distinguirlo
+        self.echo_origin = allow_credentials or not self.allow_all_origins
+
+        common: Headers = []
+        if allow_credentials:
+            common.append((b"access-control-allow-credentials", b"true"))
+        if not self.echo_origin:
+            common.append((b"access-control-allow-origin", b"*"))
+
+        expose = list(expose_headers)
+        self.simple_headers: Headers = list(common)
+        if expose:
+            self.simple_headers.append((b"access-control-expose-headers", _join(expose)))
+
+        self.preflight_headers: Headers = list(common) + [
+            (b"access-control-allow-methods", _join(sorted(self.allow_methods))),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+            (b"content-length", b"0"),
+        ]
+        if not self.allow_all_headers:
+            self.preflight_headers.append((b"access-control-allow-headers", _join(allow_headers)))
+
+    @classmethod
+    def from_settings(cls, config=settings) -> "CORSPolicy":
+        """
+        Construye la política a partir de la configuración.
+
+        Args:
+            config: Configuración de la aplicación.
+
+        Returns:
+            La política CORS.
+        """
+        return cls(
+            allow_origins=config.get_cors_origins(),
+            allow_credentials=config.CORS_ALLOW_CREDENTIALS,
+            allow_methods=_split(config.CORS_ALLOW_METHODS),
+            allow_headers=_split(config.CORS_ALLOW_HEADERS),
+            expose_headers=_split(config.CORS_EXPOSE_HEADERS),
+            max_age=config.CORS_MAX_AGE,
+        )
+
+    def is_allowed_origin(self, origin: bytes) -> bool:
+        """Indica si un origen (tal como llega en la cabecera) está permitido."""
+        return self.allow_all_origins or origin in self.allow_origins
+
+    def origin_headers(self, origin: bytes) -> Headers:
+        """Cabeceras que dependen del origen de la petición."""
+        if self.echo_origin:
+            return [(b"access-control-allow-origin", origin), (b"vary", b"Origin")]
+        return []
+
+    def response_headers(self, origin: Optional[bytes]) -> Headers:
+        """
+        Cabeceras CORS de una respuesta normal.
+
+        Args:
+            origin: Valor de la cabecera Origin de la petición, o None.
+
+        Returns:
+            Lista de cabeceras a añadir (vacía si el origen no está permitido).
+        """
+        if origin is None or not self.is_allowed_origin(origin):
+            return []
+        return self.simple_headers + self.origin_headers(origin)
+
+    def apply(self, response, origin: Optional[str]) -> None:
+        """
+        Añade las cabeceras CORS a una respuesta de Starlette ya construida.
+
+        Se usa en el manejador de excepciones, cuya respuesta se envía por
+        fuera de la pila de middlewares.
+
+        Args:
+            response: Respuesta a modificar.
+            origin: Valor de la cabecera Origin de la petición, o None.
+        """
+        if origin is None:
+            return
+        for name, value in self.response_headers(origin.encode("latin-1")):
+            response.raw_headers.append((name, value))
+
+
+class CORSMiddleware:
+    """
+    Middleware ASGI que aplica una `CORSPolicy`.
+
+    Las peticiones sin cabecera Origin (mismo origen, clientes que no son
+    navegadores) pasan a la aplicación sin ningún trabajo adicional.
+    """
+
+    def __init__(self, app: ASGIApp, policy: Optional[CORSPolicy] = None):
+        self.app = app
+        self.policy = policy or CORSPolicy.from_settings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_method = None
+        request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self._preflight(origin, request_method, request_headers, send)
+            return
+
+        extra = self.policy.response_headers(origin)
+        if not extra:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.extend(extra)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    async def _preflight(
+        self, origin: bytes, request_method: bytes, request_headers: Optional[bytes], send: Send
+    ) -> None:
+        policy = self.policy
+        allowed = (
+            policy.is_allowed_origin(origin)
+            and request_method.decode("latin-1").upper() in policy.allow_methods
+        )
+        if allowed:
+            status = 200
+            headers = policy.preflight_headers + policy.origin_headers(origin)
+            if policy.allow_all_headers and request_headers:
+                headers.append((b"access-control-allow-headers", request_headers))
+        else:
+            status = 400
+            headers = [(b"content-length", b"0"), (b"vary", b"Origin")]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
+
+
+cors_policy = CORSPolicy.from_settings()
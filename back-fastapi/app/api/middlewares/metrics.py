@@ -0,0 +1,89 @@
+"""
+Middleware de métricas en ASGI puro.
+
+Mide la duración de cada petición HTTP y la registra en `metrics` junto con
+el código de estado y las consultas a la base de datos que ha hecho. Las
+peticiones se agrupan por la plantilla de la ruta (p. ej.
+/api/characters/{character_id}) para que el número de series no dependa de
+los IDs de las URLs.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Etiqueta para las peticiones que no corresponden a ninguna ruta
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _collect_routes(routes, prefix: str, templates: Dict[Any, str]) -> None:
+    for route in routes:
+        path = prefix + getattr(route, "path", "")
+        if isinstance(route, Mount):
+            templates.setdefault(route.app, path)
+            _collect_routes(route.routes, path, templates)
+        elif getattr(route, "endpoint", None) is not None:
+            templates.setdefault(route.endpoint, path)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra la latencia y las consultas de cada petición.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Endpoint -> plantilla de la ruta, construido la primera vez que se necesita
+        self._templates: Optional[Dict[Any, str]] = None
+
+    def _route_template(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        templates = self._templates
+        if templates is None or endpoint not in templates:
+            templates = {}
+            _collect_routes(scope["app"].routes, "", templates)
+            self._templates = templates
+        return templates.get(endpoint, UNMATCHED_ROUTE)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = metrics.start_request()
+        started_at = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            seconds = time.perf_counter() - started_at
+            route = self._route_template(scope)
+            metrics.observe_request(scope["method"], route, status_code, seconds, stats)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Petición %s %s", scope["method"], route,
+                    extra={
+                        "route": route,
+                        "method": scope["method"],
+                        "status": status_code,
+                        "duration_ms": round(seconds * 1000, 3),
+                        "db_queries": stats.db_queries,
+                        "db_ms": round(stats.db_seconds * 1000, 3),
+                    },
+                )
@@ -8,7 +8,7 @@ from fastapi import APIRouter
 
 from app.api.endpoints import (
     auth, users, health, characters, 
-    artifacts, personality, adventure
+    artifacts, personality, adventure, admin
 )
 
 router = APIRouter()
@@ -20,4 +20,5 @@ router.include_router(characters.router, prefix="/characters", tags=["characters
 router.include_router(artifacts.router, prefix="/artifacts", tags=["artifacts"])
 router.include_router(personality.router, prefix="/personality", tags=["personality"])
 router.include_router(adventure.router, prefix="/adventure", tags=["adventure"])
+router.include_router(admin.router, prefix="/admin", tags=["admin"])
 router.include_router(health.router, tags=["health"]) 
\ No newline at end of file
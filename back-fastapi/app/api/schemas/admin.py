@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+
+GenerationMode = Literal["fallback", "simple", "langgraph"]
+
+
+class RuntimeConfig(BaseModel):
+    """Esquema de la configuración modificable en caliente"""
+    generation_mode: GenerationMode
+    llm_max_concurrency: int
+    image_generation_enabled: bool
+    user_cache_ttl_seconds: float
+    artifact_catalog_check_seconds: float
+
+    class Config:
+        from_attributes = True
+
+
+class RuntimeConfigUpdate(BaseModel):
+    """Esquema para cambiar la configuración en caliente (solo los campos enviados)"""
+    generation_mode: Optional[GenerationMode] = None
+    llm_max_concurrency: Optional[int] = Field(default=None, ge=0)
+    image_generation_enabled: Optional[bool] = None
+    user_cache_ttl_seconds: Optional[float] = Field(default=None, ge=0)
+    artifact_catalog_check_seconds: Optional[float] = Field(default=None, ge=0)
@@ -42,10 +42,19 @@ class CharacterProgressBase(BaseModel):
 class CharacterProgressCreate(BaseModel):
     """Esquema para guardar progreso en aventura"""
     character_id: UUID
+    adventure_id: UUID
     current_step: int
     choices: List[int]
 
 
+class CharacterProgressChoice(BaseModel):
+    """Esquema para registrar una única elección en una aventura"""
+    character_id: UUID
+    adventure_id: UUID
+    choice: int = Field(..., ge=0)
+    expected_step: Optional[int] = Field(None, ge=0)
+
+
 class CharacterProgressInDB(CharacterProgressBase):
     """Esquema para progreso de personaje en la base de datos"""
     id: UUID
@@ -3,6 +3,8 @@ from typing import Optional, Dict, Any, List
 from uuid import UUID
 from datetime import datetime
 
+from app.api.schemas.artifact import CharacterArtifactInDB
+
 
 class CharacterBase(BaseModel):
     """Esquema base para personajes"""
@@ -39,7 +41,7 @@ class CharacterInDBBase(CharacterBase):
 
 class Character(CharacterInDBBase):
     """Esquema para respuesta de personaje (incluye relaciones)"""
-    artifacts: List[Dict[str, Any]] = Field(default_factory=list)
+    artifacts: List[CharacterArtifactInDB] = Field(default_factory=list)
 
 
 class CharacterList(BaseModel):
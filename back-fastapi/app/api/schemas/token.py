@@ -1,12 +1,20 @@
 from pydantic import BaseModel
+from typing import Optional
 
 
 class Token(BaseModel):
     """Esquema para token de autenticación"""
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshTokenRequest(BaseModel):
+    """Esquema para renovar el token de acceso o cerrar sesión"""
+    refresh_token: str
 
 
 class TokenPayload(BaseModel):
     """Esquema para payload de token JWT"""
-    sub: str 
\ No newline at end of file
+    sub: str
+    sid: Optional[str] = None 
\ No newline at end of file
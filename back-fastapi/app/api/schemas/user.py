@@ -1,14 +1,32 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Optional
 from uuid import UUID
 from datetime import datetime
 
 
+def normalize_email(email: str) -> str:
+    """
+    Normaliza un email para guardarlo y buscarlo (sin espacios y en minúsculas).
+    
+    Args:
+        email: Email tal como lo envía el cliente.
+        
+    Returns:
+        El email normalizado.
+    """
+    return email.strip().lower()
+
+
 class UserBase(BaseModel):
     """Esquema base para usuarios"""
     name: str
     email: EmailStr
 
+    @field_validator("email")
+    @classmethod
+    def _normalize_email(cls, value: str) -> str:
+        return normalize_email(value)
+
 
 class UserCreate(UserBase):
     """Esquema para crear usuarios"""
@@ -26,6 +44,11 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+    @field_validator("email")
+    @classmethod
+    def _normalize_email(cls, value: str) -> str:
+        return normalize_email(value)
+
 
 class UserUpdate(BaseModel):
     """Esquema para actualizar usuarios"""
@@ -33,12 +56,18 @@ class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     image_url: Optional[str] = None
 
+    @field_validator("email")
+    @classmethod
+    def _normalize_email(cls, value: Optional[str]) -> Optional[str]:
+        return normalize_email(value) if value is not None else None
+
 
 class UserInDBBase(UserBase):
     """Esquema base para usuarios en la base de datos"""
     id: UUID
     image_url: Optional[str] = None
     provider: Optional[str] = None
+    is_admin: bool = False
     created_at: datetime
     updated_at: datetime
 
@@ -58,4 +87,5 @@ class User(UserInDBBase):
 
 class UserWithToken(User):
     """Esquema para respuesta de usuario con token"""
-    token: str 
\ No newline at end of file
+    token: str
+    refresh_token: Optional[str] = None 
\ No newline at end of file
@@ -5,8 +5,9 @@ Este módulo contiene la configuración de la aplicación basada en variables de
 """
 
 import os
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set
 
 # Función helper para parsear booleanos de manera más segura
 def parse_bool(value, default=False):
@@ -18,54 +19,158 @@ def parse_bool(value, default=False):
     return default
 
 class Settings(BaseSettings):
-    """Configuración de la aplicación desde variables de entorno."""
+    """
+    Configuración de la aplicación desde variables de entorno.
+    
+    Se valida una sola vez al arrancar y es inmutable: los valores se leen como
+    atributos normales. Para aplicar cambios del entorno sin reiniciar se usa
+    `reload_settings`.
+    """
     
     # Información de la aplicación
     APP_NAME: str = "Cosmic Chaos Adventure API"
     APP_VERSION: str = "0.1.0"
     API_PREFIX: str = "/api"
     
-    # Usar nuestra función de parseo segura para booleanos en lugar de la validación automática de Pydantic
-    @property
-    def DEBUG(self) -> bool:
-        return parse_bool(os.getenv("DEBUG", "False"))
+    DEBUG: bool = False
     
     # Configuración de la base de datos
     # SQLite (default) - más fácil para desarrollo
-    @property
-    def USE_SQLITE(self) -> bool:
-        return parse_bool(os.getenv("USE_SQLITE", "True"))
+    USE_SQLITE: bool = True
     
-    SQLITE_DB_FILE: str = os.getenv("SQLITE_DB_FILE", "cosmic_chaos.db")
+    SQLITE_DB_FILE: str = "cosmic_chaos.db"
+    
+    # Guardar los UUID como BLOB de 16 bytes en SQLite (requiere una base de datos nueva)
+    SQLITE_BINARY_UUID: bool = False
     
     # PostgreSQL - para producción
-    POSTGRES_USER: str = os.getenv("POSTGRES_USER", "postgres")
-    POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
-    POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", "localhost")
-    POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
-    POSTGRES_DB: str = os.getenv("POSTGRES_DB", "cosmic_chaos")
+    POSTGRES_USER: str = "postgres"
+    POSTGRES_PASSWORD: str = "postgres"
+    POSTGRES_HOST: str = "localhost"
+    POSTGRES_PORT: str = "5432"
+    POSTGRES_DB: str = "cosmic_chaos"
     
     DATABASE_URL: Optional[str] = None
     
+    # Réplicas de solo lectura (URLs separadas por comas) para los endpoints GET
+    DATABASE_REPLICA_URLS: Optional[str] = None
+    # Segundos durante los que las lecturas de un cliente van al primario tras escribir
+    REPLICA_STICKY_SECONDS: float = 5.0
+    
     # Configuración para generación de preguntas
     OPENAI_API_KEY: Optional[str] = None
     GEMINI_API_KEY: Optional[str] = None
+    GENERATE_QUESTIONS_ON_DEMAND: bool = False
+    MIN_QUESTIONS_COUNT: int = 4
+    # Generación de imágenes con Gemini (activa por defecto, como antes de poder
+    # desactivarla en caliente)
+    IMAGE_GENERATION_ENABLED: bool = True
+    # Modo de generación inicial ("fallback", "simple" o "langgraph"). Sin definir
+    # se deduce de GENERATE_QUESTIONS_ON_DEMAND. Se puede cambiar en caliente
+    GENERATION_MODE: Optional[str] = None
+    # Llamadas concurrentes al LLM por proceso; las que superan el límite usan
+    # las preguntas de fallback
+    LLM_MAX_CONCURRENCY: int = 4
+    
+    # Servidor de producción (serve.py). SERVER_WORKERS=0 = un worker por CPU
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEP_ALIVE_SECONDS: int = 5
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
+    SERVER_PRELOAD: bool = True
+    
+    
+    # Cada cuántos segundos se comprueba si otro worker modificó el catálogo de
+    # artefactos (contador en la tabla cache_versions). 0 desactiva la comprobación
+    ARTIFACT_CATALOG_VERSION_CHECK_SECONDS: float = 5.0
+    
+    # Cada cuántos segundos comprueba cada worker si se cambió la configuración en
+    # caliente (/api/admin/runtime-config). 0 desactiva la comprobación
+    RUNTIME_CONFIG_CHECK_SECONDS: float = 5.0
+    
+    # Número máximo de aventuras compiladas en la caché de pasos de cada proceso
+    ADVENTURE_STEP_CACHE_SIZE: int = 256
+    
+    # Caché de usuarios autenticados (por `sub` del token). 0 desactiva la caché
+    USER_CACHE_TTL_SECONDS: float = 30.0
+    USER_CACHE_MAX_SIZE: int = 10000
+    
+    # Claves para firmar los JWT, compartidas por todos los workers. JWT_SECRET_KEYS
+    # admite varias claves "kid:secreto" separadas por comas para rotarlas: se firma
+    # con JWT_ACTIVE_KID (o la primera) y se aceptan todas. Sin claves configuradas
+    # se usa (y si no existe, se genera) el fichero JWT_KEY_FILE
+    JWT_SECRET_KEY: Optional[str] = None
+    JWT_SECRET_KEYS: Optional[str] = None
+    JWT_ACTIVE_KID: Optional[str] = None
+    JWT_KEY_FILE: str = "jwt_keys.json"
+    
+    # Tokens de acceso de vida corta renovables con un refresh token. Las sesiones
+    # revocadas se comprueban en memoria; el índice se reconstruye desde la base de
+    # datos cada REVOCATION_INDEX_REFRESH_SECONDS
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REVOCATION_INDEX_REFRESH_SECONDS: float = 10.0
+    
+    # Coste de bcrypt (2^rounds iteraciones). Los hashes con menos rondas se
+    # actualizan de forma transparente en el siguiente login
+    BCRYPT_ROUNDS: int = 12
+    # Pool de hilos para bcrypt: hilos y peticiones en espera admitidas antes de
+    # responder 503. 0 hilos = número de CPUs (máximo 4)
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    
+    # Intentos de login por minuto (y ráfaga máxima) por IP y por email. 0 desactiva
+    # el límite. Con LOGIN_RATE_LIMIT_SQLITE_FILE los contadores se comparten
+    # entre los workers de la máquina
+    LOGIN_ATTEMPTS_PER_MINUTE_IP: int = 30
+    LOGIN_ATTEMPTS_PER_MINUTE_EMAIL: int = 10
+    LOGIN_RATE_LIMIT_SQLITE_FILE: Optional[str] = None
+    
+    # CORS: orígenes, métodos y cabeceras permitidos separados por comas ("*" =
+    # cualquiera; en el preflight se responde con la lista explícita). Con
+    # credenciales se devuelve el origen de la petición en lugar de "*"
+    CORS_ALLOW_ORIGINS: str = "*"
+    CORS_ALLOW_CREDENTIALS: bool = True
+    CORS_ALLOW_METHODS: str = "*"
+    CORS_ALLOW_HEADERS: str = "*"
+    CORS_EXPOSE_HEADERS: str = "X-Next-Cursor, X-Total-Steps, Retry-After, X-Last-Write"
+    CORS_MAX_AGE: int = 86400
+    
+    # Logging: nivel general, niveles por módulo ("módulo=NIVEL" separados por
+    # comas), formato ("json" o "text") y tamaño de la cola del handler
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: Optional[str] = None
+    LOG_FORMAT: str = "json"
+    LOG_QUEUE_SIZE: int = 10000
     
-    @property
-    def GENERATE_QUESTIONS_ON_DEMAND(self) -> bool:
-        return parse_bool(os.getenv("GENERATE_QUESTIONS_ON_DEMAND", "False"))
+    # Token estático (Bearer) para que Prometheus lea /metrics; sin él solo
+    # pueden leerlo los administradores
+    METRICS_TOKEN: Optional[str] = None
+    # Directorio en el que los workers vuelcan sus métricas para sumarlas
+    # (serve.py usa uno temporal si no se indica) y cada cuánto lo hacen
+    METRICS_MULTIPROCESS_DIR: Optional[str] = None
+    METRICS_FLUSH_SECONDS: float = 5.0
     
-    @property
-    def MIN_QUESTIONS_COUNT(self) -> int:
+    # Usar nuestra función de parseo segura para booleanos en lugar de la validación automática de Pydantic
+    @field_validator(
+        "DEBUG", "USE_SQLITE", "SQLITE_BINARY_UUID", "GENERATE_QUESTIONS_ON_DEMAND",
+        "IMAGE_GENERATION_ENABLED", "CORS_ALLOW_CREDENTIALS", "SERVER_PRELOAD",
+        mode="before",
+    )
+    @classmethod
+    def _parse_bool(cls, value):
+        return parse_bool(value)
+    
+    @field_validator("MIN_QUESTIONS_COUNT", mode="before")
+    @classmethod
+    def _parse_min_questions_count(cls, value):
         try:
-            return int(os.getenv("MIN_QUESTIONS_COUNT", "4"))
-        except:
+            return int(value)
+        except (TypeError, ValueError):
             return 4
     
-    @property
-    def IMAGE_GENERATION_ENABLED(self) -> bool:
-        return parse_bool(os.getenv("IMAGE_GENERATION_ENABLED", "False"))
-    
     def get_database_url(self) -> str:
         """Retorna la URL de conexión a la base de datos."""
         if self.DATABASE_URL:
@@ -76,10 +181,33 @@ class Settings(BaseSettings):
         
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
+    def get_replica_urls(self) -> List[str]:
+        """Retorna las URLs de las réplicas de lectura configuradas."""
+        if not self.DATABASE_REPLICA_URLS:
+            return []
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+    
+    def get_cors_origins(self) -> List[str]:
+        """Retorna los orígenes permitidos para CORS."""
+        return [origin.strip() for origin in self.CORS_ALLOW_ORIGINS.split(",") if origin.strip()]
+    
+    def get_jwt_keys(self) -> Dict[str, str]:
+        """Retorna las claves JWT configuradas por kid (vacío si no hay ninguna)."""
+        keys: Dict[str, str] = {}
+        if self.JWT_SECRET_KEYS:
+            for item in self.JWT_SECRET_KEYS.split(","):
+                kid, _, secret = item.strip().partition(":")
+                if kid and secret:
+                    keys[kid] = secret
+        if self.JWT_SECRET_KEY:
+            keys.setdefault("default", self.JWT_SECRET_KEY)
+        return keys
+    
     model_config = {
         "env_file": ".env",
         "case_sensitive": True,
-        "extra": "ignore"  # Esto permite campos adicionales en el .env
+        "extra": "ignore",  # Esto permite campos adicionales en el .env
+        "frozen": True,
     }
 
 # Instancia global de configuración
@@ -95,17 +223,96 @@ except Exception as e:
         DEBUG = False
         USE_SQLITE = True
         SQLITE_DB_FILE = "cosmic_chaos.db"
+        SQLITE_BINARY_UUID = False
         OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
         GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-        GENERATE_QUESTIONS_ON_DEMAND = parse_bool(os.getenv("GENERATE_QUESTIONS_ON_DEMAND", "False"))
+        GENERATE_QUESTIONS_ON_DEMAND = False
         MIN_QUESTIONS_COUNT = 4
-        IMAGE_GENERATION_ENABLED = False
+        IMAGE_GENERATION_ENABLED = True
+        GENERATION_MODE = None
+        LLM_MAX_CONCURRENCY = 4
+        SERVER_HOST = "0.0.0.0"
+        SERVER_PORT = 8000
+        SERVER_WORKERS = 0
+        SERVER_BACKLOG = 2048
+        SERVER_KEEP_ALIVE_SECONDS = 5
+        SERVER_GRACEFUL_TIMEOUT_SECONDS = 30
+        SERVER_PRELOAD = True
+        DATABASE_REPLICA_URLS = None
+        REPLICA_STICKY_SECONDS = 5.0
+        ARTIFACT_CATALOG_VERSION_CHECK_SECONDS = 5.0
+        RUNTIME_CONFIG_CHECK_SECONDS = 5.0
+        ADVENTURE_STEP_CACHE_SIZE = 256
+        USER_CACHE_TTL_SECONDS = 30.0
+        USER_CACHE_MAX_SIZE = 10000
+        JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+        JWT_SECRET_KEYS = None
+        JWT_ACTIVE_KID = None
+        JWT_KEY_FILE = "jwt_keys.json"
+        ACCESS_TOKEN_EXPIRE_MINUTES = 15
+        REFRESH_TOKEN_EXPIRE_DAYS = 30
+        REVOCATION_INDEX_REFRESH_SECONDS = 10.0
+        BCRYPT_ROUNDS = 12
+        PASSWORD_HASH_WORKERS = 0
+        PASSWORD_HASH_MAX_QUEUE = 64
+        LOGIN_ATTEMPTS_PER_MINUTE_IP = 30
+        LOGIN_ATTEMPTS_PER_MINUTE_EMAIL = 10
+        LOGIN_RATE_LIMIT_SQLITE_FILE = None
+        CORS_ALLOW_ORIGINS = "*"
+        CORS_ALLOW_CREDENTIALS = True
+        CORS_ALLOW_METHODS = "*"
+        CORS_ALLOW_HEADERS = "*"
+        CORS_EXPOSE_HEADERS = "X-Next-Cursor, X-Total-Steps, Retry-After, X-Last-Write"
+        CORS_MAX_AGE = 86400
+        LOG_LEVEL = "INFO"
+        LOG_LEVELS = None
+        LOG_FORMAT = "json"
+        LOG_QUEUE_SIZE = 10000
+        METRICS_TOKEN = None
+        METRICS_MULTIPROCESS_DIR = None
+        METRICS_FLUSH_SECONDS = 5.0
         
         def get_database_url(self):
             return f"sqlite:///{self.SQLITE_DB_FILE}"
+        
+        def get_replica_urls(self):
+            return []
+        
+        def get_cors_origins(self):
+            return ["*"]
+        
+        def get_jwt_keys(self):
+            return {"default": self.JWT_SECRET_KEY} if self.JWT_SECRET_KEY else {}
     
     settings = SimpleSettings()
 
+
+def reload_settings() -> Set[str]:
+    """
+    Vuelve a leer la configuración del entorno (y del .env) y la aplica.
+    
+    La nueva configuración se valida completa antes de tocar nada; si no es
+    válida se lanza la excepción y se mantiene la actual. Los valores se
+    actualizan sobre la misma instancia, de modo que todos los módulos que
+    importaron `settings` ven los nuevos. Los componentes que copiaron un valor
+    al crearse (pools, cachés, motores) no cambian.
+    
+    Returns:
+        Nombres de los campos que han cambiado.
+        
+    Raises:
+        pydantic.ValidationError: Si la nueva configuración no es válida.
+    """
+    if not isinstance(settings, Settings):
+        return set()
+    fresh = Settings()
+    changed = {
+        name for name in Settings.model_fields
+        if getattr(fresh, name) != getattr(settings, name)
+    }
+    settings.__dict__.update(fresh.__dict__)
+    return changed
+
 # Función para obtener configuraciones de manera segura
 def get_setting(name, default=None):
     """Obtiene una configuración de manera segura, devolviendo el valor default si no existe."""
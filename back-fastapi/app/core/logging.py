@@ -0,0 +1,162 @@
+"""
+Configuración del logging de la aplicación.
+
+Los registros se encolan desde el hilo que los emite (una operación en memoria)
+y un hilo aparte los formatea y los escribe en stdout, de modo que escribir un
+log nunca bloquea el event loop. Si la cola se llena, los registros nuevos se
+descartan en lugar de frenar las peticiones.
+
+El formato es JSON (una línea por registro, con los campos `extra`) o texto, y
+el nivel se puede ajustar por módulo con LOG_LEVELS, p. ej.
+"app.services.langchain_graph=DEBUG,sqlalchemy.engine=INFO".
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+# Atributos propios de LogRecord; el resto son campos `extra`
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None)).keys()
+) | {"message", "asctime", "taskName"}
+
+
+class JSONFormatter(logging.Formatter):
+    """Formatea cada registro como un objeto JSON en una línea."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler que descarta los registros cuando la cola está llena.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Solo se resuelve el mensaje (los argumentos podrían cambiar después);
+        # el formateo completo lo hace el hilo del listener
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_log_levels(value: Optional[str]) -> Dict[str, str]:
+    """
+    Interpreta la lista de niveles por módulo.
+
+    Args:
+        value: Pares "módulo=NIVEL" separados por comas.
+
+    Returns:
+        Diccionario módulo -> nivel en mayúsculas.
+    """
+    levels: Dict[str, str] = {}
+    for item in (value or "").split(","):
+        name, _, level = item.strip().partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def setup_logging(config=settings) -> QueueListener:
+    """
+    Configura el logging del proceso.
+
+    Sustituye los handlers del logger raíz por un único DroppingQueueHandler y
+    arranca el hilo que escribe en stdout. Se puede llamar de nuevo (por
+    ejemplo, en cada worker tras un fork): el listener anterior se detiene.
+
+    Args:
+        config: Configuración de la aplicación.
+
+    Returns:
+        El listener que vacía la cola.
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        if config.LOG_FORMAT == "json":
+            stream_handler.setFormatter(JSONFormatter())
+        else:
+            stream_handler.setFormatter(
+                logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+            )
+
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(DroppingQueueHandler(log_queue))
+        root.setLevel(config.LOG_LEVEL.upper())
+
+        for name, level in parse_log_levels(config.LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+
+        _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        return _listener
+
+
+def shutdown_logging() -> None:
+    """Escribe los registros pendientes y detiene el listener."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _forget_listener_after_fork() -> None:
+    # El hilo del listener no existe en el proceso hijo y su cola pudo quedar
+    # bloqueada durante el fork: el hijo debe llamar a setup_logging de nuevo
+    global _listener, _listener_lock
+    _listener = None
+    _listener_lock = threading.Lock()
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_listener_after_fork)
@@ -0,0 +1,507 @@
+"""
+Métricas de la aplicación en memoria, sin servicios externos.
+
+Recoge por proceso:
+
+- Histogramas de latencia por ruta (plantilla de la ruta, no la URL concreta),
+  con los percentiles p50/p95/p99 estimados a partir de los buckets.
+- Consultas a la base de datos por petición (número y tiempo) mediante eventos
+  de SQLAlchemy. Las consultas se atribuyen a la petición en curso a través de
+  una contextvar, que también se propaga a los hilos del threadpool.
+- Llamadas a modelos de lenguaje por nodo (número, errores y latencia).
+
+`metrics.render()` las devuelve en el formato de texto de Prometheus.
+
+Con varios workers (serve.py), cada uno vuelca sus métricas periódicamente en
+un directorio compartido y `render()` suma las de todos, de modo que da igual
+qué worker atienda el scrape.
+"""
+
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+# Límites superiores de los buckets de latencia, en segundos
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Histograma acumulativo de buckets fijos, al estilo de Prometheus."""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        # Un bucket por límite más el de +Inf
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Registra una observación (sin bloqueo: lo hace el registro)."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, counts: Sequence[int], total: float) -> None:
+        """
+        Suma las observaciones de otro histograma con los mismos buckets.
+
+        Args:
+            counts: Observaciones por bucket (no acumuladas).
+            total: Suma de los valores observados.
+        """
+        for index, bucket_count in enumerate(counts):
+            self.counts[index] += bucket_count
+        self.count += sum(counts)
+        self.sum += total
+
+    def quantile(self, q: float) -> float:
+        """
+        Estima un percentil interpolando linealmente dentro de su bucket.
+
+        Args:
+            q: Percentil entre 0 y 1.
+
+        Returns:
+            El valor estimado, o 0 si no hay observaciones.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if index == len(self.bounds):
+                    # Por encima del último límite no hay nada con qué interpolar
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.bounds[-1]
+
+
+class RequestStats:
+    """Contadores de la petición en curso."""
+
+    __slots__ = ("db_queries", "db_seconds")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class RouteMetrics:
+    """Métricas acumuladas de una ruta."""
+
+    __slots__ = ("latency", "responses", "db_queries", "db_seconds")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.responses: Dict[str, int] = {}
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+class LLMMetrics:
+    """Métricas acumuladas de un nodo de generación."""
+
+    __slots__ = ("latency", "errors")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.errors = 0
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas del proceso.
+
+    Todas las actualizaciones se hacen bajo un único lock; son operaciones de
+    unos pocos incrementos, así que la contención es despreciable.
+    """
+
+    def __init__(self, multiprocess_dir: Optional[str] = None, flush_seconds: float = 5.0):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self._llm: Dict[str, LLMMetrics] = {}
+        self._db_queries_total = 0
+        self._db_seconds_total = 0.0
+        # Métricas externas (nombre, ayuda, función que devuelve el valor por etiqueta)
+        self._collectors: List[Tuple[str, str, Callable[[], Dict[str, float]]]] = []
+        self.multiprocess_dir = multiprocess_dir
+        self.flush_seconds = flush_seconds
+        self._flusher_pid: Optional[int] = None
+
+    def enable_multiprocess(self, directory: str) -> None:
+        """
+        Comparte las métricas entre los workers de un servidor pre-fork.
+
+        Se llama en el proceso maestro antes del fork. Cada worker vuelca sus
+        métricas en `directory/<pid>.json` cada `flush_seconds` y al terminar.
+
+        Args:
+            directory: Directorio compartido por los workers.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            os.remove(path)
+        self.multiprocess_dir = directory
+
+    def _ensure_flusher(self) -> None:
+        # El hilo no sobrevive al fork: cada worker arranca el suyo
+        if self.multiprocess_dir is None or self._flusher_pid == os.getpid():
+            return
+        self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    def start_request(self) -> RequestStats:
+        """
+        Empieza a contabilizar las consultas de la petición en curso.
+
+        Returns:
+            Los contadores de la petición, que hay que pasar a `observe_request`.
+        """
+        self._ensure_flusher()
+        stats = RequestStats()
+        _request_stats.set(stats)
+        return stats
+
+    def observe_request(
+        self, method: str, route: str, status_code: int, seconds: float, stats: RequestStats
+    ) -> None:
+        """
+        Registra una petición terminada.
+
+        Args:
+            method: Método HTTP.
+            route: Plantilla de la ruta.
+            status_code: Código de estado de la respuesta.
+            seconds: Duración de la petición.
+            stats: Contadores devueltos por `start_request`.
+        """
+        status_class = f"{status_code // 100}xx"
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            metrics.latency.observe(seconds)
+            metrics.responses[status_class] = metrics.responses.get(status_class, 0) + 1
+            metrics.db_queries += stats.db_queries
+            metrics.db_seconds += stats.db_seconds
+
+    def observe_query(self, seconds: float) -> None:
+        """Registra una consulta a la base de datos."""
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_seconds += seconds
+        with self._lock:
+            self._db_queries_total += 1
+            self._db_seconds_total += seconds
+
+    def observe_llm_call(self, node: str, seconds: float, error: bool = False) -> None:
+        """
+        Registra una llamada a un modelo de lenguaje.
+
+        Args:
+            node: Nombre del nodo que hace la llamada.
+            seconds: Duración de la llamada.
+            error: Si la llamada ha fallado.
+        """
+        with self._lock:
+            metrics = self._llm.get(node)
+            if metrics is None:
+                metrics = self._llm[node] = LLMMetrics()
+            metrics.latency.observe(seconds)
+            if error:
+                metrics.errors += 1
+
+    @contextmanager
+    def track_llm_call(self, node: str) -> Iterator[None]:
+        """
+        Mide una llamada a un modelo de lenguaje.
+
+        Uso::
+
+            with metrics.track_llm_call("generate_question"):
+                result = chain.invoke(...)
+
+        Args:
+            node: Nombre del nodo que hace la llamada.
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe_llm_call(node, time.perf_counter() - started_at, error=True)
+            raise
+        self.observe_llm_call(node, time.perf_counter() - started_at)
+
+    def register_collector(self, name: str, help_text: str, collect: Callable[[], Dict[str, float]]) -> None:
+        """
+        Añade una métrica calculada en el momento de exportar.
+
+        Args:
+            name: Nombre de la métrica.
+            help_text: Descripción de la métrica.
+            collect: Función que devuelve un valor por cada valor de la etiqueta `stat`.
+        """
+        self._collectors.append((name, help_text, collect))
+
+    def reset(self) -> None:
+        """Descarta todas las métricas acumuladas."""
+        with self._lock:
+            self._routes.clear()
+            self._llm.clear()
+            self._db_queries_total = 0
+            self._db_seconds_total = 0.0
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """Estado del proceso serializable a JSON (los collectors se evalúan ahora)."""
+        with self._lock:
+            snapshot = {
+                "routes": [
+                    [method, route, m.latency.counts, m.latency.sum, m.responses, m.db_queries, m.db_seconds]
+                    for (method, route), m in self._routes.items()
+                ],
+                "llm": [[node, m.latency.counts, m.latency.sum, m.errors] for node, m in self._llm.items()],
+                "db_queries": self._db_queries_total,
+                "db_seconds": self._db_seconds_total,
+            }
+        snapshot["collectors"] = {name: collect() for name, _, collect in self._collectors}
+        return snapshot
+
+    def flush(self) -> None:
+        """Vuelca las métricas del proceso en el directorio compartido, si lo hay."""
+        if self.multiprocess_dir is None:
+            return
+        path = os.path.join(self.multiprocess_dir, f"{os.getpid()}.json")
+        with open(f"{path}.tmp", "w") as snapshot_file:
+            json.dump(self._snapshot(), snapshot_file)
+        os.replace(f"{path}.tmp", path)
+
+    def _load_snapshots(self) -> Dict[int, Dict[str, Any]]:
+        """Métricas de todos los workers: las propias en vivo y las del resto de sus ficheros."""
+        snapshots: Dict[int, Dict[str, Any]] = {}
+        for path in glob.glob(os.path.join(self.multiprocess_dir, "*.json")):
+            try:
+                pid = int(os.path.basename(path)[:-len(".json")])
+                with open(path) as snapshot_file:
+                    snapshots[pid] = json.load(snapshot_file)
+            except (ValueError, OSError):
+                continue
+        snapshots[os.getpid()] = self._snapshot()
+        return snapshots
+
+    def _merge(self, snapshots: Dict[int, Dict[str, Any]]):
+        """
+        Suma las métricas de varios workers. Los contadores de un worker que ya
+        ha terminado se conservan; sus collectors (valores instantáneos), no.
+        """
+        routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        llm: Dict[str, LLMMetrics] = {}
+        db_queries, db_seconds = 0, 0.0
+        collectors: Dict[str, List[Tuple[Dict[str, str], Dict[str, float]]]] = {}
+        for pid, snapshot in sorted(snapshots.items()):
+            for method, route, counts, total, responses, queries, seconds in snapshot["routes"]:
+                metrics = routes.get((method, route))
+                if metrics is None:
+                    metrics = routes[(method, route)] = RouteMetrics()
+                metrics.latency.merge(counts, total)
+                for status_class, count in responses.items():
+                    metrics.responses[status_class] = metrics.responses.get(status_class, 0) + count
+                metrics.db_queries += queries
+                metrics.db_seconds += seconds
+            for node, counts, total, errors in snapshot["llm"]:
+                metrics = llm.get(node)
+                if metrics is None:
+                    metrics = llm[node] = LLMMetrics()
+                metrics.latency.merge(counts, total)
+                metrics.errors += errors
+            db_queries += snapshot["db_queries"]
+            db_seconds += snapshot["db_seconds"]
+            if pid == os.getpid() or _pid_alive(pid):
+                for name, values in snapshot.get("collectors", {}).items():
+                    collectors.setdefault(name, []).append(({"worker": str(pid)}, values))
+        return routes, llm, db_queries, db_seconds, collectors
+
+    def _render_histogram(self, lines: List[str], name: str, histogram: Histogram, labels: str) -> None:
+        prefix = f"{labels}," if labels else ""
+        cumulative = 0
+        for bound, bucket_count in zip(histogram.bounds, histogram.counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{labels}}} {_format_float(histogram.sum)}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+    def _render_quantiles(self, lines: List[str], name: str, histogram: Histogram, labels: str) -> None:
+        for q in QUANTILES:
+            lines.append(f'{name}{{{labels},quantile="{q}"}} {_format_float(histogram.quantile(q))}')
+
+    def render(self) -> str:
+        """
+        Exporta las métricas en el formato de texto de Prometheus.
+
+        Con el modo multiproceso activo se exportan las de todos los workers:
+        contadores e histogramas sumados y collectors con la etiqueta `worker`.
+
+        Returns:
+            Texto con las métricas.
+        """
+        if self.multiprocess_dir is not None:
+            routes, llm, db_queries, db_seconds, collectors = self._merge(self._load_snapshots())
+            return self._render(sorted(routes.items()), sorted(llm.items()), db_queries, db_seconds, collectors)
+
+        with self._lock:
+            routes = sorted(self._routes.items())
+            llm = sorted(self._llm.items())
+            db_queries, db_seconds = self._db_queries_total, self._db_seconds_total
+            # Instantánea: el resto del proceso sigue actualizando los objetos
+            text = self._render(routes, llm, db_queries, db_seconds, {})
+        collectors = {name: [({}, collect())] for name, _, collect in self._collectors}
+        return text + self._render_collectors(collectors)
+
+    def _render(self, routes, llm, db_queries: int, db_seconds: float, collectors) -> str:
+        lines: List[str] = []
+        lines.append("# HELP http_request_duration_seconds Latencia de las peticiones por ruta.")
+        lines.append("# TYPE http_request_duration_seconds histogram")
+        for (method, route), metrics in routes:
+            self._render_histogram(
+                lines, "http_request_duration_seconds", metrics.latency,
+                _labels(method=method, route=route),
+            )
+
+        lines.append("# HELP http_request_duration_quantile_seconds Percentiles estimados de latencia por ruta.")
+        lines.append("# TYPE http_request_duration_quantile_seconds gauge")
+        for (method, route), metrics in routes:
+            self._render_quantiles(
+                lines, "http_request_duration_quantile_seconds", metrics.latency,
+                _labels(method=method, route=route),
+            )
+
+        lines.append("# HELP http_responses_total Respuestas por ruta y clase de código de estado.")
+        lines.append("# TYPE http_responses_total counter")
+        for (method, route), metrics in routes:
+            for status_class, count in sorted(metrics.responses.items()):
+                labels = _labels(method=method, route=route, status=status_class)
+                lines.append(f"http_responses_total{{{labels}}} {count}")
+
+        lines.append("# HELP http_request_db_queries_total Consultas a la base de datos por ruta.")
+        lines.append("# TYPE http_request_db_queries_total counter")
+        for (method, route), metrics in routes:
+            labels = _labels(method=method, route=route)
+            lines.append(f"http_request_db_queries_total{{{labels}}} {metrics.db_queries}")
+
+        lines.append("# HELP http_request_db_seconds_total Tiempo en consultas a la base de datos por ruta.")
+        lines.append("# TYPE http_request_db_seconds_total counter")
+        for (method, route), metrics in routes:
+            labels = _labels(method=method, route=route)
+            lines.append(f"http_request_db_seconds_total{{{labels}}} {_format_float(metrics.db_seconds)}")
+
+        lines.append("# HELP db_queries_total Consultas a la base de datos del proceso.")
+        lines.append("# TYPE db_queries_total counter")
+        lines.append(f"db_queries_total {db_queries}")
+        lines.append("# HELP db_query_seconds_total Tiempo total en consultas a la base de datos.")
+        lines.append("# TYPE db_query_seconds_total counter")
+        lines.append(f"db_query_seconds_total {_format_float(db_seconds)}")
+
+        lines.append("# HELP llm_call_duration_seconds Latencia de las llamadas a modelos por nodo.")
+        lines.append("# TYPE llm_call_duration_seconds histogram")
+        for node, metrics in llm:
+            self._render_histogram(lines, "llm_call_duration_seconds", metrics.latency, _labels(node=node))
+
+        lines.append("# HELP llm_call_duration_quantile_seconds Percentiles estimados de latencia por nodo.")
+        lines.append("# TYPE llm_call_duration_quantile_seconds gauge")
+        for node, metrics in llm:
+            self._render_quantiles(lines, "llm_call_duration_quantile_seconds", metrics.latency, _labels(node=node))
+
+        lines.append("# HELP llm_call_errors_total Llamadas a modelos fallidas por nodo.")
+        lines.append("# TYPE llm_call_errors_total counter")
+        for node, metrics in llm:
+            lines.append(f"llm_call_errors_total{{{_labels(node=node)}}} {metrics.errors}")
+
+        return "\n".join(lines) + "\n" + self._render_collectors(collectors)
+
+    def _render_collectors(self, collectors) -> str:
+        lines: List[str] = []
+        for name, help_text, _ in self._collectors:
+            if name not in collectors:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, values in collectors[name]:
+                for stat, value in sorted(values.items()):
+                    lines.append(f"{name}{{{_labels(stat=stat, **labels)}}} {_format_float(value)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+metrics = MetricsRegistry(settings.METRICS_MULTIPROCESS_DIR, settings.METRICS_FLUSH_SECONDS)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started_at")
+    if started:
+        metrics.observe_query(time.perf_counter() - started.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # La consulta fallida no llega a after_cursor_execute
+    conn = exception_context.connection
+    started = conn.info.get("query_started_at") if conn is not None else None
+    if started:
+        started.pop()
@@ -0,0 +1,178 @@
+"""
+Limitación de intentos de login con token buckets.
+
+Cada clave (IP o email) tiene un bucket de `capacity` intentos que se rellena a
+razón de `rate` intentos por segundo. Los intentos se descuentan antes de hacer
+cualquier trabajo de bcrypt, de modo que un ataque de fuerza bruta o de
+credential stuffing no puede saturar la CPU del servidor.
+
+Los buckets se guardan en memoria (por proceso) o, si se configura
+LOGIN_RATE_LIMIT_SQLITE_FILE, en un fichero SQLite compartido por todos los
+workers de la máquina.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+class MemoryBucketStore:
+    """
+    Buckets en memoria del proceso.
+
+    Cada bucket guarda su capacidad y su ritmo, ya que un mismo almacén lo
+    comparten límites distintos (por IP y por email).
+    """
+
+    # Tamaño a partir del cual se purgan los buckets que ya están llenos
+    _MAX_BUCKETS = 100000
+
+    def __init__(self):
+        # clave -> (tokens, updated_at, capacity, rate)
+        self._buckets: Dict[str, Tuple[float, float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, capacity: float, rate: float) -> float:
+        """
+        Intenta consumir un token del bucket.
+
+        Args:
+            key: Clave del bucket.
+            capacity: Tokens máximos del bucket.
+            rate: Tokens que se recuperan por segundo.
+
+        Returns:
+            0 si se ha consumido el token, o los segundos que faltan para que
+            haya uno disponible.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at, _, _ = self._buckets.get(key, (capacity, now, capacity, rate))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, capacity, rate)
+                return (1 - tokens) / rate
+
+            self._buckets[key] = (tokens - 1, now, capacity, rate)
+            if len(self._buckets) > self._MAX_BUCKETS:
+                self._purge(now)
+            return 0.0
+
+    def _purge(self, now: float) -> None:
+        """Elimina los buckets que ya se han rellenado por completo."""
+        self._buckets = {
+            key: bucket
+            for key, bucket in self._buckets.items()
+            if bucket[0] + (now - bucket[1]) * bucket[3] < bucket[2]
+        }
+
+
+class SQLiteBucketStore:
+    """
+    Buckets en un fichero SQLite, compartidos entre procesos.
+
+    Cada intento es una única sentencia INSERT ... ON CONFLICT DO UPDATE ...
+    RETURNING, atómica aunque varios workers accedan a la vez.
+    """
+
+    _ACQUIRE_SQL = """
+        INSERT INTO rate_limit_buckets (key, tokens, updated_at)
+        VALUES (:key, :capacity - 1, :now)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = min(:capacity, tokens + (:now - updated_at) * :rate) - 1,
+            updated_at = :now
+        WHERE min(:capacity, tokens + (:now - updated_at) * :rate) >= 1
+        RETURNING tokens
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # Una conexión por hilo, en modo autocommit
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def acquire(self, key: str, capacity: float, rate: float) -> float:
+        """
+        Intenta consumir un token del bucket.
+
+        Args:
+            key: Clave del bucket.
+            capacity: Tokens máximos del bucket.
+            rate: Tokens que se recuperan por segundo.
+
+        Returns:
+            0 si se ha consumido el token, o los segundos que faltan para que
+            haya uno disponible.
+        """
+        # Reloj de pared: los buckets se comparten entre procesos
+        now = time.time()
+        connection = self._connection()
+        params = {"key": key, "capacity": capacity, "rate": rate, "now": now}
+        if connection.execute(self._ACQUIRE_SQL, params).fetchone() is not None:
+            return 0.0
+
+        row = connection.execute(
+            "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+        ).fetchone()
+        tokens = min(capacity, row[0] + (now - row[1]) * rate) if row else capacity
+        return max(0.0, (1 - tokens) / rate)
+
+
+class LoginRateLimiter:
+    """
+    Limita los intentos de login por IP y por email.
+
+    Los límites se expresan en intentos por minuto, que es también la ráfaga
+    máxima admitida. Un límite de 0 desactiva esa comprobación.
+    """
+
+    def __init__(self, store, per_ip_per_minute: int = 30, per_email_per_minute: int = 10):
+        self.store = store
+        self.per_ip_per_minute = per_ip_per_minute
+        self.per_email_per_minute = per_email_per_minute
+
+    def _acquire(self, key: str, per_minute: int) -> float:
+        if per_minute <= 0:
+            return 0.0
+        return self.store.acquire(key, per_minute, per_minute / 60.0)
+
+    def check(self, *, ip: Optional[str], email: str) -> float:
+        """
+        Registra un intento de login.
+
+        Args:
+            ip: IP del cliente, o None si no se conoce.
+            email: Email con el que se intenta iniciar sesión.
+
+        Returns:
+            0 si el intento está permitido, o los segundos que el cliente debe
+            esperar antes de volver a intentarlo.
+        """
+        if ip:
+            retry_after = self._acquire(f"ip:{ip}", self.per_ip_per_minute)
+            if retry_after:
+                return retry_after
+        return self._acquire(f"email:{email.strip().lower()}", self.per_email_per_minute)
+
+
+login_rate_limiter = LoginRateLimiter(
+    SQLiteBucketStore(settings.LOGIN_RATE_LIMIT_SQLITE_FILE)
+    if settings.LOGIN_RATE_LIMIT_SQLITE_FILE
+    else MemoryBucketStore(),
+    per_ip_per_minute=settings.LOGIN_ATTEMPTS_PER_MINUTE_IP,
+    per_email_per_minute=settings.LOGIN_ATTEMPTS_PER_MINUTE_EMAIL,
+)
@@ -1,28 +1,157 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
-from jose import jwt
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, Union
+from jose import jwt, JWTError
 from passlib.context import CryptContext
+import asyncio
+import hashlib
+import json
+import logging
+import os
 import secrets
+import tempfile
+import threading
+import time
 from uuid import UUID
 
 from app.core.config import settings
+from app.core.metrics import metrics
 
-# Contexto para encriptar y verificar contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+# Contexto para encriptar y verificar contraseñas. Con min_rounds igual al
+# coste configurado, los hashes antiguos con menos rondas necesitan actualizarse
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+T = TypeVar("T")
 
-# Generador de tokens para reseteo de contraseñas o verificación de email
-SECRET_KEY = secrets.token_urlsafe(32)
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 8  # 8 días
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
+
+
+class KeySet:
+    """
+    Conjunto de claves para firmar y verificar los JWT, identificadas por `kid`.
+    
+    Los tokens se firman con la clave activa e incluyen su `kid` en la cabecera;
+    se aceptan los firmados con cualquiera de las claves del conjunto, de modo que
+    para rotar basta con añadir la clave nueva como activa y mantener la anterior
+    hasta que caduquen sus tokens.
+    """
+    
+    __slots__ = ("active_kid", "keys")
+    
+    def __init__(self, keys: Dict[str, str], active_kid: Optional[str] = None):
+        if not keys:
+            raise ValueError("El conjunto de claves JWT está vacío")
+        if active_kid is None:
+            active_kid = next(iter(keys))
+        if active_kid not in keys:
+            raise ValueError(f"La clave JWT activa '{active_kid}' no existe")
+        self.keys = dict(keys)
+        self.active_kid = active_kid
+    
+    @property
+    def active_key(self) -> str:
+        return self.keys[self.active_kid]
+    
+    def get(self, kid: Optional[str]) -> Optional[str]:
+        """
+        Obtiene la clave para verificar un token.
+        
+        Args:
+            kid: `kid` de la cabecera del token. Los tokens sin `kid` se
+                verifican con la clave activa.
+                
+        Returns:
+            La clave, o None si el `kid` no es conocido.
+        """
+        if kid is None:
+            return self.active_key
+        return self.keys.get(kid)
+
+
+def _read_key_file(path: str) -> KeySet:
+    """Lee un fichero de claves JSON con el formato {"active_kid": ..., "keys": {kid: secreto}}."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return KeySet(data["keys"], data.get("active_kid"))
+
+
+def _create_key_file(path: str) -> None:
+    """
+    Genera un fichero de claves con una clave aleatoria si todavía no existe.
+    
+    El fichero se escribe completo en un temporal y se enlaza con el nombre
+    final, que falla si ya existe: si varios workers arrancan a la vez solo uno
+    crea las claves y el resto leen las mismas.
+    """
+    kid = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    data = {"active_kid": kid, "keys": {kid: secrets.token_urlsafe(32)}}
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".jwt_keys")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.chmod(tmp_path, 0o600)
+        os.link(tmp_path, path)
+        logger.warning(f"No hay claves JWT configuradas: generado el fichero de claves {path}")
+    except FileExistsError:
+        pass
+    finally:
+        os.unlink(tmp_path)
+
+
+def load_key_set() -> KeySet:
+    """
+    Carga las claves JWT de la configuración o, si no hay, del fichero de claves.
+    
+    Returns:
+        Conjunto de claves.
+    """
+    keys = settings.get_jwt_keys()
+    if keys:
+        return KeySet(keys, settings.JWT_ACTIVE_KID)
+    
+    if not os.path.exists(settings.JWT_KEY_FILE):
+        _create_key_file(settings.JWT_KEY_FILE)
+    return _read_key_file(settings.JWT_KEY_FILE)
+
 
+# Claves cargadas una vez por proceso
+key_set = load_key_set()
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+
+def reload_key_set() -> KeySet:
+    """
+    Vuelve a cargar las claves JWT (p. ej. tras añadir una clave para rotarlas).
+    
+    Returns:
+        El nuevo conjunto de claves.
+    """
+    global key_set
+    key_set = load_key_set()
+    return key_set
+
+
+def create_access_token(
+    subject: Union[str, Any], expires_delta: timedelta = None, session_id: Optional[UUID] = None
+) -> str:
     """
     Crea un token JWT de acceso.
     
     Args:
         subject: Identificador del usuario (generalmente id).
         expires_delta: Tiempo de expiración opcional.
+        session_id: Sesión (refresh token) a la que pertenece el token. Se
+            incluye como claim `sid` para poder revocarlo.
         
     Returns:
         Token JWT encodado.
@@ -33,10 +162,56 @@ def create_access_token(subject: Union[str, Any], expires_delta: timedelta = Non
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    if session_id is not None:
+        to_encode["sid"] = str(session_id)
+    keys = key_set
+    encoded_jwt = jwt.encode(
+        to_encode, keys.active_key, algorithm=ALGORITHM, headers={"kid": keys.active_kid}
+    )
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """
+    Verifica un token JWT con la clave de su `kid` y devuelve sus claims.
+    
+    Args:
+        token: Token JWT.
+        
+    Returns:
+        Claims del token.
+        
+    Raises:
+        JWTError: Si el token es inválido, ha caducado o su `kid` no es conocido.
+    """
+    kid = jwt.get_unverified_header(token).get("kid")
+    key = key_set.get(kid)
+    if key is None:
+        raise JWTError(f"Clave JWT desconocida: {kid}")
+    return jwt.decode(token, key, algorithms=[ALGORITHM])
+
+
+def generate_refresh_token() -> str:
+    """Genera un refresh token opaco y aleatorio."""
+    return secrets.token_urlsafe(32)
+
+
+def hash_token(token: str) -> str:
+    """
+    Calcula el hash con el que se guarda y busca un refresh token.
+    
+    Los refresh tokens son aleatorios y largos, así que basta con SHA-256
+    (no hace falta un hash lento como bcrypt).
+    
+    Args:
+        token: Token en claro.
+        
+    Returns:
+        SHA-256 del token en hexadecimal.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verifica si una contraseña plana coincide con la contraseña hasheada.
@@ -61,4 +236,163 @@ def get_password_hash(password: str) -> str:
     Returns:
         Hash de la contraseña.
     """
-    return pwd_context.hash(password) 
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+class PasswordHasherBusyError(Exception):
+    """El pool de hashing de contraseñas tiene la cola llena."""
+
+
+class PasswordHasher:
+    """
+    Ejecuta bcrypt en un pool de hilos acotado, fuera del event loop.
+    
+    bcrypt libera el GIL mientras calcula el hash, así que los hilos trabajan en
+    paralelo y el event loop sigue atendiendo el resto de peticiones. Si ya hay
+    `max_queue` operaciones esperando un hilo libre, se rechaza la nueva con
+    `PasswordHasherBusyError` en lugar de acumular latencia.
+    """
+    
+    def __init__(self, workers: int = 0, max_queue: int = 64):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # El pool se crea en el primer uso (y no antes de un posible fork)
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="password-hash"
+                    )
+        return self._executor
+    
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Ejecuta una función de hashing en el pool.
+        
+        Args:
+            func: Función a ejecutar.
+            args: Argumentos de la función.
+            
+        Returns:
+            El resultado de la función.
+            
+        Raises:
+            PasswordHasherBusyError: Si la cola del pool está llena.
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise PasswordHasherBusyError()
+            self._pending += 1
+        
+        submitted_at = time.monotonic()
+        
+        def timed_call() -> T:
+            started_at = time.monotonic()
+            try:
+                return func(*args)
+            finally:
+                finished_at = time.monotonic()
+                with self._lock:
+                    self._wait_seconds += started_at - submitted_at
+                    self._run_seconds += finished_at - started_at
+        
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), timed_call)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        Métricas del pool: operaciones en curso o en cola, completadas,
+        rechazadas y tiempos acumulados de espera y de cálculo.
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "queued": max(0, self._pending - self.workers),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_seconds_total": self._wait_seconds,
+                "run_seconds_total": self._run_seconds,
+            }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+metrics.register_collector(
+    "password_hasher", "Estado del pool de hashing de contraseñas.", password_hasher.stats
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica una contraseña en el pool de hashing.
+    
+    Args:
+        plain_password: Contraseña en texto plano.
+        hashed_password: Contraseña hasheada.
+        
+    Returns:
+        Tupla (coincide, nuevo hash). El nuevo hash no es None cuando la contraseña
+        es correcta pero su hash usa parámetros antiguos y debe guardarse de nuevo.
+        
+    Raises:
+        PasswordHasherBusyError: Si la cola del pool está llena.
+    """
+    return await password_hasher.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+# Hash de una contraseña aleatoria para igualar el tiempo de respuesta cuando el
+# usuario no existe; se calcula en el primer uso
+_dummy_hash: Optional[str] = None
+
+
+async def verify_dummy_password_async(plain_password: str) -> None:
+    """
+    Hace una verificación de bcrypt que siempre falla.
+    
+    Se usa cuando el email no existe, para que el login tarde lo mismo que con
+    un email válido y la respuesta no revele qué emails están registrados.
+    
+    Args:
+        plain_password: Contraseña en texto plano recibida.
+        
+    Raises:
+        PasswordHasherBusyError: Si la cola del pool está llena.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await password_hasher.run(pwd_context.hash, secrets.token_urlsafe(16))
+    await password_hasher.run(pwd_context.verify, plain_password, _dummy_hash)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Genera un hash de contraseña en el pool de hashing.
+    
+    Args:
+        password: Contraseña en texto plano.
+        
+    Returns:
+        Hash de la contraseña.
+        
+    Raises:
+        PasswordHasherBusyError: Si la cola del pool está llena.
+    """
+    return await password_hasher.run(pwd_context.hash, password)
@@ -0,0 +1,196 @@
+"""
+Preparación de la base de datos al arrancar.
+
+Sustituye al antiguo `create_all` en cada arranque: se compara la revisión de
+Alembic de la base de datos con la de las migraciones, se crea el esquema
+cuando la base de datos está vacía y se migran las bases de datos sin revisión
+creadas por versiones anteriores. Todo ello, junto con los datos iniciales,
+se hace bajo un lock entre procesos (advisory lock en PostgreSQL, fichero de
+lock en SQLite), de modo que N workers pueden arrancar a la vez sin pisarse:
+el primero prepara la base de datos y el resto solo comprueba que está lista.
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.init_db import init_db
+from app.db.session import Base, SessionLocal, engine as default_engine
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+# Revisión del esquema que creaban con `create_all` las versiones anteriores a
+# las migraciones; las bases de datos sin revisión se marcan con ella
+LEGACY_REVISION = "7b42f607336b"
+
+# Clave del advisory lock de PostgreSQL para la preparación de la base de datos
+BOOTSTRAP_LOCK_KEY = 0x436F736D6963  # "Cosmic"
+
+# Lock para los hilos del propio proceso (flock es por descriptor de fichero)
+_process_lock = threading.Lock()
+
+
+class SchemaOutOfDateError(RuntimeError):
+    """La base de datos no está en la última revisión de las migraciones."""
+
+
+@contextmanager
+def _sqlite_file_lock(database: str) -> Iterator[None]:
+    """Lock exclusivo sobre un fichero junto a la base de datos SQLite."""
+    if fcntl is None or not database or database == ":memory:":
+        yield
+        return
+    with open(f"{database}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def bootstrap_lock(engine: Engine) -> Iterator[None]:
+    """
+    Lock entre procesos para preparar la base de datos.
+
+    Args:
+        engine: Motor de la base de datos.
+    """
+    with _process_lock:
+        if engine.dialect.name == "postgresql":
+            with engine.connect() as connection:
+                connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": BOOTSTRAP_LOCK_KEY})
+                try:
+                    yield
+                finally:
+                    connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": BOOTSTRAP_LOCK_KEY})
+                    connection.commit()
+        elif engine.dialect.name == "sqlite":
+            with _sqlite_file_lock(engine.url.database):
+                yield
+        else:
+            yield
+
+
+def _matches_models(context: MigrationContext) -> bool:
+    """
+    Indica si la base de datos ya tiene todas las tablas, columnas, índices y
+    restricciones de los modelos.
+
+    Solo se tienen en cuenta los elementos que faltan: las diferencias de tipos o
+    valores por defecto dependen del dialecto y no indican una migración pendiente.
+
+    Args:
+        context: Contexto de migración sobre la conexión.
+
+    Returns:
+        True si no falta nada en la base de datos.
+    """
+    missing = ("add_table", "add_column", "add_index", "add_constraint")
+    return not any(
+        isinstance(diff, tuple) and diff[0] in missing
+        for diff in compare_metadata(context, Base.metadata)
+    )
+
+
+def ensure_schema(connection: Connection) -> None:
+    """
+    Comprueba la revisión de Alembic y crea el esquema si la base de datos está vacía.
+
+    - Sin tablas: se crean todas y se marca la revisión actual (stamp head).
+    - En la última revisión: no se hace nada.
+    - Con tablas pero sin revisión (creada por versiones anteriores con
+      create_all): si el esquema ya tiene todo lo que definen los modelos (p. ej.
+      creado con init_db_script.py antes de que usara este módulo) se marca la
+      revisión actual; si no, se marca la revisión LEGACY_REVISION y se aplican
+      las migraciones, como `alembic stamp 7b42f607336b && alembic upgrade head`.
+
+    Args:
+        connection: Conexión dentro de una transacción.
+
+    Raises:
+        SchemaOutOfDateError: Si la base de datos está en otra revisión.
+    """
+    script = ScriptDirectory(str(MIGRATIONS_DIR))
+    heads = set(script.get_heads())
+    context = MigrationContext.configure(connection)
+    current = set(context.get_current_heads())
+
+    if current == heads:
+        return
+
+    if current:
+        raise SchemaOutOfDateError(
+            f"La base de datos está en la revisión {', '.join(sorted(current))} y la última es "
+            f"{', '.join(sorted(heads))}. Ejecuta `alembic upgrade head` antes de arrancar."
+        )
+
+    if not inspect(connection).has_table("users"):
+        logger.info("Base de datos vacía: creando el esquema y marcando la revisión %s", ", ".join(heads))
+        Base.metadata.create_all(bind=connection)
+        context.stamp(script, "heads")
+        return
+
+    if _matches_models(context):
+        logger.warning(
+            "La base de datos no tiene revisión de Alembic pero su esquema está al día: "
+            "se marca la revisión %s", ", ".join(sorted(heads)),
+        )
+        context.stamp(script, "heads")
+        return
+
+    logger.warning(
+        "La base de datos no tiene revisión de Alembic: se marca la revisión %s y se migra a %s",
+        LEGACY_REVISION, ", ".join(sorted(heads)),
+    )
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.attributes["connection"] = connection
+    command.stamp(config, LEGACY_REVISION)
+    command.upgrade(config, "heads")
+
+
+def prepare_schema(engine: Engine = default_engine) -> None:
+    """
+    Prepara el esquema (ver `ensure_schema`) bajo el lock de arranque, sin datos.
+
+    Args:
+        engine: Motor de la base de datos.
+    """
+    with bootstrap_lock(engine):
+        with engine.begin() as connection:
+            ensure_schema(connection)
+
+
+def bootstrap_database(engine: Engine = default_engine, session_factory=SessionLocal) -> None:
+    """
+    Prepara el esquema y los datos iniciales bajo el lock de arranque.
+
+    Args:
+        engine: Motor de la base de datos.
+        session_factory: Factoría de sesiones para los datos iniciales.
+    """
+    with bootstrap_lock(engine):
+        with engine.begin() as connection:
+            ensure_schema(connection)
+        with session_factory() as db:
+            init_db(db)
+    logger.debug("Base de datos preparada (pid %s)", os.getpid())
@@ -0,0 +1,30 @@
+"""Add runtime_config table shared by all workers
+
+Revision ID: 2c6e9b4d1f83
+Revises: 5f8c1a3e7d20
+Create Date: 2026-10-19 19:07:52.240816
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import app.db.utils
+
+
+revision = '2c6e9b4d1f83'
+down_revision = '5f8c1a3e7d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'runtime_config',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('overrides', app.db.utils.JSONB(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('runtime_config')
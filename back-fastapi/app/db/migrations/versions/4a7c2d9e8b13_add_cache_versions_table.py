@@ -0,0 +1,29 @@
+"""Add cache_versions table for cross-worker cache invalidation
+
+Revision ID: 4a7c2d9e8b13
+Revises: e81f4b6c0a92
+Create Date: 2026-10-19 12:21:05.663410
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '4a7c2d9e8b13'
+down_revision = 'e81f4b6c0a92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('cache_versions')
@@ -0,0 +1,36 @@
+"""Add users.is_admin and normalize stored emails
+
+Revision ID: 5f8c1a3e7d20
+Revises: 9d5e3b7f1a46
+Create Date: 2026-10-19 18:41:09.553127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '5f8c1a3e7d20'
+down_revision = '9d5e3b7f1a46'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(
+            sa.Column('is_admin', sa.Boolean(), server_default=sa.false(), nullable=False)
+        )
+
+    # Los emails se guardan normalizados (sin espacios y en minúsculas). Los que
+    # chocarían con otra cuenta ya normalizada se dejan como están.
+    op.execute(
+        "UPDATE users SET email = LOWER(TRIM(email)) "
+        "WHERE email <> LOWER(TRIM(email)) AND NOT EXISTS ("
+        "SELECT 1 FROM users AS other "
+        "WHERE other.email = LOWER(TRIM(users.email)) AND other.id <> users.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('is_admin')
@@ -0,0 +1,51 @@
+"""Add lookup indexes and unique constraints for characters, artifacts and progress
+
+Revision ID: c3d9a1e5f2b7
+Revises: 7b42f607336b
+Create Date: 2026-10-19 10:12:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c3d9a1e5f2b7'
+down_revision = '7b42f607336b'
+branch_labels = None
+depends_on = None
+
+
+def _remove_duplicates(table, columns):
+    # Conservar una sola fila por combinación antes de crear la restricción única.
+    # Se compara el id como texto porque PostgreSQL no tiene MIN() para uuid.
+    group_by = ", ".join(columns)
+    op.execute(
+        f"DELETE FROM {table} WHERE CAST(id AS TEXT) NOT IN ("
+        f"SELECT MIN(CAST(id AS TEXT)) FROM {table} GROUP BY {group_by})"
+    )
+
+
+def upgrade():
+    op.create_index('ix_characters_user_id', 'characters', ['user_id'], unique=False)
+
+    _remove_duplicates('character_artifacts', ['character_id', 'artifact_id'])
+    with op.batch_alter_table('character_artifacts') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_character_artifacts_character_artifact', ['character_id', 'artifact_id']
+        )
+
+    _remove_duplicates('character_progress', ['character_id', 'adventure_id'])
+    with op.batch_alter_table('character_progress') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_character_progress_character_adventure', ['character_id', 'adventure_id']
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('character_progress') as batch_op:
+        batch_op.drop_constraint('uq_character_progress_character_adventure', type_='unique')
+
+    with op.batch_alter_table('character_artifacts') as batch_op:
+        batch_op.drop_constraint('uq_character_artifacts_character_artifact', type_='unique')
+
+    op.drop_index('ix_characters_user_id', table_name='characters')
@@ -0,0 +1,30 @@
+"""Add (created_at, id) indexes for keyset pagination of characters and artifacts
+
+Revision ID: e81f4b6c0a92
+Revises: c3d9a1e5f2b7
+Create Date: 2026-10-19 11:03:47.918254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'e81f4b6c0a92'
+down_revision = 'c3d9a1e5f2b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # El índice compuesto empieza por user_id, así que reemplaza al índice simple
+    op.create_index(
+        'ix_characters_user_id_created_at_id', 'characters', ['user_id', 'created_at', 'id'], unique=False
+    )
+    op.drop_index('ix_characters_user_id', table_name='characters')
+    op.create_index('ix_artifacts_created_at_id', 'artifacts', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_artifacts_created_at_id', table_name='artifacts')
+    op.create_index('ix_characters_user_id', 'characters', ['user_id'], unique=False)
+    op.drop_index('ix_characters_user_id_created_at_id', table_name='characters')
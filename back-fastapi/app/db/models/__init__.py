@@ -9,5 +9,8 @@ from app.db.models.character import Character
 from app.db.models.artifact import Artifact, CharacterArtifact
 from app.db.models.adventure import Adventure, CharacterProgress
 from app.db.models.personality import PersonalityQuestion
+from app.db.models.cache_version import CacheVersion
+from app.db.models.refresh_token import RefreshToken
+from app.db.models.runtime_config import RuntimeConfigOverride
 
 # Ejemplo: from app.db.models.user import User 
\ No newline at end of file
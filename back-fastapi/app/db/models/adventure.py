@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 
@@ -7,6 +7,7 @@ from app.db.utils import UUID, JSONB
 
 class Adventure(Base):
     __tablename__ = "adventures"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID, primary_key=True, default=uuid4)
     title = Column(String(255), nullable=False)
@@ -20,6 +21,12 @@ class Adventure(Base):
 
 class CharacterProgress(Base):
     __tablename__ = "character_progress"
+    __table_args__ = (
+        # Un único progreso por personaje y aventura; también sirve como índice
+        # para las búsquedas por personaje
+        UniqueConstraint("character_id", "adventure_id", name="uq_character_progress_character_adventure"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID, primary_key=True, default=uuid4)
     character_id = Column(UUID, ForeignKey("characters.id", ondelete="CASCADE"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Index, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 
@@ -7,6 +7,11 @@ from app.db.utils import UUID, JSONB
 
 class Artifact(Base):
     __tablename__ = "artifacts"
+    __table_args__ = (
+        # Paginación por cursor sobre (created_at, id)
+        Index("ix_artifacts_created_at_id", "created_at", "id"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID, primary_key=True, default=uuid4)
     name = Column(String(100), nullable=False)
@@ -21,6 +26,12 @@ class Artifact(Base):
 
 class CharacterArtifact(Base):
     __tablename__ = "character_artifacts"
+    __table_args__ = (
+        # Un personaje no puede tener el mismo artefacto dos veces; también sirve
+        # como índice para las búsquedas por personaje
+        UniqueConstraint("character_id", "artifact_id", name="uq_character_artifacts_character_artifact"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID, primary_key=True, default=uuid4)
     character_id = Column(UUID, ForeignKey("characters.id", ondelete="CASCADE"), nullable=False)
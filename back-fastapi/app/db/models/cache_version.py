@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, Integer, DateTime, func
+
+from app.db.session import Base
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+    __mapper_args__ = {"eager_defaults": True}
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, func
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 
@@ -7,6 +7,11 @@ from app.db.utils import UUID, JSONB
 
 class Character(Base):
     __tablename__ = "characters"
+    __table_args__ = (
+        # Búsquedas por usuario y paginación por cursor sobre (created_at, id)
+        Index("ix_characters_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID, primary_key=True, default=uuid4)
     user_id = Column(UUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -6,6 +6,7 @@ from app.db.utils import UUID, JSONB
 
 class PersonalityQuestion(Base):
     __tablename__ = "personality_questions"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID, primary_key=True, default=uuid4)
     question = Column(String, nullable=False)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, func
+from uuid import uuid4
+
+from app.db.session import Base
+from app.db.utils import UUID
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Reconstrucción del índice de sesiones revocadas
+        Index("ix_refresh_tokens_revoked_at", "revoked_at"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
+    # El id es el identificador de sesión (claim `sid` de los tokens de acceso)
+    id = Column(UUID, primary_key=True, default=uuid4)
+    user_id = Column(UUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # SHA-256 del refresh token; el token en claro nunca se guarda
+    token_hash = Column(String(64), nullable=False, unique=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
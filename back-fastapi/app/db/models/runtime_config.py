@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, DateTime, func
+
+from app.db.session import Base
+from app.db.utils import JSONB
+
+class RuntimeConfigOverride(Base):
+    __tablename__ = "runtime_config"
+    __mapper_args__ = {"eager_defaults": True}
+
+    name = Column(String(50), primary_key=True)
+    # Solo los campos cambiados en caliente; el resto sale de Settings
+    overrides = Column(JSONB, nullable=False, default={})
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, func
+from sqlalchemy import Boolean, Column, String, DateTime, false, func
 from uuid import uuid4
 
 from app.db.session import Base
@@ -6,6 +6,7 @@ from app.db.utils import UUID
 
 class User(Base):
     __tablename__ = "users"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID, primary_key=True, default=uuid4)
     name = Column(String(100), nullable=False)
@@ -13,5 +14,7 @@ class User(Base):
     password = Column(String(255), nullable=False)
     provider = Column(String(50))
     image_url = Column(String, nullable=True)
+    # Solo se asigna fuera de la API (manage_admins.py)
+    is_admin = Column(Boolean, nullable=False, default=False, server_default=false())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now()) 
\ No newline at end of file
@@ -1,10 +1,15 @@
 from typing import List, Optional, Dict, Any
+from sqlalchemy import event, func, select, update
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.db.repositories.base import BaseRepository
 from app.db.models.adventure import Adventure, CharacterProgress
 from app.api.schemas.adventure import AdventureCreate, AdventureInDBBase, CharacterProgressCreate, CharacterProgressBase
+from app.db.utils import json_array_append, upsert_statement
+from app.db.unit_of_work import persist
+from app.services.adventure_steps import CompiledAdventure, adventure_step_cache
+from app.services.rewards import calculate_rewards
 
 
 class AdventureRepository(BaseRepository[Adventure, AdventureCreate, AdventureInDBBase]):
@@ -15,21 +20,17 @@ class AdventureRepository(BaseRepository[Adventure, AdventureCreate, AdventureIn
     def __init__(self):
         super().__init__(Adventure)
     
-    def get_adventure_steps(self, db: Session, *, adventure_id: UUID) -> List[Dict[str, Any]]:
+    def _on_write(self, db: Session) -> None:
         """
-        Obtiene los pasos de una aventura.
+        Descarta la caché de pasos cuando se confirma la transacción.
+        
+        `updated_at` en SQLite tiene resolución de segundos, así que no basta
+        para detectar dos modificaciones seguidas desde este mismo proceso.
         
         Args:
             db: Sesión de base de datos.
-            adventure_id: ID de la aventura.
-            
-        Returns:
-            Lista de pasos de la aventura.
         """
-        adventure = self.get(db, id=adventure_id)
-        if not adventure:
-            return []
-        return adventure.steps
+        event.listen(db, "after_commit", lambda session: adventure_step_cache.invalidate(), once=True)
 
 
 class CharacterProgressRepository:
@@ -54,6 +55,25 @@ class CharacterProgressRepository:
             CharacterProgress.adventure_id == adventure_id
         ).first()
     
+    def get_current_step(self, db: Session, *, character_id: UUID, adventure_id: UUID) -> Optional[int]:
+        """
+        Obtiene solo el paso actual de un personaje en una aventura.
+        
+        Args:
+            db: Sesión de base de datos.
+            character_id: ID del personaje.
+            adventure_id: ID de la aventura.
+            
+        Returns:
+            El paso actual, o None si el personaje no tiene progreso en la aventura.
+        """
+        return db.execute(
+            select(CharacterProgress.current_step).where(
+                CharacterProgress.character_id == character_id,
+                CharacterProgress.adventure_id == adventure_id,
+            )
+        ).scalar()
+    
     def get_by_character(self, db: Session, *, character_id: UUID) -> List[CharacterProgress]:
         """
         Obtiene todo el progreso de un personaje en todas las aventuras.
@@ -85,65 +105,116 @@ class CharacterProgressRepository:
         Returns:
             El progreso creado o actualizado.
         """
-        # Verificar si ya existe un progreso para esta combinación de personaje y aventura
-        progress = self.get(
-            db, 
-            character_id=obj_in.character_id, 
-            adventure_id=obj_in.adventure_id
-        )
+        # Un único INSERT ... ON CONFLICT DO UPDATE sobre la restricción única
+        # (character_id, adventure_id) en lugar de consultar y luego escribir
+        values = obj_in.dict()
+        update_fields = {
+            field: value for field, value in values.items()
+            if field not in ("character_id", "adventure_id")
+        }
+        update_fields["updated_at"] = func.now()
         
-        if progress:
-            # Actualizar progreso existente
-            for field, value in obj_in.dict().items():
-                setattr(progress, field, value)
-                
-            # Verificar si el personaje ha completado la aventura (lógica específica)
-            # Esto dependerá de la estructura de la aventura
-            
-            db.add(progress)
-            db.commit()
-            db.refresh(progress)
-            return progress
-        else:
-            # Crear nuevo progreso
-            db_obj = CharacterProgress(**obj_in.dict())
-            db.add(db_obj)
-            db.commit()
-            db.refresh(db_obj)
-            return db_obj
+        stmt = upsert_statement(
+            db,
+            CharacterProgress,
+            values,
+            index_elements=["character_id", "adventure_id"],
+            set_=update_fields,
+        ).returning(CharacterProgress)
+        progress = db.scalars(
+            stmt, execution_options={"populate_existing": True}
+        ).one()
+        persist(db)
+        return progress
     
-    def calculate_rewards(self, character_progress: CharacterProgress, adventure: Adventure) -> Dict[str, Any]:
+    def append_choice(
+        self,
+        db: Session,
+        *,
+        character_id: UUID,
+        adventure_id: UUID,
+        choice: int,
+        next_step: int,
+        expected_step: int,
+    ) -> Optional[CharacterProgress]:
         """
-        Calcula las recompensas basadas en el progreso del personaje y la aventura.
+        Añade una elección al progreso y mueve `current_step` en una sola sentencia.
+        
+        A diferencia de `create_or_update`, no se reescribe el array completo de
+        elecciones: la base de datos añade el nuevo elemento al final, de modo que
+        el tamaño de la escritura no depende de lo larga que sea la aventura. Si el
+        personaje aún no tenía progreso en la aventura, se crea.
         
         Args:
-            character_progress: Progreso del personaje.
-            adventure: Aventura completada o en progreso.
+            db: Sesión de base de datos.
+            character_id: ID del personaje.
+            adventure_id: ID de la aventura.
+            choice: Índice de la opción elegida.
+            next_step: Paso al que lleva la opción elegida desde `expected_step`
+                (ver `CompiledAdventure.transitions`).
+            expected_step: Paso en el que se hizo la elección. Si no coincide con
+                el guardado, no se modifica nada (control de concurrencia).
             
         Returns:
-            Diccionario con las recompensas calculadas.
+            El progreso actualizado, o None si `expected_step` no coincide.
         """
-        # Esta función implementaría la lógica para calcular recompensas
-        # basado en las elecciones hechas por el personaje y la estructura de la aventura
+        set_ = {
+            "current_step": next_step,
+            "choices": json_array_append(db, CharacterProgress.choices, choice),
+            "updated_at": func.now(),
+        }
         
-        # Por ahora, retornamos recompensas simuladas
-        rewards = []
+        if expected_step:
+            # Con un paso esperado distinto de 0 el progreso ya debe existir
+            stmt = (
+                update(CharacterProgress)
+                .where(
+                    CharacterProgress.character_id == character_id,
+                    CharacterProgress.adventure_id == adventure_id,
+                    CharacterProgress.current_step == expected_step,
+                )
+                .values(**set_)
+                .returning(CharacterProgress)
+            )
+            execution_options = {"synchronize_session": False, "populate_existing": True}
+        else:
+            stmt = upsert_statement(
+                db,
+                CharacterProgress,
+                {
+                    "character_id": character_id,
+                    "adventure_id": adventure_id,
+                    "current_step": next_step,
+                    "choices": [choice],
+                    "completed": False,
+                },
+                index_elements=["character_id", "adventure_id"],
+                set_=set_,
+                where=CharacterProgress.current_step == expected_step,
+            ).returning(CharacterProgress)
+            execution_options = {"populate_existing": True}
         
-        # Ejemplo de cálculo de recompensas basado en el paso actual
-        if character_progress.current_step > 3:
-            rewards.append({
-                "type": "experience",
-                "value": 50 * character_progress.current_step
-            })
+        progress = db.scalars(stmt, execution_options=execution_options).first()
+        persist(db)
+        return progress
+    
+    def calculate_rewards(self, adventure: CompiledAdventure, *, step: int, choice: int) -> List[Dict[str, Any]]:
+        """
+        Calcula las recompensas de una elección en una aventura.
         
-        if character_progress.current_step > 5:
-            rewards.append({
-                "type": "artifact",
-                "id": "some-artifact-id",
-                "name": "Artefacto de ejemplo"
-            })
+        Las reglas se leen de los pasos de la aventura y están precompiladas en
+        `adventure.rewards`, así que el cálculo es una única búsqueda por la
+        transición (paso, opción).
         
-        return rewards
+        Args:
+            adventure: Pasos compilados de la aventura.
+            step: Paso en el que se hizo la elección.
+            choice: Índice de la opción elegida.
+            
+        Returns:
+            Lista con las recompensas calculadas.
+        """
+        return calculate_rewards(adventure.rewards, step, choice)
 
 
 adventure_repository = AdventureRepository()
@@ -1,10 +1,15 @@
 from typing import List, Optional
+from sqlalchemy import event, func
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.db.repositories.base import BaseRepository
 from app.db.models.artifact import Artifact, CharacterArtifact
+from app.db.models.cache_version import CacheVersion
+from app.db.utils import upsert_statement
+from app.db.unit_of_work import persist
 from app.api.schemas.artifact import ArtifactCreate, ArtifactUpdate, CharacterArtifactCreate, CharacterArtifactUpdate
+from app.services.artifact_catalog import ARTIFACT_CATALOG_VERSION, artifact_catalog
 
 
 class ArtifactRepository(BaseRepository[Artifact, ArtifactCreate, ArtifactUpdate]):
@@ -14,6 +19,28 @@ class ArtifactRepository(BaseRepository[Artifact, ArtifactCreate, ArtifactUpdate
     
     def __init__(self):
         super().__init__(Artifact)
+    
+    def _on_write(self, db: Session) -> None:
+        """
+        Invalida el catálogo de artefactos en memoria.
+        
+        Incrementa el contador de versión en la misma transacción que la
+        escritura (para que el resto de workers recarguen su catálogo) y descarta
+        el catálogo local cuando la transacción se confirma.
+        
+        Args:
+            db: Sesión de base de datos.
+        """
+        db.execute(
+            upsert_statement(
+                db,
+                CacheVersion,
+                {"name": ARTIFACT_CATALOG_VERSION, "version": 1},
+                index_elements=["name"],
+                set_={"version": CacheVersion.version + 1, "updated_at": func.now()},
+            )
+        )
+        event.listen(db, "after_commit", lambda session: artifact_catalog.invalidate(), once=True)
 
 
 class CharacterArtifactRepository:
@@ -53,26 +80,34 @@ class CharacterArtifactRepository:
             CharacterArtifact.character_id == character_id
         ).all()
     
-    def create(self, db: Session, *, obj_in: CharacterArtifactCreate, character_id: UUID) -> CharacterArtifact:
+    def create(self, db: Session, *, obj_in: CharacterArtifactCreate, character_id: UUID) -> Optional[CharacterArtifact]:
         """
         Crea una nueva relación entre un personaje y un artefacto.
         
+        Usa un INSERT ... ON CONFLICT DO NOTHING sobre la restricción única
+        (character_id, artifact_id), por lo que no hace falta consultar antes
+        si la relación ya existe.
+        
         Args:
             db: Sesión de base de datos.
             obj_in: Datos para crear la relación.
             character_id: ID del personaje.
             
         Returns:
-            La relación creada.
+            La relación creada, o None si el personaje ya tenía el artefacto.
         """
-        db_obj = CharacterArtifact(
-            character_id=character_id,
-            artifact_id=obj_in.artifact_id,
-            is_active=False
-        )
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        stmt = upsert_statement(
+            db,
+            CharacterArtifact,
+            {
+                "character_id": character_id,
+                "artifact_id": obj_in.artifact_id,
+                "is_active": False,
+            },
+            index_elements=["character_id", "artifact_id"],
+        ).returning(CharacterArtifact)
+        db_obj = db.scalars(stmt).first()
+        persist(db)
         return db_obj
     
     def update(self, db: Session, *, db_obj: CharacterArtifact, obj_in: CharacterArtifactUpdate) -> CharacterArtifact:
@@ -93,8 +128,7 @@ class CharacterArtifactRepository:
             setattr(db_obj, field, update_data[field])
         
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        persist(db, db_obj)
         return db_obj
     
     def remove(self, db: Session, *, db_obj: CharacterArtifact) -> CharacterArtifact:
@@ -110,7 +144,7 @@ class CharacterArtifactRepository:
         """
         obj = db_obj
         db.delete(obj)
-        db.commit()
+        persist(db)
         return obj
 
 
@@ -1,10 +1,17 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from datetime import datetime
+from functools import cached_property
+from typing import Any, Dict, FrozenSet, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import and_, func, insert, inspect, literal, or_, update
+from sqlalchemy.dialects.sqlite import DATETIME as SQLiteDateTime
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import ORMOption
 from uuid import UUID
 
 from app.db.session import Base
+from app.db.utils import decode_cursor, encode_cursor, upsert_statement
+from app.db.unit_of_work import persist
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -16,6 +23,10 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     Repositorio base con operaciones CRUD predefinidas.
     """
     
+    # Opciones de carga (selectinload, joinedload, ...) que se aplican por defecto
+    # en las lecturas cuando el llamador no indica otras
+    default_options: Sequence[ORMOption] = ()
+    
     def __init__(self, model: Type[ModelType]):
         """
         Inicializa el repositorio con un modelo específico.
@@ -25,21 +36,81 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
     
-    def get(self, db: Session, id: UUID) -> Optional[ModelType]:
+    @cached_property
+    def _column_keys(self) -> FrozenSet[str]:
+        """
+        Nombres de los atributos de columna del modelo.
+        
+        Se calcula una sola vez a partir de los metadatos del mapper, en lugar
+        de serializar el registro completo en cada actualización.
+        """
+        return frozenset(attr.key for attr in inspect(self.model).column_attrs)
+    
+    def _on_write(self, db: Session) -> None:
+        """
+        Hook que se ejecuta en cada escritura antes de confirmarla.
+        
+        Las subclases lo usan para invalidar cachés derivadas de la tabla.
+        
+        Args:
+            db: Sesión de base de datos.
+        """
+    
+    def _update_data(self, obj_in: Union[UpdateSchemaType, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Obtiene los campos a actualizar que corresponden a columnas del modelo.
+        
+        Args:
+            obj_in: Esquema de actualización (solo campos enviados) o dict.
+            
+        Returns:
+            Diccionario campo -> valor.
+        """
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        column_keys = self._column_keys
+        return {field: value for field, value in update_data.items() if field in column_keys}
+    
+    def _query(self, db: Session, options: Optional[Sequence[ORMOption]] = None):
+        """
+        Crea una consulta sobre el modelo con las opciones de carga indicadas.
+        
+        Args:
+            db: Sesión de base de datos.
+            options: Opciones de carga. Si es None se usan las opciones por defecto.
+            
+        Returns:
+            Consulta de SQLAlchemy.
+        """
+        if options is None:
+            options = self.default_options
+        return db.query(self.model).options(*options)
+    
+    def get(
+        self, db: Session, id: UUID, *, options: Optional[Sequence[ORMOption]] = None
+    ) -> Optional[ModelType]:
         """
         Obtiene un registro por su ID.
         
         Args:
             db: Sesión de base de datos.
             id: ID del registro.
+            options: Opciones de carga de relaciones. Por defecto `default_options`.
             
         Returns:
             El registro encontrado o None si no existe.
         """
-        return db.query(self.model).filter(self.model.id == id).first()
+        return self._query(db, options).filter(self.model.id == id).first()
     
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        options: Optional[Sequence[ORMOption]] = None,
     ) -> List[ModelType]:
         """
         Obtiene múltiples registros con paginación.
@@ -48,11 +119,75 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             db: Sesión de base de datos.
             skip: Número de registros a saltar.
             limit: Límite de registros a retornar.
+            options: Opciones de carga de relaciones. Por defecto `default_options`.
             
         Returns:
             Lista de registros.
         """
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return self._query(db, options).offset(skip).limit(limit).all()
+    
+    def _created_at_param(self, db: Session, value: datetime):
+        """
+        Crea el parámetro con el que se compara `created_at` en la paginación.
+        
+        En SQLite las fechas se guardan como texto y CURRENT_TIMESTAMP no incluye
+        microsegundos, así que el valor se formatea igual que el almacenado para
+        que la comparación de igualdad funcione.
+        """
+        if db.get_bind().dialect.name == "sqlite":
+            return literal(value, SQLiteDateTime(truncate_microseconds=value.microsecond == 0))
+        return literal(value, self.model.created_at.type)
+    
+    def get_multi_by_cursor(
+        self,
+        db: Session,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        filters: Sequence[Any] = (),
+        options: Optional[Sequence[ORMOption]] = None,
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Obtiene múltiples registros con paginación por cursor sobre (created_at, id).
+        
+        A diferencia de `get_multi`, el coste no crece con la profundidad de la
+        página: cada página es un rango sobre el índice (created_at, id).
+        
+        Args:
+            db: Sesión de base de datos.
+            cursor: Cursor opaco devuelto por la página anterior, o None para la primera.
+            limit: Límite de registros a retornar.
+            filters: Condiciones adicionales (p. ej. el propietario de los registros).
+            options: Opciones de carga de relaciones. Por defecto `default_options`.
+            
+        Returns:
+            Tupla con la lista de registros y el cursor de la página siguiente
+            (None si no hay más registros).
+            
+        Raises:
+            ValueError: Si el cursor no es válido.
+        """
+        created_at_column = self.model.created_at
+        query = self._query(db, options).filter(*filters)
+        
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            created_at_param = self._created_at_param(db, created_at)
+            query = query.filter(
+                or_(
+                    created_at_column > created_at_param,
+                    and_(created_at_column == created_at_param, self.model.id > last_id),
+                )
+            )
+        
+        # Se pide un registro extra para saber si hay una página siguiente
+        items = query.order_by(created_at_column, self.model.id).limit(limit + 1).all()
+        if len(items) <= limit:
+            return items, None
+        
+        items = items[:limit]
+        last = items[-1]
+        return items, encode_cursor(last.created_at, last.id)
     
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         """
@@ -68,10 +203,89 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        self._on_write(db)
+        persist(db, db_obj)
         return db_obj
     
+    def create_many(self, db: Session, *, objs_in: Sequence[CreateSchemaType]) -> List[ModelType]:
+        """
+        Crea varios registros en un único INSERT por lote y una sola transacción.
+        
+        Si el dialecto soporta RETURNING en executemany (PostgreSQL, SQLite >= 3.35)
+        los registros se devuelven en la misma sentencia; si no, se insertan como
+        objetos ORM en un único flush.
+        
+        Args:
+            db: Sesión de base de datos.
+            objs_in: Datos de los registros a crear.
+            
+        Returns:
+            Lista de registros creados, en el mismo orden que `objs_in`.
+        """
+        rows = [jsonable_encoder(obj_in) for obj_in in objs_in]
+        if not rows:
+            return []
+        
+        if db.get_bind().dialect.insert_executemany_returning:
+            db_objs = list(
+                db.scalars(insert(self.model).returning(self.model, sort_by_parameter_order=True), rows)
+            )
+        else:
+            db_objs = [self.model(**row) for row in rows]
+            db.add_all(db_objs)
+            db.flush()
+        self._on_write(db)
+        persist(db)
+        return db_objs
+    
+    def upsert_many(
+        self,
+        db: Session,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        index_elements: Sequence[str] = ("id",),
+        update_fields: Optional[Sequence[str]] = None,
+    ) -> List[ModelType]:
+        """
+        Inserta o actualiza varios registros con INSERT ... ON CONFLICT en un solo lote.
+        
+        Args:
+            db: Sesión de base de datos.
+            objs_in: Datos de los registros (esquemas o dicts).
+            index_elements: Columnas del índice único que detecta el conflicto.
+            update_fields: Columnas a actualizar si el registro ya existe. Por defecto
+                todas las columnas recibidas salvo las de `index_elements`.
+            
+        Returns:
+            Lista de registros insertados o actualizados.
+        """
+        rows = [
+            obj_in if isinstance(obj_in, dict) else jsonable_encoder(obj_in)
+            for obj_in in objs_in
+        ]
+        if not rows:
+            return []
+        
+        if update_fields is None:
+            update_fields = [field for field in rows[0] if field not in index_elements]
+        set_ = {}
+        if "updated_at" in self._column_keys:
+            set_["updated_at"] = func.now()
+        
+        stmt = upsert_statement(
+            db,
+            self.model,
+            index_elements=index_elements,
+            update_fields=update_fields,
+            set_=set_,
+        ).returning(self.model, sort_by_parameter_order=True)
+        db_objs = list(
+            db.scalars(stmt, rows, execution_options={"populate_existing": True})
+        )
+        self._on_write(db)
+        persist(db)
+        return db_objs
+    
     def update(
         self,
         db: Session,
@@ -90,17 +304,55 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             El registro actualizado.
         """
-        obj_data = jsonable_encoder(db_obj)
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        for field, value in self._update_data(obj_in).items():
+            setattr(db_obj, field, value)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        self._on_write(db)
+        persist(db, db_obj)
+        return db_obj
+    
+    def update_by_id(
+        self,
+        db: Session,
+        *,
+        id: UUID,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        filters: Sequence[Any] = (),
+    ) -> Optional[ModelType]:
+        """
+        Actualiza un registro con un único UPDATE ... RETURNING, sin cargarlo antes.
+        
+        Args:
+            db: Sesión de base de datos.
+            id: ID del registro a actualizar.
+            obj_in: Datos para actualizar el registro.
+            filters: Condiciones adicionales (p. ej. el propietario del registro).
+            
+        Returns:
+            El registro actualizado, o None si no existe o no cumple los filtros.
+        """
+        update_data = self._update_data(obj_in)
+        if not update_data:
+            return self._query(db, ()).filter(self.model.id == id, *filters).first()
+        
+        if not db.get_bind().dialect.update_returning:
+            db_obj = self._query(db, ()).filter(self.model.id == id, *filters).first()
+            if db_obj is None:
+                return None
+            return self.update(db, db_obj=db_obj, obj_in=update_data)
+        
+        stmt = (
+            update(self.model)
+            .where(self.model.id == id, *filters)
+            .values(**update_data)
+            .returning(self.model)
+        )
+        db_obj = db.scalars(
+            stmt,
+            execution_options={"synchronize_session": False, "populate_existing": True},
+        ).first()
+        self._on_write(db)
+        persist(db)
         return db_obj
     
     def remove(self, db: Session, *, id: UUID) -> ModelType:
@@ -116,5 +368,6 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         obj = db.query(self.model).get(id)
         db.delete(obj)
-        db.commit()
+        self._on_write(db)
+        persist(db)
         return obj 
\ No newline at end of file
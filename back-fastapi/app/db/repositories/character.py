@@ -1,32 +1,77 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.orm.interfaces import ORMOption
 from uuid import UUID
 
 from app.db.repositories.base import BaseRepository
 from app.db.models.character import Character
+from app.db.unit_of_work import persist
 from app.api.schemas.character import CharacterCreate, CharacterUpdate
 
 
+# Carga los artefactos en una sola consulta adicional (SELECT ... IN) para todos
+# los personajes, en lugar de una consulta por personaje al serializar
+CHARACTER_RESPONSE_OPTIONS = (selectinload(Character.artifacts),)
+
+
 class CharacterRepository(BaseRepository[Character, CharacterCreate, CharacterUpdate]):
     """
     Repositorio para operaciones CRUD de personajes.
+    
+    Por defecto las lecturas cargan los artefactos que necesita el esquema de
+    respuesta `Character`. Los endpoints que no serializan el personaje pueden
+    pasar `options=()` para evitar esa consulta.
     """
     
+    default_options = CHARACTER_RESPONSE_OPTIONS
+    
     def __init__(self):
         super().__init__(Character)
     
-    def get_by_user_id(self, db: Session, *, user_id: UUID) -> List[Character]:
+    def get_by_user_id(
+        self, db: Session, *, user_id: UUID, options: Optional[Sequence[ORMOption]] = None
+    ) -> List[Character]:
         """
         Obtiene todos los personajes de un usuario.
         
         Args:
             db: Sesión de base de datos.
             user_id: ID del usuario.
+            options: Opciones de carga de relaciones. Por defecto `default_options`.
             
         Returns:
             Lista de personajes del usuario.
         """
-        return db.query(Character).filter(Character.user_id == user_id).all()
+        return self._query(db, options).filter(Character.user_id == user_id).all()
+    
+    def get_page_by_user_id(
+        self,
+        db: Session,
+        *,
+        user_id: UUID,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        options: Optional[Sequence[ORMOption]] = None,
+    ) -> Tuple[List[Character], Optional[str]]:
+        """
+        Obtiene una página de personajes de un usuario ordenada por fecha de creación.
+        
+        Args:
+            db: Sesión de base de datos.
+            user_id: ID del usuario.
+            cursor: Cursor de la página anterior, o None para la primera.
+            limit: Límite de personajes a retornar.
+            options: Opciones de carga de relaciones. Por defecto `default_options`.
+            
+        Returns:
+            Tupla con la lista de personajes y el cursor de la página siguiente.
+        """
+        return self.get_multi_by_cursor(
+            db, cursor=cursor, limit=limit, filters=(Character.user_id == user_id,), options=options
+        )
     
     def create_with_user(self, db: Session, *, obj_in: CharacterCreate, user_id: UUID) -> Character:
         """
@@ -44,11 +89,17 @@ class CharacterRepository(BaseRepository[Character, CharacterCreate, CharacterUp
         obj_in_data["user_id"] = user_id
         db_obj = Character(**obj_in_data)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        persist(db, db_obj)
         return db_obj
     
-    def get_user_character(self, db: Session, *, user_id: UUID, character_id: UUID) -> Optional[Character]:
+    def get_user_character(
+        self,
+        db: Session,
+        *,
+        user_id: UUID,
+        character_id: UUID,
+        options: Optional[Sequence[ORMOption]] = None,
+    ) -> Optional[Character]:
         """
         Obtiene un personaje específico de un usuario.
         
@@ -56,14 +107,58 @@ class CharacterRepository(BaseRepository[Character, CharacterCreate, CharacterUp
             db: Sesión de base de datos.
             user_id: ID del usuario.
             character_id: ID del personaje.
+            options: Opciones de carga de relaciones. Por defecto `default_options`.
             
         Returns:
             El personaje si existe y pertenece al usuario, None en caso contrario.
         """
-        return db.query(Character).filter(
+        return self._query(db, options).filter(
             Character.id == character_id,
             Character.user_id == user_id
         ).first()
 
+    
+    def add_experience(self, db: Session, *, character_id: UUID, amount: int) -> Optional[int]:
+        """
+        Suma experiencia a un personaje con un único UPDATE ... RETURNING.
+        
+        El incremento se calcula en la base de datos (experience = experience + x),
+        por lo que dos peticiones concurrentes no pueden pisarse como ocurría al
+        leer el valor, sumarlo en Python y guardarlo.
+        
+        Args:
+            db: Sesión de base de datos.
+            character_id: ID del personaje.
+            amount: Experiencia a sumar.
+            
+        Returns:
+            La experiencia total tras el incremento, o None si el personaje no existe.
+        """
+        stmt = (
+            update(Character)
+            .where(Character.id == character_id)
+            .values(experience=func.coalesce(Character.experience, 0) + amount)
+        )
+        execution_options = {"synchronize_session": False}
+        
+        if db.get_bind().dialect.update_returning:
+            experience = db.execute(
+                stmt.returning(Character.experience), execution_options=execution_options
+            ).scalar()
+        else:
+            db.execute(stmt, execution_options=execution_options)
+            experience = db.execute(
+                select(Character.experience).where(Character.id == character_id)
+            ).scalar()
+        
+        # El personaje puede estar ya cargado en la sesión con el valor anterior
+        character = db.identity_map.get(identity_key(Character, character_id))
+        if character is not None and experience is not None:
+            set_committed_value(character, "experience", experience)
+        
+        self._on_write(db)
+        persist(db)
+        return experience
+
 
 character_repository = CharacterRepository() 
\ No newline at end of file
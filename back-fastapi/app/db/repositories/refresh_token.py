@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app.db.models.refresh_token import RefreshToken
+from app.db.unit_of_work import persist
+from app.core.security import REFRESH_TOKEN_EXPIRE_DAYS, generate_refresh_token, hash_token
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class RefreshTokenRepository:
+    """
+    Repositorio para las sesiones de refresh token.
+
+    Cada fila es una sesión: su id es el claim `sid` de los tokens de acceso y
+    solo se guarda el hash del refresh token vigente.
+    """
+
+    def create(self, db: Session, *, user_id: UUID) -> Tuple[RefreshToken, str]:
+        """
+        Abre una sesión nueva para un usuario.
+
+        Args:
+            db: Sesión de base de datos.
+            user_id: ID del usuario.
+
+        Returns:
+            Tupla con la sesión creada y el refresh token en claro.
+        """
+        token = generate_refresh_token()
+        db_obj = RefreshToken(
+            user_id=user_id,
+            token_hash=hash_token(token),
+            expires_at=_now() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+        db.add(db_obj)
+        persist(db, db_obj)
+        return db_obj, token
+
+    def rotate(self, db: Session, *, token: str) -> Optional[Tuple[RefreshToken, str]]:
+        """
+        Sustituye un refresh token válido por uno nuevo de la misma sesión.
+
+        Es un único UPDATE condicionado al hash actual, así que si el mismo token
+        se usa dos veces a la vez solo una de las peticiones obtiene el nuevo.
+
+        Args:
+            db: Sesión de base de datos.
+            token: Refresh token en claro.
+
+        Returns:
+            Tupla con la sesión y el nuevo refresh token en claro, o None si el
+            token no existe, ha caducado o se ha revocado.
+        """
+        new_token = generate_refresh_token()
+        now = _now()
+        stmt = (
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == hash_token(token),
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now,
+            )
+            .values(
+                token_hash=hash_token(new_token),
+                expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+            )
+            .returning(RefreshToken)
+        )
+        db_obj = db.scalars(
+            stmt,
+            execution_options={"synchronize_session": False, "populate_existing": True},
+        ).first()
+        persist(db)
+        if db_obj is None:
+            return None
+        return db_obj, new_token
+
+    def revoke(self, db: Session, *, token: str) -> Optional[UUID]:
+        """
+        Revoca la sesión de un refresh token.
+
+        Args:
+            db: Sesión de base de datos.
+            token: Refresh token en claro.
+
+        Returns:
+            ID de la sesión revocada, o None si el token no existe o ya estaba revocado.
+        """
+        stmt = (
+            update(RefreshToken)
+            .where(RefreshToken.token_hash == hash_token(token), RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=_now())
+            .returning(RefreshToken.id)
+        )
+        session_id = db.execute(stmt, execution_options={"synchronize_session": False}).scalar()
+        persist(db)
+        return session_id
+
+    def get_revoked_since(self, db: Session, *, since: datetime) -> List[UUID]:
+        """
+        Obtiene las sesiones revocadas desde una fecha.
+
+        Args:
+            db: Sesión de base de datos.
+            since: Fecha desde la que buscar revocaciones.
+
+        Returns:
+            Lista de IDs de sesión.
+        """
+        return list(db.scalars(
+            select(RefreshToken.id).where(RefreshToken.revoked_at >= since)
+        ))
+
+
+refresh_token_repository = RefreshTokenRepository()
@@ -0,0 +1,86 @@
+from typing import Any, Dict
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.models.cache_version import CacheVersion
+from app.db.models.runtime_config import RuntimeConfigOverride
+from app.db.utils import upsert_statement
+from app.db.unit_of_work import persist
+
+# Nombre del contador de la configuración en caliente en la tabla cache_versions
+RUNTIME_CONFIG_VERSION = "runtime_config"
+# La configuración en caliente es una única fila
+RUNTIME_CONFIG_ROW = "default"
+
+
+class RuntimeConfigRepository:
+    """
+    Repositorio para los cambios de la configuración en caliente.
+    """
+    
+    def get_version(self, db: Session) -> int:
+        """
+        Lee el contador de versión de la configuración en caliente.
+        
+        Args:
+            db: Sesión de base de datos.
+            
+        Returns:
+            La versión actual (0 si nunca se ha modificado).
+        """
+        version = db.execute(
+            select(CacheVersion.version).where(CacheVersion.name == RUNTIME_CONFIG_VERSION)
+        ).scalar()
+        return version or 0
+    
+    def get_overrides(self, db: Session, *, for_update: bool = False) -> Dict[str, Any]:
+        """
+        Obtiene los campos cambiados en caliente.
+        
+        Args:
+            db: Sesión de base de datos.
+            for_update: Bloquear la fila hasta el final de la transacción (para
+                combinar cambios concurrentes sin perder ninguno).
+            
+        Returns:
+            Diccionario con los campos cambiados (vacío si no hay ninguno).
+        """
+        stmt = select(RuntimeConfigOverride.overrides).where(
+            RuntimeConfigOverride.name == RUNTIME_CONFIG_ROW
+        )
+        if for_update:
+            stmt = stmt.with_for_update()
+        return dict(db.execute(stmt).scalar() or {})
+    
+    def save_overrides(self, db: Session, *, overrides: Dict[str, Any]) -> None:
+        """
+        Guarda los campos cambiados en caliente e incrementa el contador de
+        versión en la misma transacción, para que el resto de workers los apliquen.
+        
+        Args:
+            db: Sesión de base de datos.
+            overrides: Campos cambiados (sustituyen a los guardados).
+        """
+        db.execute(
+            upsert_statement(
+                db,
+                RuntimeConfigOverride,
+                {"name": RUNTIME_CONFIG_ROW, "overrides": overrides},
+                index_elements=["name"],
+                update_fields=["overrides"],
+                set_={"updated_at": func.now()},
+            )
+        )
+        db.execute(
+            upsert_statement(
+                db,
+                CacheVersion,
+                {"name": RUNTIME_CONFIG_VERSION, "version": 1},
+                index_elements=["name"],
+                set_={"version": CacheVersion.version + 1, "updated_at": func.now()},
+            )
+        )
+        persist(db)
+
+
+runtime_config_repository = RuntimeConfigRepository()
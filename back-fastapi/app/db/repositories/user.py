@@ -1,10 +1,16 @@
-from typing import Optional
+from typing import Any, Dict, Optional, Sequence, Union
+from sqlalchemy import event
 from sqlalchemy.orm import Session
+from uuid import UUID
 
 from app.db.repositories.base import BaseRepository
 from app.db.models.user import User
-from app.api.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.db.unit_of_work import persist
+from app.api.schemas.user import UserCreate, UserUpdate, normalize_email
+from app.core.security import (
+    get_password_hash, verify_dummy_password_async, verify_password, verify_password_async
+)
+from app.services.user_cache import user_cache
 
 
 class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
@@ -15,9 +21,75 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
     def __init__(self):
         super().__init__(User)
     
+    @staticmethod
+    def _invalidate_cached_user(db: Session, user_id: UUID) -> None:
+        """
+        Descarta el usuario de la caché de autenticación al confirmar la transacción.
+        
+        Args:
+            db: Sesión de base de datos.
+            user_id: ID del usuario modificado.
+        """
+        sub = str(user_id)
+        event.listen(db, "after_commit", lambda session: user_cache.invalidate(sub), once=True)
+    
+    def update(
+        self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        """
+        Actualiza un usuario e invalida su entrada en la caché de usuarios.
+        
+        Args:
+            db: Sesión de base de datos.
+            db_obj: Usuario a actualizar.
+            obj_in: Datos para actualizar el usuario.
+            
+        Returns:
+            El usuario actualizado.
+        """
+        self._invalidate_cached_user(db, db_obj.id)
+        return super().update(db, db_obj=db_obj, obj_in=obj_in)
+    
+    def update_by_id(
+        self,
+        db: Session,
+        *,
+        id: UUID,
+        obj_in: Union[UserUpdate, Dict[str, Any]],
+        filters: Sequence[Any] = (),
+    ) -> Optional[User]:
+        """
+        Actualiza un usuario por ID e invalida su entrada en la caché de usuarios.
+        
+        Args:
+            db: Sesión de base de datos.
+            id: ID del usuario.
+            obj_in: Datos para actualizar el usuario.
+            filters: Condiciones adicionales.
+            
+        Returns:
+            El usuario actualizado, o None si no existe o no cumple los filtros.
+        """
+        self._invalidate_cached_user(db, id)
+        return super().update_by_id(db, id=id, obj_in=obj_in, filters=filters)
+    
+    def remove(self, db: Session, *, id: UUID) -> User:
+        """
+        Elimina un usuario e invalida su entrada en la caché de usuarios.
+        
+        Args:
+            db: Sesión de base de datos.
+            id: ID del usuario.
+            
+        Returns:
+            El usuario eliminado.
+        """
+        self._invalidate_cached_user(db, id)
+        return super().remove(db, id=id)
+    
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         """
-        Obtiene un usuario por su email.
+        Obtiene un usuario por su email (se normaliza antes de buscarlo).
         
         Args:
             db: Sesión de base de datos.
@@ -26,27 +98,28 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         Returns:
             El usuario encontrado o None si no existe.
         """
-        return db.query(User).filter(User.email == email).first()
+        return db.query(User).filter(User.email == normalize_email(email)).first()
     
-    def create(self, db: Session, *, obj_in: UserCreate) -> User:
+    def create(self, db: Session, *, obj_in: UserCreate, hashed_password: Optional[str] = None) -> User:
         """
         Crea un nuevo usuario con contraseña hasheada.
         
         Args:
             db: Sesión de base de datos.
             obj_in: Datos para crear el usuario.
+            hashed_password: Hash ya calculado de la contraseña (p. ej. con
+                `get_password_hash_async`). Si no se indica se calcula aquí.
             
         Returns:
             El usuario creado.
         """
         db_obj = User(
-            email=obj_in.email,
+            email=normalize_email(obj_in.email),
             name=obj_in.name,
-            password=get_password_hash(obj_in.password),
+            password=hashed_password or get_password_hash(obj_in.password),
         )
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        persist(db, db_obj)
         return db_obj
     
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
@@ -67,6 +140,56 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         if not verify_password(password, user.password):
             return None
         return user
+    
+    def set_admin(self, db: Session, *, email: str, is_admin: bool = True) -> Optional[User]:
+        """
+        Concede o retira permisos de administrador a un usuario.
+        
+        No se expone en la API: se usa desde `manage_admins.py`.
+        
+        Args:
+            db: Sesión de base de datos.
+            email: Email del usuario.
+            is_admin: Si el usuario debe ser administrador.
+            
+        Returns:
+            El usuario actualizado, o None si no existe.
+        """
+        user = self.get_by_email(db, email=email)
+        if not user:
+            return None
+        return self.update(db, db_obj=user, obj_in={"is_admin": is_admin})
+    
+    async def authenticate_async(self, db: Session, *, email: str, password: str) -> Optional[User]:
+        """
+        Variante de `authenticate` que verifica la contraseña fuera del event loop.
+        
+        Si la contraseña es correcta pero su hash usa un coste de bcrypt antiguo,
+        se guarda un hash nuevo con el coste configurado. Si el email no existe se
+        hace igualmente una verificación de bcrypt, para que el tiempo de respuesta
+        no revele qué emails están registrados.
+        
+        Args:
+            db: Sesión de base de datos.
+            email: Email del usuario.
+            password: Contraseña en texto plano.
+            
+        Returns:
+            El usuario autenticado o None si la autenticación falla.
+            
+        Raises:
+            PasswordHasherBusyError: Si el pool de hashing está saturado.
+        """
+        user = self.get_by_email(db, email=email)
+        if not user:
+            await verify_dummy_password_async(password)
+            return None
+        valid, new_hash = await verify_password_async(password, user.password)
+        if not valid:
+            return None
+        if new_hash:
+            self.update(db, db_obj=user, obj_in={"password": new_hash})
+        return user
 
 
 user_repository = UserRepository() 
\ No newline at end of file
@@ -2,19 +2,32 @@
 Sesión de base de datos con SQLAlchemy.
 """
 
+import itertools
+import math
+import threading
+import time
+from typing import List, Optional
+
+from fastapi import Request, Response
 from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.engine import Engine
 from sqlite3 import Connection as SQLite3Connection
 
 from app.core.config import settings
 
+
+def _create_engine(url: str) -> Engine:
+    """Crea un motor de base de datos con las opciones adecuadas para la URL."""
+    return create_engine(
+        url,
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {}
+    )
+
+
 # Configuración del motor de base de datos
-engine = create_engine(
-    settings.get_database_url(),
-    connect_args={"check_same_thread": False} if settings.USE_SQLITE else {}
-)
+engine = _create_engine(settings.get_database_url())
 
 # Configuración para SQLite para asegurar que FOREIGN KEY constraints se respetan
 @event.listens_for(Engine, "connect")
@@ -28,13 +41,149 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Cookie y header con el instante (epoch) de la última escritura del cliente.
+# Viajan con el cliente, de modo que read-your-writes funciona aunque la
+# siguiente petición la atienda otro worker o el token haya cambiado.
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+# Clave en Session.info con la respuesta en la que se anotan las escrituras
+RESPONSE_KEY = "response"
+
+
+class ReadReplicaRouter:
+    """
+    Reparte las sesiones de solo lectura entre las réplicas (round-robin).
+
+    Tras un commit en el primario se anota en la respuesta el instante de la
+    escritura (cookie y header X-Last-Write). Mientras el cliente lo envíe y
+    no hayan pasado `sticky_seconds`, sus lecturas van al primario para que vea
+    sus propias escrituras aunque las réplicas vayan con retraso.
+    """
+
+    def __init__(
+        self,
+        primary: sessionmaker,
+        replicas: List[sessionmaker],
+        sticky_seconds: float = 5.0,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self._replica_cycle = itertools.cycle(replicas) if replicas else None
+        self._lock = threading.Lock()
+
+    def mark_write(self, response: Response) -> None:
+        """
+        Anota en la respuesta que el cliente acaba de escribir en el primario.
+
+        Args:
+            response: Respuesta de la petición en curso.
+        """
+        if not self.replicas:
+            return
+        now = f"{time.time():.3f}"
+        # Varios commits en la misma petición: basta con una cookie
+        if LAST_WRITE_HEADER not in response.headers:
+            response.set_cookie(
+                LAST_WRITE_COOKIE,
+                now,
+                max_age=max(1, math.ceil(self.sticky_seconds)),
+                httponly=True,
+                samesite="lax",
+            )
+        response.headers[LAST_WRITE_HEADER] = now
+
+    def is_sticky(self, last_write: Optional[float]) -> bool:
+        """
+        Indica si las lecturas del cliente deben ir al primario.
+
+        Args:
+            last_write: Instante (epoch) de la última escritura del cliente, o None.
+        """
+        if last_write is None:
+            return False
+        # Un instante muy en el futuro no puede fijar al cliente en el primario
+        return abs(time.time() - last_write) < self.sticky_seconds
+
+    def read_session(self, last_write: Optional[float] = None) -> Session:
+        """
+        Crea una sesión para lecturas: una réplica o, si no hay réplicas o el
+        cliente escribió hace poco, el primario.
+
+        Args:
+            last_write: Instante (epoch) de la última escritura del cliente, o None.
+
+        Returns:
+            Sesión de base de datos.
+        """
+        if self._replica_cycle is None or self.is_sticky(last_write):
+            return self.primary()
+        with self._lock:
+            replica = next(self._replica_cycle)
+        return replica()
+
+
+read_router = ReadReplicaRouter(
+    SessionLocal,
+    [
+        sessionmaker(autocommit=False, autoflush=False, bind=_create_engine(url))
+        for url in settings.get_replica_urls()
+    ],
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def mark_client_write(session: Session):
+    """Activa read-your-writes para el cliente que confirmó la transacción."""
+    response = session.info.get(RESPONSE_KEY)
+    if response is not None:
+        read_router.mark_write(response)
+
+
+def get_last_write(request: Request) -> Optional[float]:
+    """
+    Instante de la última escritura del cliente, según su header o su cookie.
+
+    Args:
+        request: Petición HTTP.
+
+    Returns:
+        Instante (epoch) de la escritura, o None si no lo envía o no es válido.
+    """
+    value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
 # Dependency para obtener una sesión de DB en los endpoints
-def get_db():
+def get_db(response: Response):
     """
     Dependency para obtener una sesión de base de datos y cerrarla al finalizar.
     """
     db = SessionLocal()
+    db.info[RESPONSE_KEY] = response
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request):
+    """
+    Dependency para endpoints de solo lectura.
+
+    Usa una réplica de lectura si hay alguna configurada (DATABASE_REPLICA_URLS)
+    salvo que el cliente haya escrito hace menos de REPLICA_STICKY_SECONDS.
+    Sin réplicas es equivalente a `get_db`.
+    """
+    db = read_router.read_session(get_last_write(request))
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
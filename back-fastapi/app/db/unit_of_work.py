@@ -0,0 +1,94 @@
+"""
+Unidad de trabajo para agrupar las escrituras de una petición en una sola transacción.
+
+Por defecto cada método de escritura de los repositorios hace commit y refresh.
+Dentro de `unit_of_work(db)` los repositorios solo hacen flush y la transacción
+se confirma una única vez al salir del bloque:
+
+    with unit_of_work(db):
+        character_progress_repository.create_or_update(db, obj_in=progress)
+        character_repository.update(db, db_obj=character, obj_in=changes)
+"""
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+# Clave en Session.info que indica que hay una unidad de trabajo activa
+UNIT_OF_WORK_KEY = "unit_of_work"
+
+
+def in_unit_of_work(db: Session) -> bool:
+    """
+    Indica si la sesión tiene una unidad de trabajo activa.
+
+    Args:
+        db: Sesión de base de datos.
+
+    Returns:
+        True si las escrituras deben hacer flush en lugar de commit.
+    """
+    return db.info.get(UNIT_OF_WORK_KEY, False)
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """
+    Agrupa las escrituras de los repositorios en una única transacción.
+
+    Al salir sin errores se hace un solo commit sin expirar los objetos cargados,
+    de modo que la respuesta se puede serializar sin volver a consultarlos.
+    Si se produce una excepción se hace rollback. Los bloques anidados se unen
+    a la unidad de trabajo exterior.
+
+    Args:
+        db: Sesión de base de datos.
+
+    Yields:
+        La misma sesión.
+    """
+    if in_unit_of_work(db):
+        yield db
+        return
+
+    db.info[UNIT_OF_WORK_KEY] = True
+    try:
+        yield db
+        expire_on_commit = db.expire_on_commit
+        db.expire_on_commit = False
+        try:
+            db.commit()
+        finally:
+            db.expire_on_commit = expire_on_commit
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.info.pop(UNIT_OF_WORK_KEY, None)
+
+
+def persist(db: Session, *db_objs, refresh: bool = False) -> None:
+    """
+    Confirma las escrituras pendientes de un repositorio.
+
+    Fuera de una unidad de trabajo hace commit y refresca los objetos indicados
+    (el comportamiento histórico de los repositorios). Dentro de una unidad de
+    trabajo solo hace flush; las columnas generadas por el servidor en INSERT y
+    UPDATE ya se obtienen con RETURNING (eager_defaults), así que los objetos solo
+    se refrescan si se pide explícitamente con `refresh=True`.
+
+    Args:
+        db: Sesión de base de datos.
+        db_objs: Objetos a refrescar tras la escritura.
+        refresh: Forzar el refresh también dentro de una unidad de trabajo.
+    """
+    if in_unit_of_work(db):
+        db.flush()
+        if not refresh:
+            return
+    else:
+        db.commit()
+
+    for db_obj in db_objs:
+        db.refresh(db_obj)
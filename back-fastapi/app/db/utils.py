@@ -4,70 +4,249 @@ Utilidades para la base de datos.
 
 import uuid
 import json
-from sqlalchemy import TypeDecorator, String, Text
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+from sqlalchemy import TypeDecorator, String, Text, LargeBinary, func, literal
 from sqlalchemy.dialects.postgresql import UUID as pgUUID, JSONB as pgJSONB
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# orjson es opcional: si está instalado se usa para serializar JSON en SQLite
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+
+def json_dumps(value) -> str:
+    """
+    Serializa un valor a JSON usando orjson cuando está disponible.
+
+    Args:
+        value: Valor a serializar.
+
+    Returns:
+        Cadena JSON.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode("utf-8")
+        except TypeError:
+            # orjson es más estricto (p. ej. claves no str o enteros > 64 bits)
+            pass
+    return json.dumps(value)
+
+
+def json_loads(value):
+    """
+    Deserializa una cadena JSON usando orjson cuando está disponible.
+
+    Args:
+        value: Cadena (o bytes) JSON.
+
+    Returns:
+        Valor deserializado.
+    """
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
 
 class UUID(TypeDecorator):
     """
     Tipo personalizado que usa PostgreSQL's UUID cuando está disponible,
     pero se comporta como un String para SQLite y otras bases de datos.
+
+    Si SQLITE_BINARY_UUID está activo, en SQLite se guarda como BLOB de 16 bytes
+    en lugar de la representación textual de 36 caracteres.
     """
-    
+
     impl = String
     cache_ok = True
-    
+
     def load_dialect_impl(self, dialect):
         if dialect.name == 'postgresql':
             return dialect.type_descriptor(pgUUID())
+        elif dialect.name == 'sqlite' and settings.SQLITE_BINARY_UUID:
+            return dialect.type_descriptor(LargeBinary(16))
         else:
             return dialect.type_descriptor(String(36))
-    
+
     def process_bind_param(self, value, dialect):
         if value is None:
             return value
         elif dialect.name == 'postgresql':
             return value
-        else:
-            if not isinstance(value, uuid.UUID):
-                return str(uuid.UUID(value))
-            else:
-                return str(value)
-    
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(value)
+        if dialect.name == 'sqlite' and settings.SQLITE_BINARY_UUID:
+            return value.bytes
+        return str(value)
+
     def process_result_value(self, value, dialect):
-        if value is None:
+        if value is None or isinstance(value, uuid.UUID):
             return value
-        else:
-            if not isinstance(value, uuid.UUID):
-                value = uuid.UUID(value)
-            return value
-            
+        if isinstance(value, bytes):
+            return uuid.UUID(bytes=value)
+        return uuid.UUID(value)
+
 class JSONB(TypeDecorator):
     """
     Tipo personalizado que usa PostgreSQL's JSONB cuando está disponible,
     pero se comporta como un TEXT con JSON serializado para SQLite y otras bases de datos.
+
+    En SQLite el texto es JSON válido, por lo que puede consultarse con las
+    funciones de JSON1 (json_extract, json_insert, ...).
     """
-    
+
     impl = Text
     cache_ok = True
-    
+
     def load_dialect_impl(self, dialect):
         if dialect.name == 'postgresql':
             return dialect.type_descriptor(pgJSONB())
         else:
             return dialect.type_descriptor(Text())
-    
+
     def process_bind_param(self, value, dialect):
         if value is None:
             return value
         elif dialect.name == 'postgresql':
             return value
         else:
-            return json.dumps(value)
-    
+            return json_dumps(value)
+
     def process_result_value(self, value, dialect):
         if value is None:
             return value
         elif dialect.name == 'postgresql':
             return value
         else:
-            return json.loads(value) 
\ No newline at end of file
+            return json_loads(value)
+
+
+def dialect_insert(db: Session, model):
+    """
+    Crea un INSERT específico del dialecto de la sesión (con soporte ON CONFLICT).
+
+    Args:
+        db: Sesión de base de datos.
+        model: Modelo SQLAlchemy sobre el que insertar.
+
+    Returns:
+        Sentencia INSERT de PostgreSQL o SQLite.
+    """
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == 'postgresql':
+        return pg_insert(model)
+    elif dialect_name == 'sqlite':
+        return sqlite_insert(model)
+    raise NotImplementedError(f"Upsert no soportado para el dialecto {dialect_name}")
+
+
+def upsert_statement(
+    db: Session,
+    model,
+    values: Any = None,
+    *,
+    index_elements: Iterable[str],
+    set_: Optional[Dict[str, Any]] = None,
+    update_fields: Optional[Iterable[str]] = None,
+    where=None,
+):
+    """
+    Construye un INSERT ... ON CONFLICT para el dialecto de la sesión.
+
+    Args:
+        db: Sesión de base de datos.
+        model: Modelo SQLAlchemy sobre el que insertar.
+        values: Valores a insertar. Si es None, los valores se pasan al ejecutar
+            (executemany con una lista de dicts).
+        index_elements: Columnas del índice único que detecta el conflicto.
+        set_: Columnas a actualizar si hay conflicto, con su nuevo valor.
+        update_fields: Columnas a actualizar con el valor que se intentó insertar
+            (EXCLUDED). Se combina con `set_`.
+        where: Condición opcional para aplicar la actualización.
+
+    Returns:
+        Sentencia INSERT lista para ejecutar (se le puede añadir RETURNING).
+        Si no hay columnas que actualizar se usa ON CONFLICT DO NOTHING.
+    """
+    stmt = dialect_insert(db, model)
+    if values is not None:
+        stmt = stmt.values(values)
+
+    update = {field: stmt.excluded[field] for field in (update_fields or ())}
+    update.update(set_ or {})
+    if not update:
+        return stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+    return stmt.on_conflict_do_update(
+        index_elements=list(index_elements), set_=update, where=where
+    )
+
+
+def json_array_append(db: Session, column, value: Any):
+    """
+    Construye una expresión SQL que añade un valor al final de un array JSON.
+    
+    La escritura tiene un tamaño constante: se envía solo el nuevo elemento y la
+    base de datos concatena sobre el valor actual (NULL se trata como []).
+    
+    Args:
+        db: Sesión de base de datos.
+        column: Columna JSONB con el array.
+        value: Valor escalar a añadir.
+        
+    Returns:
+        Expresión para usar en un UPDATE o en un ON CONFLICT DO UPDATE.
+    """
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == 'postgresql':
+        empty = literal([], pgJSONB)
+        return func.coalesce(column, empty).op("||")(func.jsonb_build_array(value))
+    elif dialect_name == 'sqlite':
+        # '$[#]' apunta a la posición siguiente al último elemento (SQLite >= 3.31)
+        empty = literal("[]", String)
+        return func.json_insert(func.coalesce(column, empty), "$[#]", value)
+    raise NotImplementedError(f"Arrays JSON no soportados para el dialecto {dialect_name}")
+
+
+def encode_cursor(created_at: datetime, id: uuid.UUID) -> str:
+    """
+    Codifica la posición (created_at, id) de un registro como cursor opaco.
+
+    Args:
+        created_at: Fecha de creación del último registro de la página.
+        id: ID del último registro de la página.
+
+    Returns:
+        Cursor en base64 apto para URLs.
+    """
+    raw = json_dumps([created_at.isoformat(), str(id)]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decodifica un cursor generado por `encode_cursor`.
+
+    Args:
+        cursor: Cursor opaco recibido del cliente.
+
+    Returns:
+        Tupla (created_at, id).
+
+    Raises:
+        ValueError: Si el cursor no es válido.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json_loads(raw)
+        return datetime.fromisoformat(created_at), uuid.UUID(id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
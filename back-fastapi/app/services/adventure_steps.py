@@ -0,0 +1,222 @@
+"""
+Caché de los pasos de las aventuras.
+
+Los pasos de cada aventura se guardan como un único JSON. En lugar de cargarlo
+y devolverlo entero en cada petición, se compila una vez en una estructura
+inmutable e indexada (`CompiledAdventure`) que se cachea por id de aventura y
+se revalida con `updated_at`, la única columna que hay que consultar en un acierto.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.adventure import Adventure
+from app.db.utils import json_dumps
+from app.services.rewards import RewardTable, compile_reward_rules
+
+
+def _freeze(value: Any) -> Any:
+    """Convierte recursivamente dicts y listas en mappings y tuplas de solo lectura."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class CompiledAdventure:
+    """
+    Pasos de una aventura ya parseados, inmutables e indexados por posición.
+
+    Cada paso se guarda congelado (para consultar narrativa y opciones) y
+    serializado a JSON (para responder sin volver a serializar).
+
+    Attributes:
+        id: ID de la aventura.
+        updated_at: Fecha de modificación de la versión compilada.
+        steps: Pasos de la aventura como mappings de solo lectura.
+        transitions: Paso al que lleva cada (paso, opción): su `next_step` o,
+            si no lo define, el paso siguiente.
+        rewards: Recompensas de cada (paso, opción), ver `app.services.rewards`.
+    """
+
+    __slots__ = ("id", "updated_at", "steps", "transitions", "rewards", "_encoded")
+
+    def __init__(self, id: UUID, updated_at: Optional[datetime], steps: Any):
+        self.id = id
+        self.updated_at = updated_at
+        self.steps: Tuple[Mapping[str, Any], ...] = tuple(_freeze(step) for step in steps or ())
+        self._encoded: Tuple[bytes, ...] = tuple(
+            json_dumps(step).encode("utf-8") for step in steps or ()
+        )
+
+        transitions: Dict[Tuple[int, int], int] = {}
+        for step_index, step in enumerate(self.steps):
+            options = step.get("options", ()) if isinstance(step, Mapping) else ()
+            for option_index, option in enumerate(options):
+                if not isinstance(option, Mapping):
+                    continue
+                next_step = option.get("next_step")
+                if not isinstance(next_step, int):
+                    next_step = step_index + 1
+                transitions[(step_index, option_index)] = next_step
+        self.transitions: Mapping[Tuple[int, int], int] = MappingProxyType(transitions)
+        self.rewards: RewardTable = compile_reward_rules(self.steps)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def has_step(self, index: int) -> bool:
+        """Indica si existe el paso con el índice dado."""
+        return 0 <= index < len(self.steps)
+
+    def follow(self, choices: Sequence[int], start: int = 0) -> Optional[int]:
+        """
+        Recorre el grafo de la aventura siguiendo una secuencia de elecciones.
+
+        Args:
+            choices: Elecciones, en orden.
+            start: Paso inicial.
+
+        Returns:
+            El paso al que se llega, o None si alguna elección no existe en su paso.
+        """
+        step = start
+        for choice in choices:
+            next_step = self.transitions.get((step, choice))
+            if next_step is None:
+                return None
+            step = next_step
+        return step
+
+    def step_json(self, index: int) -> bytes:
+        """
+        Obtiene un paso serializado a JSON.
+
+        Args:
+            index: Índice del paso.
+
+        Returns:
+            El paso en JSON (UTF-8).
+
+        Raises:
+            IndexError: Si el paso no existe.
+        """
+        if not self.has_step(index):
+            raise IndexError(index)
+        return self._encoded[index]
+
+    def range_json(self, offset: int = 0, limit: Optional[int] = None) -> bytes:
+        """
+        Obtiene un rango de pasos serializado como un array JSON.
+
+        Args:
+            offset: Índice del primer paso.
+            limit: Número máximo de pasos, o None para llegar hasta el final.
+
+        Returns:
+            Array JSON (UTF-8) con los pasos del rango.
+        """
+        end = None if limit is None else offset + limit
+        return b"[" + b",".join(self._encoded[offset:end]) + b"]"
+
+
+class AdventureStepCache:
+    """
+    Caché LRU de aventuras compiladas, por proceso.
+
+    En cada lectura solo se consulta `updated_at`; los pasos se cargan y
+    compilan de nuevo únicamente si la aventura no está en caché o ha cambiado.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._items: "OrderedDict[UUID, CompiledAdventure]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, adventure_id: UUID) -> Optional[CompiledAdventure]:
+        """
+        Obtiene los pasos compilados de una aventura.
+
+        Args:
+            db: Sesión de base de datos.
+            adventure_id: ID de la aventura.
+
+        Returns:
+            La aventura compilada, o None si la aventura no existe.
+        """
+        row = db.execute(
+            select(Adventure.updated_at).where(Adventure.id == adventure_id)
+        ).first()
+        if row is None:
+            self.invalidate(adventure_id)
+            return None
+
+        with self._lock:
+            compiled = self._items.get(adventure_id)
+            if compiled is not None and compiled.updated_at == row.updated_at:
+                self._items.move_to_end(adventure_id)
+                return compiled
+
+        row = db.execute(
+            select(Adventure.steps, Adventure.updated_at).where(Adventure.id == adventure_id)
+        ).first()
+        if row is None:
+            return None
+        compiled = CompiledAdventure(adventure_id, row.updated_at, row.steps)
+
+        with self._lock:
+            self._items[adventure_id] = compiled
+            self._items.move_to_end(adventure_id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return compiled
+
+    def preload(self, db: Session) -> int:
+        """
+        Compila de una vez las aventuras modificadas más recientemente.
+
+        Args:
+            db: Sesión de base de datos.
+
+        Returns:
+            Número de aventuras cargadas en la caché.
+        """
+        rows = db.execute(
+            select(Adventure.id, Adventure.steps, Adventure.updated_at)
+            .order_by(Adventure.updated_at.desc())
+            .limit(self.max_size)
+        ).all()
+        compiled = [CompiledAdventure(row.id, row.updated_at, row.steps) for row in reversed(rows)]
+
+        with self._lock:
+            for adventure in compiled:
+                self._items[adventure.id] = adventure
+                self._items.move_to_end(adventure.id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return len(compiled)
+
+    def invalidate(self, adventure_id: Optional[UUID] = None) -> None:
+        """
+        Descarta una aventura de la caché, o todas si no se indica ninguna.
+
+        Args:
+            adventure_id: ID de la aventura a descartar.
+        """
+        with self._lock:
+            if adventure_id is None:
+                self._items.clear()
+            else:
+                self._items.pop(adventure_id, None)
+
+
+adventure_step_cache = AdventureStepCache(max_size=settings.ADVENTURE_STEP_CACHE_SIZE)
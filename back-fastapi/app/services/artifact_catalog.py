@@ -0,0 +1,172 @@
+"""
+Caché en memoria del catálogo de artefactos.
+
+El catálogo es pequeño y casi estático, así que se carga una vez por proceso
+(al arrancar o en la primera lectura) y se sirve desde memoria. Las escrituras
+a través de `artifact_repository` lo invalidan tras el commit e incrementan el
+contador `artifacts` de la tabla cache_versions, que el resto de workers
+comprueban cada ARTIFACT_CATALOG_VERSION_CHECK_SECONDS para recargarlo.
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.schemas.artifact import Artifact as ArtifactSchema
+from app.core.config import settings
+from app.db.models.artifact import Artifact
+from app.db.models.cache_version import CacheVersion
+from app.db.utils import decode_cursor, encode_cursor
+
+# Nombre del contador del catálogo en la tabla cache_versions
+ARTIFACT_CATALOG_VERSION = "artifacts"
+
+
+class ArtifactCatalog:
+    """
+    Catálogo de artefactos indexado por id y ordenado por (created_at, id).
+
+    Los artefactos se guardan como esquemas de Pydantic, de modo que no dependen
+    de la sesión con la que se cargaron y se pueden compartir entre peticiones.
+    """
+
+    def __init__(self, version_check_seconds: float = 5.0):
+        self.version_check_seconds = version_check_seconds
+        # (artefactos ordenados, claves (created_at, id), índice por id); se
+        # reemplaza entero en cada carga para que los lectores vean un estado coherente
+        self._snapshot: Tuple[Tuple[ArtifactSchema, ...], List[Tuple], Dict[UUID, ArtifactSchema]] = ((), [], {})
+        self._version: Optional[int] = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _read_version(db: Session) -> int:
+        """Lee el contador de versión del catálogo (0 si nunca se ha modificado)."""
+        version = db.execute(
+            select(CacheVersion.version).where(CacheVersion.name == ARTIFACT_CATALOG_VERSION)
+        ).scalar()
+        return version or 0
+
+    def load(self, db: Session) -> None:
+        """
+        Carga (o recarga) el catálogo completo desde la base de datos.
+
+        Args:
+            db: Sesión de base de datos.
+        """
+        with self._lock:
+            version = self._read_version(db)
+            artifacts = db.execute(
+                select(Artifact).order_by(Artifact.created_at, Artifact.id)
+            ).scalars().all()
+            ordered = tuple(ArtifactSchema.model_validate(artifact) for artifact in artifacts)
+
+            self._snapshot = (
+                ordered,
+                [(artifact.created_at, artifact.id) for artifact in ordered],
+                {artifact.id: artifact for artifact in ordered},
+            )
+            self._version = version
+            self._checked_at = time.monotonic()
+            self._loaded = True
+
+    def invalidate(self) -> None:
+        """Descarta el catálogo; la siguiente lectura lo vuelve a cargar."""
+        self._loaded = False
+
+    def _ensure_fresh(self, db: Session) -> None:
+        """
+        Carga el catálogo si no está cargado o si otro worker lo ha modificado.
+
+        Args:
+            db: Sesión de base de datos.
+        """
+        if not self._loaded:
+            self.load(db)
+            return
+
+        if self.version_check_seconds <= 0:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.version_check_seconds:
+            return
+        self._checked_at = now
+        if self._read_version(db) != self._version:
+            self.load(db)
+
+    def get(self, db: Session, id: UUID) -> Optional[ArtifactSchema]:
+        """
+        Obtiene un artefacto por su ID.
+
+        Args:
+            db: Sesión de base de datos (solo se usa si hay que cargar el catálogo).
+            id: ID del artefacto.
+
+        Returns:
+            El artefacto si existe, None en caso contrario.
+        """
+        self._ensure_fresh(db)
+        return self._snapshot[2].get(id)
+
+    def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[ArtifactSchema]:
+        """
+        Obtiene una página de artefactos por offset.
+
+        Args:
+            db: Sesión de base de datos (solo se usa si hay que cargar el catálogo).
+            skip: Número de artefactos a omitir.
+            limit: Límite de artefactos a retornar.
+
+        Returns:
+            Lista de artefactos.
+        """
+        self._ensure_fresh(db)
+        return list(self._snapshot[0][skip:skip + limit])
+
+    def list_page(
+        self, db: Session, *, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[ArtifactSchema], Optional[str]]:
+        """
+        Obtiene una página de artefactos por cursor, con el mismo formato de
+        cursor que `BaseRepository.get_multi_by_cursor`.
+
+        Args:
+            db: Sesión de base de datos (solo se usa si hay que cargar el catálogo).
+            cursor: Cursor opaco devuelto por la página anterior, o None para la primera.
+            limit: Límite de artefactos a retornar.
+
+        Returns:
+            Tupla con la lista de artefactos y el cursor de la página siguiente
+            (None si no hay más artefactos).
+
+        Raises:
+            ValueError: Si el cursor no es válido.
+        """
+        self._ensure_fresh(db)
+        ordered, keys, _ = self._snapshot
+
+        start = 0
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            try:
+                start = bisect.bisect_right(keys, (created_at, last_id))
+            except TypeError as e:
+                # Fechas con y sin zona horaria no son comparables
+                raise ValueError(f"Cursor inválido: {cursor}") from e
+
+        items = list(ordered[start:start + limit])
+        if start + limit >= len(ordered):
+            return items, None
+        last = items[-1]
+        return items, encode_cursor(last.created_at, last.id)
+
+
+artifact_catalog = ArtifactCatalog(
+    version_check_seconds=settings.ARTIFACT_CATALOG_VERSION_CHECK_SECONDS
+)
@@ -2,10 +2,13 @@
 Wrapper para ejecutar funciones síncronas en un entorno asincrónico.
 """
 import asyncio
+import logging
 from functools import wraps
 from typing import Any, Callable, Coroutine, Dict
 import concurrent.futures
 
+logger = logging.getLogger(__name__)
+
 def to_async(func: Callable) -> Callable[..., Coroutine[Any, Any, Any]]:
     """
     Convierte una función síncrona en asíncrona.
@@ -46,7 +49,7 @@ class AsyncGraph:
             return await run_func(inputs)
         except Exception as e:
             # Fallback a una simulación básica si hay error
-            print(f"Error ejecutando el grafo: {str(e)}")
+            logger.warning("Error ejecutando el grafo: %s", e)
             return self._fallback_simulation(inputs)
 
     def _fallback_simulation(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
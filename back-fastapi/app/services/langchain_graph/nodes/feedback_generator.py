@@ -1,10 +1,14 @@
 """
 Nodo para generar feedback para cada opción.
 """
+import logging
 from typing import Dict, Any, List
 from langchain_core.prompts import ChatPromptTemplate 
 from langchain_openai import ChatOpenAI
 from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
 
 # Configurar el modelo LLM
 llm = ChatOpenAI(
@@ -36,11 +40,12 @@ def generate_feedback(data: Dict[str, Any]) -> Dict[str, Any]:
     for option in options:
         try:
             # Invocar la cadena
-            result = chain.invoke({
-                "option_text": option["text"], 
-                "option_value": option["value"],
-                "effects": str(option["effect"])
-            })
+            with metrics.track_llm_call("generate_feedback"):
+                result = chain.invoke({
+                    "option_text": option["text"], 
+                    "option_value": option["value"],
+                    "effects": str(option["effect"])
+                })
             
             # Obtener el contenido del mensaje
             feedback = result.content.strip()
@@ -54,7 +59,7 @@ def generate_feedback(data: Dict[str, Any]) -> Dict[str, Any]:
             options_with_feedback.append(option_with_feedback)
             
         except Exception as e:
-            print(f"Error generating feedback: {str(e)}")
+            logger.warning("Error generating feedback: %s", e)
             # Si hay error, usar feedback genérico
             option_with_feedback = option.copy()
             option_with_feedback["feedback"] = "Una elección interesante para un viajero cósmico."
@@ -1,14 +1,20 @@
 import google as genai
 from PIL import Image
 from io import BytesIO
+import logging
 import uuid
 from datetime import datetime
 import os
 from typing import Dict, Any, List, TypedDict
 from dotenv import load_dotenv
 
+from app.core.metrics import metrics
+from app.services.runtime_config import runtime_config
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 # Suponiendo que tienes un objeto settings o cargas la API key de otra forma
 # from app.core.config import settings # Comentado para ejemplo autocontenido
@@ -25,7 +31,7 @@ class GeminiImageGeneratorWithFlash:
         self.storage_path = storage_path
         self.model_name = model_name
         os.makedirs(self.storage_path, exist_ok=True)
-        print(f"Usando modelo Gemini: {self.model_name}")
+        logger.debug("Usando modelo Gemini: %s", self.model_name)
 
     def _format_prompt(self, scenario_description: str) -> str:
         return f"""
@@ -54,26 +60,25 @@ class GeminiImageGeneratorWithFlash:
                 f.write(image_data)
 
             relative_url = f"/{self.storage_path}/{filename}" # Asumiendo que storage_path es relativo a la raíz web de static
-            print(f"Imagen guardada en: {file_path}, URL relativa: {relative_url}")
+            logger.debug("Imagen guardada en: %s, URL relativa: %s", file_path, relative_url)
             return relative_url
         except Exception as e:
-            print(f"Error al guardar o validar la imagen: {e}")
+            logger.warning("Error al guardar o validar la imagen: %s", e)
             raise ImageGenerationError(f"Fallo al procesar/guardar datos de imagen: {e}")
 
 
     async def generate_image(self, scenario_description: str) -> Dict[str, Any]:
-        # Suponiendo que tienes una variable global o un setting para habilitar/deshabilitar
-        # IMAGE_GENERATION_ENABLED = True # O settings.IMAGE_GENERATION_ENABLED
-        # if not IMAGE_GENERATION_ENABLED:
-        #     print("Generación de imágenes deshabilitada.")
-        #     return self._get_fallback_image(scenario_description, "Image generation disabled")
+        # Se puede desactivar en caliente desde /api/admin/runtime-config
+        if not runtime_config.current.image_generation_enabled:
+            logger.debug("Generación de imágenes deshabilitada.")
+            return self._get_fallback_image(scenario_description, "Image generation disabled")
 
         prompt_text = self._format_prompt(scenario_description)
         if not prompt_text:
-            print("Prompt vacío, usando fallback.")
+            logger.debug("Prompt vacío, usando fallback.")
             return self._get_fallback_image(scenario_description, "Prompt is empty")
 
-        print(f"Generando imagen para: '{scenario_description[:50]}...'")
+        logger.debug("Generando imagen para: '%s...'", scenario_description[:50])
 
         try:
             from google.genai import types  # Importación local para evitar error si no está instalado
@@ -88,26 +93,27 @@ class GeminiImageGeneratorWithFlash:
             )
             
             # Enviar la solicitud según formato de la documentación oficial
-            response = client.models.generate_content(
-                model=self.model_name,
-                contents=prompt_text,
-                config=types.GenerateContentConfig(
-                    response_modalities=["TEXT", "IMAGE"]
+            with metrics.track_llm_call("generate_image"):
+                response = client.models.generate_content(
+                    model=self.model_name,
+                    contents=prompt_text,
+                    config=types.GenerateContentConfig(
+                        response_modalities=["TEXT", "IMAGE"]
+                    )
                 )
-            )
 
             
             # Procesar la respuesta multimodal
-            print("Procesando respuesta del API...")
+            logger.debug("Procesando respuesta del API...")
             
             for part in response.candidates[0].content.parts:
                 if hasattr(part, 'text') and part.text is not None:
-                    print(f"Texto recibido: {part.text[:100]}...")
+                    logger.debug("Texto recibido: %s...", part.text[:100])
                 elif hasattr(part, 'inline_data') and part.inline_data is not None:
                     # Extraer los datos de la imagen
                     image_data = part.inline_data.data
                     mime_type = part.inline_data.mime_type
-                    print(f"Imagen recibida. Tipo MIME: {mime_type}")
+                    logger.debug("Imagen recibida. Tipo MIME: %s", mime_type)
                     
                     # Guardar la imagen
                     image_url = self._save_image(image_data, scenario_description)
@@ -117,17 +123,19 @@ class GeminiImageGeneratorWithFlash:
                     }
             
             # Si llegamos aquí, no se encontró ninguna imagen en la respuesta
-            print("No se encontró imagen en la respuesta")
+            logger.debug("No se encontró imagen en la respuesta")
             return self._get_fallback_image(scenario_description, "No se encontró imagen en la respuesta")
 
         except Exception as e:
-            import traceback
-            print(f"Excepción durante la llamada a la API de Gemini o procesamiento: {e}")
-            traceback.print_exc()
+            # La traza completa solo con el nivel DEBUG
+            logger.warning(
+                "Excepción durante la llamada a la API de Gemini o procesamiento: %s", e,
+                exc_info=logger.isEnabledFor(logging.DEBUG),
+            )
             return self._get_fallback_image(scenario_description, f"Error en API: {str(e)}")
 
     def _get_fallback_image(self, scenario_description: str, error_msg: str) -> Dict[str, str]:
-        print(f"FALLBACK: Usando imagen de respaldo para '{scenario_description[:30]}...'. Error: {error_msg}")
+        logger.debug("FALLBACK: Usando imagen de respaldo para '%s...'. Error: %s", scenario_description[:30], error_msg)
         # Lógica de fallback (puedes mejorarla como en tu código original)
         # Por simplicidad, devolvemos una URL genérica o un mensaje
         return {
@@ -3,8 +3,12 @@ from typing import Dict, Any
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from app.core.config import settings
+from app.core.metrics import metrics
+import logging
 import re
 
+logger = logging.getLogger(__name__)
+
 # Configurar el modelo LLM
 llm = ChatOpenAI(
     openai_api_key=settings.OPENAI_API_KEY,
@@ -47,7 +51,8 @@ def generate_options(data: Dict[str, Any]) -> Dict[str, Any]:
     chain = prompt | llm
     
     # Invocar la cadena
-    result = chain.invoke({"question": question, "scenario": scenario})
+    with metrics.track_llm_call("generate_options"):
+        result = chain.invoke({"question": question, "scenario": scenario})
     
     # Obtener el contenido del mensaje
     content = result.content
@@ -76,7 +81,7 @@ def generate_options(data: Dict[str, Any]) -> Dict[str, Any]:
                 else:
                     # Si no podemos encontrar un número, asignamos un valor por defecto
                     value = 1
-                    print(f"No se pudo encontrar un valor numérico en: {option_part}, asignando valor por defecto: 1")
+                    logger.debug("No se pudo encontrar un valor numérico en: %s, asignando valor por defecto: 1", option_part)
             
             # Extraer el texto de manera más flexible
             # Si tenemos corchetes, buscamos después del cierre "]:"
@@ -91,7 +96,7 @@ def generate_options(data: Dict[str, Any]) -> Dict[str, Any]:
                 else:
                     # Si todo falla, usamos toda la parte como texto
                     text = option_part
-                    print(f"Usando todo el texto como contenido: {text}")
+                    logger.debug("Usando todo el texto como contenido: %s", text)
             
             # Extraer el emoji de manera más flexible
             emoji_parts = emoji_part.split(":")
@@ -99,7 +104,7 @@ def generate_options(data: Dict[str, Any]) -> Dict[str, Any]:
                 emoji = emoji_parts[1].strip()
             else:
                 emoji = "❓"
-                print(f"No se pudo extraer emoji de: {emoji_part}, usando emoji por defecto")
+                logger.debug("No se pudo extraer emoji de: %s, usando emoji por defecto", emoji_part)
             
             # Parsear efectos de manera más flexible
             effects = {}
@@ -118,7 +123,7 @@ def generate_options(data: Dict[str, Any]) -> Dict[str, Any]:
             # Asegurarnos de que tenemos al menos un efecto
             if not effects:
                 effects = {"quantum_charisma": 5, "absurdity_resistance": 5}
-                print(f"No se pudieron extraer efectos de: {effects_part}, usando efectos por defecto")
+                logger.debug("No se pudieron extraer efectos de: %s, usando efectos por defecto", effects_part)
             
             options.append({
                 "text": text,
@@ -127,7 +132,7 @@ def generate_options(data: Dict[str, Any]) -> Dict[str, Any]:
                 "effect": effects
             })
         except Exception as e:
-            print(f"Error parsing option: {line}, Error: {str(e)}")
+            logger.warning("Error parsing option: %s, Error: %s", line, e)
             # Continuar con la siguiente opción
     
     # Asegurar que tenemos exactamente 4 opciones ordenadas por valor
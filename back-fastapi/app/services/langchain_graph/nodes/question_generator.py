@@ -5,6 +5,7 @@ from typing import Dict, Any
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from app.core.config import settings
+from app.core.metrics import metrics
 
 # Configurar el modelo LLM
 llm = ChatOpenAI(
@@ -40,7 +41,8 @@ def generate_question_and_scenario(data: Dict[str, Any]) -> Dict[str, Any]:
     chain = prompt | llm
     
     # Invocar la cadena
-    result = chain.invoke({"theme": theme_value})
+    with metrics.track_llm_call("generate_question"):
+        result = chain.invoke({"theme": theme_value})
     
     # Obtener el contenido del mensaje
     content = result.content
@@ -2,6 +2,7 @@
 from langgraph.graph import StateGraph, START, END
 from typing import Dict, Any, List, TypedDict
 import asyncio
+import logging
 
 
 # Importaciones de los nodos
@@ -10,6 +11,8 @@ from app.services.langchain_graph.nodes.image_generator import GeminiImageGenera
 from app.services.langchain_graph.nodes.options_generator import generate_options
 from app.services.langchain_graph.nodes.feedback_generator import generate_feedback
 
+logger = logging.getLogger(__name__)
+
 # Inicializar generador de imágenes
 image_generator = GeminiImageGenerator()
 
@@ -57,7 +60,7 @@ async def generate_personality_question(theme: str) -> Dict[str, Any]:
     """
     graph = build_personality_question_graph()
 
-    print(f"Graph: {graph}")
+    logger.debug("Graph: %s", graph)
     
     if graph is None:
         # Fallback si langgraph no está disponible
@@ -77,7 +80,7 @@ async def generate_personality_question(theme: str) -> Dict[str, Any]:
         
         return personality_question
     except Exception as e:
-        print(f"Error en grafo de generación de preguntas: {str(e)}")
+        logger.warning("Error en grafo de generación de preguntas: %s", e)
         # Si hay cualquier error en la ejecución del grafo, usar fallback
         return generate_fallback_question(theme)
 
@@ -120,9 +123,9 @@ async def generate_background_questions(db, num_questions):
         
         try:
             await generate_personality_question(themes[theme_idx])
-            print(f"Pregunta generada exitosamente para tema: {themes[theme_idx]}")
+            logger.debug("Pregunta generada exitosamente para tema: %s", themes[theme_idx])
         except Exception as e:
-            print(f"Error generando pregunta para tema {themes[theme_idx]}: {str(e)}")
+            logger.warning("Error generando pregunta para tema %s: %s", themes[theme_idx], e)
 
 if __name__ == "__main__":
     print("Generando preguntas en background...")
@@ -0,0 +1,113 @@
+"""
+Motor de recompensas de las aventuras.
+
+Las reglas se definen en los propios pasos de la aventura:
+
+    {
+        "narrative": "...",
+        "rewards": [{"type": "experience", "value": 100}],   # al llegar al paso
+        "options": [
+            {
+                "text": "...",
+                "next_step": 3,
+                "artifact_id": "...",                           # artefacto al elegirla
+                "rewards": [{"type": "experience", "value": 50}] # al elegirla
+            }
+        ]
+    }
+
+`compile_reward_rules` las compila una vez por aventura en una tabla indexada
+por (paso, opción elegida) con todas las recompensas de esa transición: las de
+la opción más las del paso al que lleva. Calcular las recompensas de un
+guardado es una única búsqueda en esa tabla.
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# Tabla de recompensas: (paso, opción) -> recompensas de la transición
+RewardTable = Mapping[Tuple[int, int], Tuple[Mapping[str, Any], ...]]
+
+
+def _compile_reward(reward: Any) -> Optional[Mapping[str, Any]]:
+    """
+    Valida y normaliza una regla de recompensa.
+
+    Args:
+        reward: Regla tal como aparece en el JSON de pasos.
+
+    Returns:
+        La recompensa normalizada, o None si la regla no es válida.
+    """
+    if not isinstance(reward, Mapping) or not isinstance(reward.get("type"), str):
+        return None
+    if reward["type"] == "experience":
+        value = reward.get("value")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            return None
+        return MappingProxyType({"type": "experience", "value": int(value)})
+    return MappingProxyType(dict(reward))
+
+
+def _compile_rewards(rewards: Any) -> Tuple[Mapping[str, Any], ...]:
+    """Compila una lista de reglas descartando las que no son válidas."""
+    if not isinstance(rewards, Sequence) or isinstance(rewards, str):
+        return ()
+    compiled = (_compile_reward(reward) for reward in rewards)
+    return tuple(reward for reward in compiled if reward is not None)
+
+
+def compile_reward_rules(steps: Sequence[Mapping[str, Any]]) -> RewardTable:
+    """
+    Compila las reglas de recompensa de los pasos de una aventura.
+
+    Args:
+        steps: Pasos de la aventura.
+
+    Returns:
+        Tabla de solo lectura (paso, opción) -> recompensas. Las transiciones
+        sin recompensas no aparecen en la tabla.
+    """
+    step_rewards = [
+        _compile_rewards(step.get("rewards")) if isinstance(step, Mapping) else ()
+        for step in steps
+    ]
+
+    table: Dict[Tuple[int, int], Tuple[Mapping[str, Any], ...]] = {}
+    for step_index, step in enumerate(steps):
+        options = step.get("options", ()) if isinstance(step, Mapping) else ()
+        for option_index, option in enumerate(options):
+            if not isinstance(option, Mapping):
+                continue
+            rewards = list(_compile_rewards(option.get("rewards")))
+
+            artifact_id = option.get("artifact_id")
+            if artifact_id:
+                rewards.append(MappingProxyType({"type": "artifact", "id": artifact_id}))
+
+            # Al elegir la opción se llega al paso `next_step` (o al siguiente)
+            next_step = option.get("next_step")
+            if not isinstance(next_step, int):
+                next_step = step_index + 1
+            if 0 <= next_step < len(step_rewards):
+                rewards.extend(step_rewards[next_step])
+
+            if rewards:
+                table[(step_index, option_index)] = tuple(rewards)
+    return MappingProxyType(table)
+
+
+def calculate_rewards(table: RewardTable, step: int, choice: int) -> List[Dict[str, Any]]:
+    """
+    Calcula las recompensas de una elección.
+
+    Args:
+        table: Tabla compilada con `compile_reward_rules`.
+        step: Paso en el que se hizo la elección (no el paso al que lleva).
+        choice: Índice de la opción elegida.
+
+    Returns:
+        Lista de recompensas (dicts nuevos, que el llamador puede modificar).
+    """
+    rewards = table.get((step, choice), ())
+    return [dict(reward) for reward in rewards]
@@ -0,0 +1,314 @@
+"""
+Configuración modificable en caliente.
+
+Agrupa los ajustes que conviene poder cambiar sin reiniciar, p. ej. para dejar
+de hacer trabajo caro durante un pico de tráfico: el modo de generación de
+preguntas, el máximo de llamadas concurrentes al LLM, las caducidades de las
+cachés y la generación de imágenes.
+
+La configuración vigente es un dataclass inmutable en `runtime_config.current`.
+Un cambio construye una instancia nueva y sustituye la referencia, así que un
+lector siempre ve una configuración completa y coherente sin tomar ningún lock.
+
+Los cambios se guardan en la tabla runtime_config e incrementan el contador
+`runtime_config` de la tabla cache_versions. Cada worker comprueba el contador
+cada RUNTIME_CONFIG_CHECK_SECONDS en una tarea en segundo plano (`poll`, que se
+lanza al arrancar) y, si ha cambiado, recarga la configuración; las peticiones
+solo leen `runtime_config.current`.
+"""
+
+import asyncio
+import dataclasses
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.repositories.runtime_config import runtime_config_repository
+from app.services.artifact_catalog import artifact_catalog
+from app.services.user_cache import user_cache
+
+# Modos de generación de preguntas de personalidad
+GENERATION_MODE_FALLBACK = "fallback"
+GENERATION_MODE_SIMPLE = "simple"
+GENERATION_MODE_LANGGRAPH = "langgraph"
+GENERATION_MODES = (GENERATION_MODE_FALLBACK, GENERATION_MODE_SIMPLE, GENERATION_MODE_LANGGRAPH)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """Instantánea de la configuración modificable en caliente."""
+
+    generation_mode: str
+    llm_max_concurrency: int
+    image_generation_enabled: bool
+    user_cache_ttl_seconds: float
+    artifact_catalog_check_seconds: float
+
+    def __post_init__(self):
+        if self.generation_mode not in GENERATION_MODES:
+            raise ValueError(f"Modo de generación desconocido: {self.generation_mode}")
+        if self.llm_max_concurrency < 0:
+            raise ValueError("llm_max_concurrency no puede ser negativo")
+        if self.user_cache_ttl_seconds < 0 or self.artifact_catalog_check_seconds < 0:
+            raise ValueError("Las caducidades de las cachés no pueden ser negativas")
+
+    @classmethod
+    def from_settings(cls, config=settings) -> "RuntimeConfig":
+        """
+        Construye la configuración inicial a partir de `Settings`.
+
+        Args:
+            config: Configuración de la aplicación.
+
+        Returns:
+            La configuración inicial.
+        """
+        generation_mode = config.GENERATION_MODE or (
+            GENERATION_MODE_SIMPLE if config.GENERATE_QUESTIONS_ON_DEMAND else GENERATION_MODE_FALLBACK
+        )
+        return cls(
+            generation_mode=generation_mode,
+            llm_max_concurrency=config.LLM_MAX_CONCURRENCY,
+            image_generation_enabled=config.IMAGE_GENERATION_ENABLED,
+            user_cache_ttl_seconds=config.USER_CACHE_TTL_SECONDS,
+            artifact_catalog_check_seconds=config.ARTIFACT_CATALOG_VERSION_CHECK_SECONDS,
+        )
+
+
+class ConcurrencyLimiter:
+    """
+    Limita las operaciones concurrentes sin esperas.
+
+    Si no hay hueco la operación se descarta en lugar de encolarse, de modo que
+    el llamador puede degradar a una alternativa barata. El límite se puede
+    cambiar en cualquier momento; con 0 no se admite ninguna operación.
+    """
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._active = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def resize(self, limit: int) -> None:
+        """
+        Cambia el límite. Las operaciones en curso por encima del nuevo límite
+        terminan con normalidad.
+
+        Args:
+            limit: Nuevo máximo de operaciones concurrentes.
+        """
+        with self._lock:
+            self._limit = limit
+
+    def try_acquire(self) -> bool:
+        """
+        Intenta ocupar un hueco.
+
+        Returns:
+            True si se ha ocupado (hay que llamar a `release`), False si no hay hueco.
+        """
+        with self._lock:
+            if self._active >= self._limit:
+                self._rejected += 1
+                return False
+            self._active += 1
+            return True
+
+    def release(self) -> None:
+        """Libera un hueco ocupado con `try_acquire`."""
+        with self._lock:
+            self._active -= 1
+
+    @contextmanager
+    def slot(self) -> Iterator[bool]:
+        """
+        Ocupa un hueco durante el bloque si lo hay.
+
+        Uso::
+
+            with llm_limiter.slot() as acquired:
+                if not acquired:
+                    return fallback()
+                ...
+
+        Yields:
+            Si se ha ocupado un hueco.
+        """
+        acquired = self.try_acquire()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release()
+
+    def stats(self) -> Dict[str, float]:
+        """Límite, operaciones en curso y descartadas."""
+        with self._lock:
+            return {"limit": self._limit, "active": self._active, "rejected": self._rejected}
+
+
+class RuntimeConfigStore:
+    """
+    Mantiene la configuración vigente de este worker y aplica los cambios a los
+    componentes.
+
+    La base de datos es la fuente de verdad: solo guarda los campos cambiados en
+    caliente, y el resto se toma de `Settings`.
+    """
+
+    def __init__(self, initial: RuntimeConfig, llm_limiter: ConcurrencyLimiter, check_seconds: float = 5.0):
+        self.llm_limiter = llm_limiter
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._loaded = False
+        self.current = initial
+        self._apply(initial)
+
+    def _apply(self, config: RuntimeConfig) -> None:
+        self.llm_limiter.resize(config.llm_max_concurrency)
+        user_cache.ttl_seconds = config.user_cache_ttl_seconds
+        artifact_catalog.version_check_seconds = config.artifact_catalog_check_seconds
+
+    @staticmethod
+    def _build(overrides: Dict[str, Any]) -> RuntimeConfig:
+        """
+        Construye la configuración a partir de `Settings` y los campos cambiados.
+
+        Args:
+            overrides: Campos cambiados en caliente.
+
+        Returns:
+            La configuración resultante.
+
+        Raises:
+            ValueError: Si algún campo no existe o tiene un valor no válido.
+        """
+        try:
+            return dataclasses.replace(RuntimeConfig.from_settings(), **overrides)
+        except TypeError as e:
+            raise ValueError(str(e))
+
+    def load(self, db: Session) -> RuntimeConfig:
+        """
+        Carga (o recarga) la configuración guardada en la base de datos.
+
+        Si lo guardado ya no es válido (p. ej. un campo que se ha eliminado) se
+        registra un aviso y se usa la configuración de `Settings`.
+
+        Args:
+            db: Sesión de base de datos.
+
+        Returns:
+            La configuración vigente.
+        """
+        with self._lock:
+            version = runtime_config_repository.get_version(db)
+            try:
+                config = self._build(runtime_config_repository.get_overrides(db))
+            except ValueError as e:
+                logger.warning("Configuración en caliente guardada no válida: %s", e)
+                config = RuntimeConfig.from_settings()
+            self._apply(config)
+            self.current = config
+            self._version = version
+            self._loaded = True
+            return config
+
+    def refresh(self, db: Session) -> RuntimeConfig:
+        """
+        Recarga la configuración si no está cargada o si otro worker la ha
+        cambiado (solo lee el contador de versión si no ha cambiado).
+
+        Args:
+            db: Sesión de base de datos.
+
+        Returns:
+            La configuración vigente.
+        """
+        if not self._loaded or runtime_config_repository.get_version(db) != self._version:
+            return self.load(db)
+        return self.current
+
+    async def poll(self, session_factory: Callable[[], Session]) -> None:
+        """
+        Comprueba cada `check_seconds` si otro worker ha cambiado la configuración.
+
+        Se ejecuta como tarea en segundo plano de cada worker durante toda su vida
+        (ver `lifespan` en main.py); la consulta se hace en un hilo para no
+        bloquear el event loop. Con `check_seconds` a 0 no se comprueba nunca.
+
+        Args:
+            session_factory: Factoría de sesiones de base de datos.
+        """
+        def refresh() -> None:
+            with session_factory() as db:
+                self.refresh(db)
+
+        while self.check_seconds > 0:
+            await asyncio.sleep(self.check_seconds)
+            try:
+                await asyncio.to_thread(refresh)
+            except Exception as e:
+                logger.warning("No se pudo comprobar la configuración en caliente: %s", e)
+
+    def update(self, db: Session, **changes: Any) -> RuntimeConfig:
+        """
+        Guarda cambios en la configuración y los aplica en este worker.
+
+        Args:
+            db: Sesión de base de datos.
+            changes: Campos de `RuntimeConfig` a cambiar.
+
+        Returns:
+            La nueva configuración.
+
+        Raises:
+            ValueError: Si algún campo no existe o tiene un valor no válido.
+        """
+        try:
+            overrides = runtime_config_repository.get_overrides(db, for_update=True)
+            overrides.update(changes)
+            self._build(overrides)
+        except ValueError:
+            db.rollback()
+            raise
+        runtime_config_repository.save_overrides(db, overrides=overrides)
+        return self.load(db)
+
+    def reset(self, db: Session) -> RuntimeConfig:
+        """
+        Descarta los cambios guardados y vuelve a la configuración de `Settings`
+        en todos los workers.
+
+        Args:
+            db: Sesión de base de datos.
+
+        Returns:
+            La nueva configuración.
+        """
+        runtime_config_repository.save_overrides(db, overrides={})
+        return self.load(db)
+
+
+llm_limiter = ConcurrencyLimiter(settings.LLM_MAX_CONCURRENCY)
+runtime_config = RuntimeConfigStore(
+    RuntimeConfig.from_settings(), llm_limiter, check_seconds=settings.RUNTIME_CONFIG_CHECK_SECONDS
+)
+
+metrics.register_collector(
+    "llm_limiter", "Estado del limitador de llamadas concurrentes al LLM.", llm_limiter.stats
+)
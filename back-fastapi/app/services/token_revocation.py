@@ -0,0 +1,128 @@
+"""
+Índice en memoria de las sesiones revocadas.
+
+Los tokens de acceso duran ACCESS_TOKEN_EXPIRE_MINUTES, así que solo hay que
+recordar las sesiones revocadas durante ese tiempo: el conjunto es pequeño y
+comprobar un token es una búsqueda en un set, sin consultar la base de datos.
+El índice se reconstruye desde la tabla refresh_tokens como mucho cada
+REVOCATION_INDEX_REFRESH_SECONDS para recoger las revocaciones de otros workers.
+La reconstrucción se hace en un hilo aparte, de una en una, y mientras tanto se
+sigue respondiendo con el índice anterior: comprobar un token nunca espera a la
+base de datos (salvo la primera carga, que normalmente se hace al arrancar).
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, FrozenSet, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.repositories.refresh_token import refresh_token_repository
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationIndex:
+    """
+    Conjunto de sesiones revocadas cuyos tokens de acceso todavía pueden estar vigentes.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        access_token_ttl: timedelta,
+        refresh_seconds: float = 10.0,
+    ):
+        self.session_factory = session_factory
+        self.access_token_ttl = access_token_ttl
+        self.refresh_seconds = refresh_seconds
+        self._revoked: FrozenSet[str] = frozenset()
+        # Revocaciones hechas en este proceso (sid -> instante), para no perderlas
+        # si la reconstrucción lee de una base de datos que aún no las tiene
+        self._local: Dict[str, float] = {}
+        self._built_at: Optional[float] = None
+        self._rebuilding = False
+        self._lock = threading.Lock()
+        # Evita que varias primeras cargas consulten la base de datos a la vez
+        self._first_build_lock = threading.Lock()
+
+    def add(self, session_id) -> None:
+        """
+        Marca una sesión como revocada en este proceso de inmediato.
+
+        Args:
+            session_id: ID de la sesión.
+        """
+        sid = str(session_id)
+        with self._lock:
+            self._local[sid] = time.monotonic()
+            self._revoked = self._revoked | {sid}
+
+    def rebuild(self) -> None:
+        """Reconstruye el índice desde la base de datos."""
+        since = datetime.now(timezone.utc) - self.access_token_ttl
+        try:
+            with self.session_factory() as db:
+                revoked = {
+                    str(session_id)
+                    for session_id in refresh_token_repository.get_revoked_since(db, since=since)
+                }
+        except SQLAlchemyError as e:
+            # Se mantiene el índice anterior y se reintenta en la siguiente comprobación
+            logger.warning(f"No se pudo reconstruir el índice de sesiones revocadas: {e}")
+            self._built_at = time.monotonic()
+            return
+
+        now = time.monotonic()
+        ttl = self.access_token_ttl.total_seconds()
+        with self._lock:
+            self._local = {sid: at for sid, at in self._local.items() if now - at < ttl}
+            self._revoked = frozenset(revoked | self._local.keys())
+            self._built_at = now
+
+    def _rebuild_in_background(self) -> None:
+        """Lanza una reconstrucción en un hilo si no hay otra en curso."""
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run() -> None:
+            try:
+                self.rebuild()
+            finally:
+                with self._lock:
+                    self._rebuilding = False
+
+        threading.Thread(target=run, name="revocation-index-rebuild", daemon=True).start()
+
+    def is_revoked(self, session_id: str) -> bool:
+        """
+        Indica si una sesión está revocada.
+
+        Args:
+            session_id: Claim `sid` del token de acceso.
+
+        Returns:
+            True si la sesión está revocada.
+        """
+        built_at = self._built_at
+        if built_at is None:
+            with self._first_build_lock:
+                if self._built_at is None:
+                    self.rebuild()
+        elif time.monotonic() - built_at >= self.refresh_seconds:
+            self._rebuild_in_background()
+        return session_id in self._revoked
+
+
+revocation_index = RevocationIndex(
+    SessionLocal,
+    access_token_ttl=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    refresh_seconds=settings.REVOCATION_INDEX_REFRESH_SECONDS,
+)
@@ -0,0 +1,88 @@
+"""
+Caché en memoria de los usuarios autenticados.
+
+Evita consultar la tabla users en cada petición autenticada: el usuario se
+guarda como esquema de Pydantic (sin contraseña) por el `sub` del token durante
+USER_CACHE_TTL_SECONDS. Las modificaciones a través de `user_repository`
+invalidan la entrada del usuario al confirmarse la transacción.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.api.schemas.user import User
+from app.core.config import settings
+
+
+class UserCache:
+    """
+    Caché LRU con caducidad de usuarios, por proceso.
+
+    Con `ttl_seconds` igual a 0 la caché está desactivada.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_size: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._items: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sub: str) -> Optional[User]:
+        """
+        Obtiene un usuario de la caché.
+
+        Args:
+            sub: Identificador del usuario en el token.
+
+        Returns:
+            El usuario si está en caché y no ha caducado, None en caso contrario.
+        """
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            item = self._items.get(sub)
+            if item is None:
+                return None
+            expires_at, user = item
+            if expires_at <= time.monotonic():
+                del self._items[sub]
+                return None
+            self._items.move_to_end(sub)
+            return user
+
+    def set(self, sub: str, user: User) -> None:
+        """
+        Guarda un usuario en la caché.
+
+        Args:
+            sub: Identificador del usuario en el token.
+            user: Usuario a guardar.
+        """
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._items[sub] = (time.monotonic() + self.ttl_seconds, user)
+            self._items.move_to_end(sub)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, sub: Optional[str] = None) -> None:
+        """
+        Descarta un usuario de la caché, o todos si no se indica ninguno.
+
+        Args:
+            sub: Identificador del usuario en el token.
+        """
+        with self._lock:
+            if sub is None:
+                self._items.clear()
+            else:
+                self._items.pop(sub, None)
+
+
+user_cache = UserCache(
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+)
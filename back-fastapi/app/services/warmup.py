@@ -0,0 +1,67 @@
+"""
+Precarga de las cachés en memoria al arrancar un worker.
+
+Cada caché se carga en un hilo con su propia sesión, en paralelo, para que el
+worker no atienda sus primeras peticiones con las cachés vacías.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.services.adventure_steps import adventure_step_cache
+from app.services.artifact_catalog import artifact_catalog
+from app.services.runtime_config import runtime_config
+from app.services.token_revocation import revocation_index
+
+logger = logging.getLogger(__name__)
+
+
+def _with_session(session_factory: Callable[[], Session], load: Callable[[Session], object]) -> Callable[[], object]:
+    def run() -> object:
+        with session_factory() as db:
+            return load(db)
+    return run
+
+
+async def warm_caches(session_factory: Callable[[], Session] = SessionLocal) -> Dict[str, float]:
+    """
+    Carga en paralelo el catálogo de artefactos, las aventuras compiladas, el
+    índice de sesiones revocadas y la configuración en caliente.
+
+    Un fallo en una caché no impide arrancar: se registra y la caché se
+    cargará en la primera petición que la use.
+
+    Args:
+        session_factory: Factoría de sesiones de base de datos.
+
+    Returns:
+        Segundos que ha tardado cada caché en cargarse (solo las que se han cargado).
+    """
+    warmers: Dict[str, Callable[[], object]] = {
+        "artifact_catalog": _with_session(session_factory, artifact_catalog.load),
+        "adventure_steps": _with_session(session_factory, adventure_step_cache.preload),
+        "revocation_index": revocation_index.rebuild,
+        "runtime_config": _with_session(session_factory, runtime_config.load),
+    }
+
+    async def timed(name: str, warm: Callable[[], object]) -> float:
+        started_at = time.perf_counter()
+        await asyncio.to_thread(warm)
+        return time.perf_counter() - started_at
+
+    results = await asyncio.gather(
+        *(timed(name, warm) for name, warm in warmers.items()), return_exceptions=True
+    )
+    timings: Dict[str, float] = {}
+    for name, result in zip(warmers, results):
+        if isinstance(result, BaseException):
+            logger.warning("No se pudo precargar la caché %s: %s", name, result)
+        else:
+            timings[name] = result
+    logger.debug("Cachés precargadas", extra={"timings": timings})
+    return timings
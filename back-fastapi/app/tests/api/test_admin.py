@@ -0,0 +1,94 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session, sessionmaker
+import pytest
+
+from app.core.config import settings
+from app.db.repositories.runtime_config import runtime_config_repository
+from app.db.repositories.user import user_repository
+from app.services.runtime_config import GENERATION_MODES, RuntimeConfig, llm_limiter, runtime_config
+from app.services.user_cache import user_cache
+
+
+def _register(client: TestClient, email: str) -> dict:
+    response = client.post(
+        "/api/auth/register",
+        json={"name": "Admin", "email": email, "password": "password123"},
+    )
+    assert response.status_code == 201
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+def test_runtime_config_requires_admin(client: TestClient, db: Session) -> None:
+    """Solo los usuarios con is_admin (asignado fuera de la API) pueden cambiar la configuración."""
+    user_headers = _register(client, "user@example.com")
+    admin_headers = _register(client, "admin@example.com")
+
+    # El email se normaliza: no se puede registrar otra cuenta con el mismo email en mayúsculas
+    duplicate = client.post(
+        "/api/auth/register",
+        json={"name": "Admin", "email": " Admin@Example.com", "password": "password123"},
+    )
+    assert duplicate.status_code == 400
+
+    assert client.get("/api/admin/runtime-config").status_code == 401
+    assert client.get("/api/admin/runtime-config", headers=admin_headers).status_code == 403
+    assert client.get("/api/admin/runtime-config", headers=user_headers).status_code == 403
+
+    assert user_repository.set_admin(db, email="ADMIN@example.com") is not None
+    login = client.post(
+        "/api/auth/login", data={"username": "admin@example.com", "password": "password123"}
+    )
+    assert login.status_code == 200
+    assert login.json()["is_admin"] is True
+    assert client.get("/api/admin/runtime-config", headers=admin_headers).status_code == 200
+
+    try:
+        response = client.patch(
+            "/api/admin/runtime-config",
+            headers=admin_headers,
+            json={"generation_mode": "fallback", "llm_max_concurrency": 0, "user_cache_ttl_seconds": 5},
+        )
+        assert response.status_code == 200
+        assert response.json()["generation_mode"] == "fallback"
+        assert runtime_config.current.llm_max_concurrency == 0
+        assert user_cache.ttl_seconds == 5
+        assert not llm_limiter.try_acquire()
+
+        invalid = client.patch(
+            "/api/admin/runtime-config", headers=admin_headers, json={"generation_mode": "gpt"}
+        )
+        assert invalid.status_code == 422
+    finally:
+        runtime_config.reset(db)
+
+    assert user_cache.ttl_seconds == settings.USER_CACHE_TTL_SECONDS
+
+
+def test_runtime_config_changes_reach_other_workers(db: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """La comprobación periódica aplica los cambios guardados por otro worker."""
+    default = RuntimeConfig.from_settings()
+    mode = next(mode for mode in GENERATION_MODES if mode != default.generation_mode)
+    assert runtime_config.load(db) == default
+
+    # Otro worker guarda un cambio en la base de datos
+    runtime_config_repository.save_overrides(
+        db, overrides={"generation_mode": mode, "llm_max_concurrency": default.llm_max_concurrency + 1}
+    )
+    try:
+        monkeypatch.setattr(runtime_config, "check_seconds", 0.01)
+
+        async def poll_once() -> None:
+            poller = asyncio.create_task(runtime_config.poll(sessionmaker(bind=db.get_bind())))
+            while runtime_config.current.generation_mode != mode:
+                await asyncio.sleep(0.01)
+            poller.cancel()
+
+        asyncio.run(asyncio.wait_for(poll_once(), timeout=5))
+        assert llm_limiter.limit == default.llm_max_concurrency + 1
+    finally:
+        runtime_config.reset(db)
+
+    assert runtime_config.current == default
+    assert llm_limiter.limit == default.llm_max_concurrency
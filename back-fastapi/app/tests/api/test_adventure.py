@@ -0,0 +1,210 @@
+from typing import Dict
+from uuid import UUID
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.api.schemas.adventure import AdventureCreate
+from app.api.schemas.artifact import ArtifactCreate
+from app.db.repositories.adventure import adventure_repository, character_progress_repository
+from app.db.repositories.artifact import artifact_repository, character_artifact_repository
+
+
+def _register(client: TestClient) -> Dict[str, str]:
+    response = client.post(
+        "/api/auth/register",
+        json={"name": "Blopzoid", "email": "blopzoid@example.com", "password": "secreto"},
+    )
+    assert response.status_code == 201
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+def _create_adventure(db: Session):
+    steps = [
+        {
+            "narrative": f"Paso {i}",
+            "options": [{"text": "Seguir", "next_step": i + 1, "rewards": [{"type": "experience", "value": 50 * (i + 1)}]}],
+        }
+        for i in range(6)
+    ]
+    return adventure_repository.create(db, obj_in=AdventureCreate(title="La Anomalía Temporal", steps=steps))
+
+
+def test_save_adventure_progress_commits_once(client: TestClient, db: Session) -> None:
+    """
+    Prueba que POST /api/adventure/progress guarda el progreso y aplica la
+    experiencia en una única transacción.
+    """
+    headers = _register(client)
+    adventure = _create_adventure(db)
+    character = client.post(
+        "/api/characters", json={"name": "Blopzoid", "character_class": "Piloto"}, headers=headers
+    ).json()
+
+    commits = []
+    engine = db.get_bind()
+    listener = lambda conn: commits.append(conn)
+    event.listen(engine, "commit", listener)
+    try:
+        response = client.post(
+            "/api/adventure/progress",
+            json={
+                "character_id": character["id"],
+                "adventure_id": str(adventure.id),
+                "current_step": 4,
+                "choices": [0, 0, 0, 0],
+            },
+            headers=headers,
+        )
+    finally:
+        event.remove(engine, "commit", listener)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["current_step"] == 4
+    assert data["experience"] == 200
+    assert len(commits) == 1
+
+
+def test_adventure_story_is_paged_from_step_cache(client: TestClient, db: Session) -> None:
+    """Los pasos se compilan una vez y se sirven por rangos o de uno en uno."""
+    headers = _register(client)
+    adventure = _create_adventure(db)
+
+    response = client.get(
+        "/api/adventure/story",
+        params={"adventure_id": str(adventure.id), "offset": 2, "limit": 2},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert [step["narrative"] for step in response.json()] == ["Paso 2", "Paso 3"]
+    assert response.headers["X-Total-Steps"] == "6"
+
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        step = client.get(
+            "/api/adventure/story/steps/5", params={"adventure_id": str(adventure.id)}, headers=headers
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert step.json() == {
+        "narrative": "Paso 5",
+        "options": [{"text": "Seguir", "next_step": 6, "rewards": [{"type": "experience", "value": 300}]}],
+    }
+    # En un acierto de caché solo se consulta updated_at, no el JSON de pasos
+    assert not any("adventures.steps" in statement for statement in statements)
+
+    missing = client.get(
+        "/api/adventure/story/steps/6", params={"adventure_id": str(adventure.id)}, headers=headers
+    )
+    assert missing.status_code == 404
+    full = client.get("/api/adventure/story", params={"adventure_id": str(adventure.id)}, headers=headers)
+    assert len(full.json()) == 6
+
+
+def test_save_adventure_choice_appends_to_progress(client: TestClient, db: Session) -> None:
+    """Cada elección se añade al historial y avanza un paso; un paso esperado obsoleto da 409."""
+    headers = _register(client)
+    adventure = _create_adventure(db)
+    character = client.post(
+        "/api/characters", json={"name": "Blopzoid", "character_class": "Piloto"}, headers=headers
+    ).json()
+    payload = {"character_id": character["id"], "adventure_id": str(adventure.id)}
+
+    for step in range(3):
+        response = client.post(
+            "/api/adventure/progress/choice",
+            json={**payload, "choice": 0, "expected_step": step},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["current_step"] == step + 1
+
+    stale = client.post(
+        "/api/adventure/progress/choice", json={**payload, "choice": 0, "expected_step": 1}, headers=headers
+    )
+    assert stale.status_code == 409
+
+    # El paso 3 solo tiene una opción
+    invalid = client.post("/api/adventure/progress/choice", json={**payload, "choice": 1}, headers=headers)
+    assert invalid.status_code == 422
+
+    progress = character_progress_repository.get(
+        db, character_id=UUID(character["id"]), adventure_id=adventure.id
+    )
+    db.refresh(progress)
+    assert progress.current_step == 3
+    assert progress.choices == [0, 0, 0]
+
+
+def test_save_adventure_choice_follows_next_step(client: TestClient, db: Session) -> None:
+    """La elección mueve el progreso al `next_step` de la opción, no al paso siguiente."""
+    headers = _register(client)
+    steps = [
+        {"narrative": "Inicio", "options": [{"text": "Explorar", "next_step": 1}, {"text": "Dormir", "next_step": 2}]},
+        {"narrative": "Sala de control", "options": [{"text": "Tocar", "next_step": 2}]},
+        {"narrative": "Fin", "options": [{"text": "Volver a empezar", "next_step": 0}]},
+    ]
+    adventure = adventure_repository.create(db, obj_in=AdventureCreate(title="Bifurcación", steps=steps))
+    character = client.post(
+        "/api/characters", json={"name": "Blopzoid", "character_class": "Piloto"}, headers=headers
+    ).json()
+    payload = {"character_id": character["id"], "adventure_id": str(adventure.id)}
+
+    response = client.post("/api/adventure/progress/choice", json={**payload, "choice": 1}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["current_step"] == 2
+
+    response = client.post(
+        "/api/adventure/progress/choice", json={**payload, "choice": 0, "expected_step": 2}, headers=headers
+    )
+    assert response.json()["current_step"] == 0
+
+
+def test_choice_rewards_use_the_step_of_the_choice_and_grant_artifacts(client: TestClient, db: Session) -> None:
+    """Las recompensas son las de la transición elegida y el artefacto se asigna al personaje."""
+    headers = _register(client)
+    artifact_id = artifact_repository.create(
+        db, obj_in=ArtifactCreate(name="Cristal Cuántico", effect={"cosmic_luck": 5})
+    ).id
+    steps = [
+        {
+            "narrative": "Inicio",
+            "options": [
+                {"text": "Explorar", "next_step": 1, "rewards": [{"type": "experience", "value": 25}]},
+                {"text": "Dormir", "next_step": 2},
+            ],
+        },
+        {
+            "narrative": "Sala de control",
+            "options": [{"text": "Ignorar", "rewards": [{"type": "experience", "value": 500}]}],
+        },
+        {
+            "narrative": "Sueño",
+            "options": [{"text": "Tocar", "next_step": 0, "artifact_id": str(artifact_id)}],
+        },
+    ]
+    adventure = adventure_repository.create(db, obj_in=AdventureCreate(title="Bifurcación", steps=steps))
+    character = client.post(
+        "/api/characters", json={"name": "Blopzoid", "character_class": "Piloto"}, headers=headers
+    ).json()
+    payload = {"character_id": character["id"], "adventure_id": str(adventure.id)}
+
+    # (0, 1) no tiene recompensas aunque (1, 1) las tendría con la búsqueda lineal
+    slept = client.post("/api/adventure/progress/choice", json={**payload, "choice": 1}, headers=headers).json()
+    assert slept["rewards"] == [] and slept["experience"] == 0
+
+    touched = client.post("/api/adventure/progress/choice", json={**payload, "choice": 0}, headers=headers).json()
+    assert touched["rewards"] == [{"type": "artifact", "id": str(artifact_id)}]
+    owned = character_artifact_repository.get(db, character_id=UUID(character["id"]), artifact_id=artifact_id)
+    assert owned is not None
+
+    # Un artefacto que ya tiene no se vuelve a dar
+    client.post("/api/adventure/progress/choice", json={**payload, "choice": 1}, headers=headers)
+    again = client.post("/api/adventure/progress/choice", json={**payload, "choice": 0}, headers=headers).json()
+    assert again["rewards"] == []
@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.schemas.artifact import ArtifactCreate, ArtifactUpdate
+from app.db.models.cache_version import CacheVersion
+from app.db.repositories.artifact import artifact_repository
+from app.services.artifact_catalog import ARTIFACT_CATALOG_VERSION
+from app.tests.api.test_characters import _count_queries
+
+
+def test_artifacts_are_served_from_catalog(client: TestClient, db: Session) -> None:
+    """El catálogo se carga una vez y se invalida al modificar un artefacto."""
+    artifacts = artifact_repository.create_many(
+        db,
+        objs_in=[
+            ArtifactCreate(name=f"Artefacto {i}", effect={"stat": "cosmic_luck", "bonus": i})
+            for i in range(3)
+        ],
+    )
+
+    first_page = client.get("/api/artifacts", params={"limit": 2})
+    assert first_page.status_code == 200
+    assert len(first_page.json()) == 2
+
+    with _count_queries(db) as statements:
+        second_page = client.get(
+            "/api/artifacts", params={"limit": 2, "cursor": first_page.headers["X-Next-Cursor"]}
+        )
+    names = {a["name"] for a in first_page.json() + second_page.json()}
+    assert names == {"Artefacto 0", "Artefacto 1", "Artefacto 2"}
+    assert "X-Next-Cursor" not in second_page.headers
+    assert statements == []
+
+    last_id = second_page.json()[0]["id"]
+    artifact = next(a for a in artifacts if str(a.id) == last_id)
+    artifact_repository.update(db, db_obj=artifact, obj_in=ArtifactUpdate(name="Artefacto renombrado"))
+    assert db.get(CacheVersion, ARTIFACT_CATALOG_VERSION).version == 2
+
+    response = client.get("/api/artifacts", params={"skip": 2})
+    assert [a["name"] for a in response.json()] == ["Artefacto renombrado"]
@@ -0,0 +1,27 @@
+from fastapi.testclient import TestClient
+
+from app.core.security import decode_access_token
+
+
+def test_refresh_token_rotation_and_logout(client: TestClient) -> None:
+    """El refresh token se rota al usarse y el logout invalida también el token de acceso."""
+    registered = client.post(
+        "/api/auth/register",
+        json={"name": "Vorpleck", "email": "vorpleck@example.com", "password": "secreto"},
+    ).json()
+    assert decode_access_token(registered["token"])["sid"]
+
+    refreshed = client.post("/api/auth/refresh", json={"refresh_token": registered["refresh_token"]})
+    assert refreshed.status_code == 200
+    tokens = refreshed.json()
+    assert tokens["refresh_token"] != registered["refresh_token"]
+
+    reused = client.post("/api/auth/refresh", json={"refresh_token": registered["refresh_token"]})
+    assert reused.status_code == 401
+
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("/api/characters", headers=headers).status_code == 200
+
+    assert client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]}).status_code == 204
+    assert client.get("/api/characters", headers=headers).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
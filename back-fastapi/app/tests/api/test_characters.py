@@ -0,0 +1,130 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+def _auth_headers(client: TestClient) -> Dict[str, str]:
+    response = client.post(
+        "/api/auth/register",
+        json={"name": "Quirkton", "email": "quirkton@example.com", "password": "secreto"},
+    )
+    assert response.status_code == 201
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+@contextmanager
+def _count_queries(db: Session) -> Iterator[List[str]]:
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_list_characters_uses_constant_number_of_queries(client: TestClient, db: Session) -> None:
+    """
+    Prueba que GET /api/characters no hace una consulta por personaje
+    al serializar los artefactos (N+1).
+    """
+    headers = _auth_headers(client)
+
+    def create_characters(count: int) -> None:
+        for i in range(count):
+            response = client.post(
+                "/api/characters",
+                json={"name": f"Blopzoid {i}", "character_class": "Piloto"},
+                headers=headers,
+            )
+            assert response.status_code == 201
+
+    create_characters(1)
+    with _count_queries(db) as single:
+        response = client.get("/api/characters", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+    create_characters(9)
+    with _count_queries(db) as many:
+        response = client.get("/api/characters", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 10
+    assert all(character["artifacts"] == [] for character in response.json())
+
+    assert len(many) == len(single)
+
+
+def test_list_characters_paginates_with_cursor(client: TestClient) -> None:
+    """
+    Prueba que GET /api/characters recorre todos los personajes por páginas
+    usando el header X-Next-Cursor, sin repetir ni saltar ninguno.
+    """
+    headers = _auth_headers(client)
+    for i in range(5):
+        client.post(
+            "/api/characters",
+            json={"name": f"Zortblob {i}", "character_class": "Navegante"},
+            headers=headers,
+        )
+
+    names = []
+    params = {"limit": 2}
+    pages = 0
+    while True:
+        response = client.get("/api/characters", params=params, headers=headers)
+        assert response.status_code == 200
+        names.extend(character["name"] for character in response.json())
+        pages += 1
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        params = {"limit": 2, "cursor": next_cursor}
+
+    assert pages == 3
+    assert sorted(names) == [f"Zortblob {i}" for i in range(5)]
+
+    response = client.get("/api/characters", params={"cursor": "no-es-un-cursor"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_update_character_only_changes_own_characters(client: TestClient) -> None:
+    """
+    Prueba que PUT /api/characters/{id} actualiza los campos enviados y
+    devuelve 404 para personajes de otro usuario.
+    """
+    headers = _auth_headers(client)
+    character = client.post(
+        "/api/characters",
+        json={"name": "Zortblob", "character_class": "Navegante", "stats": {"cosmic_luck": 3}},
+        headers=headers,
+    ).json()
+
+    response = client.put(
+        f"/api/characters/{character['id']}",
+        json={"stats": {"cosmic_luck": 9}, "experience": 50},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["name"] == "Zortblob"
+    assert data["stats"] == {"cosmic_luck": 9}
+    assert data["experience"] == 50
+
+    other = client.post(
+        "/api/auth/register",
+        json={"name": "Intruso", "email": "intruso@example.com", "password": "secreto"},
+    ).json()
+    response = client.put(
+        f"/api/characters/{character['id']}",
+        json={"name": "Robado"},
+        headers={"Authorization": f"Bearer {other['token']}"},
+    )
+    assert response.status_code == 404
@@ -0,0 +1,67 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.middlewares.cors import CORSMiddleware, CORSPolicy
+
+
+def test_cors_preflight_and_simple_requests(client: TestClient) -> None:
+    """El preflight se responde en el middleware y las respuestas llevan las cabeceras."""
+    origin = "http://localhost:5173"
+
+    preflight = client.options(
+        "/api/artifacts",
+        headers={"Origin": origin, "Access-Control-Request-Method": "GET"},
+    )
+    assert preflight.status_code == 200
+    assert preflight.headers["access-control-allow-origin"] == origin
+    assert "GET" in preflight.headers["access-control-allow-methods"]
+    assert preflight.headers["access-control-max-age"] == "86400"
+
+    # Por defecto se admite cualquier método y cabecera, como antes del middleware propio
+    patch = client.options(
+        "/api/admin/runtime-config",
+        headers={
+            "Origin": origin,
+            "Access-Control-Request-Method": "PATCH",
+            "Access-Control-Request-Headers": "authorization, x-client-version",
+        },
+    )
+    assert patch.status_code == 200
+    assert "PATCH" in patch.headers["access-control-allow-methods"]
+    assert patch.headers["access-control-allow-headers"] == "authorization, x-client-version"
+
+    response = client.get("/", headers={"Origin": origin})
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == origin
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert "X-Total-Steps" in response.headers["access-control-expose-headers"]
+
+    # Sin cabecera Origin no se añade nada
+    assert "access-control-allow-origin" not in client.get("/").headers
+
+
+def test_cors_allow_list() -> None:
+    """Solo los orígenes de la lista reciben cabeceras CORS."""
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    policy = CORSPolicy(allow_origins=["https://cosmic.example"], expose_headers=["X-Next-Cursor"])
+    app.add_middleware(CORSMiddleware, policy=policy)
+    test_client = TestClient(app)
+
+    allowed = test_client.get("/ping", headers={"Origin": "https://cosmic.example"})
+    assert allowed.headers["access-control-allow-origin"] == "https://cosmic.example"
+    assert allowed.headers["vary"] == "Origin"
+
+    denied = test_client.get("/ping", headers={"Origin": "https://evil.example"})
+    assert denied.status_code == 200
+    assert "access-control-allow-origin" not in denied.headers
+
+    preflight = test_client.options(
+        "/ping",
+        headers={"Origin": "https://evil.example", "Access-Control-Request-Method": "GET"},
+    )
+    assert preflight.status_code == 400
@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.tests.api.test_characters import _auth_headers, _count_queries
+
+
+def test_profile_is_cached_and_invalidated_on_update(client: TestClient, db: Session) -> None:
+    """El usuario autenticado se lee de la caché hasta que se modifica su perfil."""
+    headers = _auth_headers(client)
+    assert client.get("/api/users/profile", headers=headers).status_code == 200
+
+    with _count_queries(db) as statements:
+        response = client.get("/api/users/profile", headers=headers)
+    assert response.json()["name"] == "Quirkton"
+    assert not any("FROM users" in statement for statement in statements)
+
+    updated = client.put("/api/users/profile", json={"name": "Quirkton II"}, headers=headers)
+    assert updated.status_code == 200
+    assert client.get("/api/users/profile", headers=headers).json()["name"] == "Quirkton II"
+
+
+def test_claims_only_endpoints_skip_user_lookup(client: TestClient, db: Session) -> None:
+    """Los endpoints que solo necesitan el ID del usuario no consultan la tabla users."""
+    headers = _auth_headers(client)
+
+    with _count_queries(db) as statements:
+        response = client.get("/api/characters", headers=headers)
+    assert response.status_code == 200
+    assert not any("FROM users" in statement for statement in statements)
+
+    invalid = client.get("/api/characters", headers={"Authorization": "Bearer no-es-un-token"})
+    assert invalid.status_code == 401
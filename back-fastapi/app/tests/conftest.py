@@ -6,9 +6,11 @@ from sqlalchemy.orm import sessionmaker, Session
 
 # Cambiar la importación para la ubicación correcta de main.py
 from main import app
-from app.db.session import Base, get_db
+from app.db.session import Base, get_db, get_read_db
 from app.api.schemas.personality import PersonalityOptionBase, PersonalityQuestionCreate
 from app.db.repositories.personality import personality_repository
+from app.services.artifact_catalog import artifact_catalog
+from app.services.user_cache import user_cache
 
 # Base de datos en memoria para las pruebas
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -42,11 +44,15 @@ def client(db: Session) -> Generator[TestClient, None, None]:
 
     # Sobreescribir la dependencia get_db para usar la base de datos de prueba
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     
     # Crear datos de prueba
     create_test_data(db)
     
     with TestClient(app) as c:
+        # El arranque carga el catálogo desde la base de datos real
+        artifact_catalog.invalidate()
+        user_cache.invalidate()
         yield c
     
     # Limpiar las sobreescrituras de dependencias
@@ -0,0 +1,3 @@
+"""
+Tests para el núcleo de la aplicación (configuración y seguridad).
+"""
\ No newline at end of file
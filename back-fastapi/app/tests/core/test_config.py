@@ -0,0 +1,24 @@
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import reload_settings, settings
+
+
+def test_settings_are_frozen_and_reloadable(monkeypatch: pytest.MonkeyPatch) -> None:
+    """La configuración no se puede modificar, pero sí recargar desde el entorno."""
+    with pytest.raises(ValidationError):
+        settings.GENERATE_QUESTIONS_ON_DEMAND = True
+
+    original = settings.GENERATE_QUESTIONS_ON_DEMAND
+    monkeypatch.setenv("GENERATE_QUESTIONS_ON_DEMAND", "on")
+    monkeypatch.setenv("MIN_QUESTIONS_COUNT", "no-es-un-numero")
+    try:
+        changed = reload_settings()
+        assert settings.GENERATE_QUESTIONS_ON_DEMAND is True
+        assert settings.MIN_QUESTIONS_COUNT == 4
+        assert ("GENERATE_QUESTIONS_ON_DEMAND" in changed) == (original is False)
+    finally:
+        monkeypatch.undo()
+        reload_settings()
+
+    assert settings.GENERATE_QUESTIONS_ON_DEMAND == original
@@ -0,0 +1,49 @@
+import json
+import logging
+import queue
+import sys
+
+from app.core.logging import DroppingQueueHandler, JSONFormatter, parse_log_levels
+
+
+def test_json_formatter_includes_extra_fields() -> None:
+    """Los campos `extra` y la traza se incluyen en el objeto JSON."""
+    try:
+        raise ValueError("fallo")
+    except ValueError:
+        record = logging.getLogger("app.test").makeRecord(
+            "app.test", logging.WARNING, __file__, 1, "Petición %s", ("GET",),
+            exc_info=sys.exc_info(), extra={"route": "/api/health", "duration_ms": 1.5},
+        )
+
+    entry = json.loads(JSONFormatter().format(record))
+    assert entry["level"] == "WARNING"
+    assert entry["msg"] == "Petición GET"
+    assert entry["route"] == "/api/health"
+    assert entry["duration_ms"] == 1.5
+    assert "ValueError: fallo" in entry["exc"]
+
+
+def test_queue_handler_drops_when_full() -> None:
+    """Con la cola llena los registros se descartan sin bloquear."""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.getLogger("app.tests.dropping")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.warning("primero %d", 1)
+        logger.warning("segundo")
+    finally:
+        logger.removeHandler(handler)
+
+    assert handler.dropped == 1
+    record = handler.queue.get_nowait()
+    assert record.msg == "primero 1" and record.args is None
+
+
+def test_parse_log_levels() -> None:
+    assert parse_log_levels("app.services=debug, sqlalchemy.engine=INFO,,x") == {
+        "app.services": "DEBUG",
+        "sqlalchemy.engine": "INFO",
+    }
+    assert parse_log_levels(None) == {}
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.metrics import Histogram, MetricsRegistry, RequestStats, metrics
+
+
+def test_histogram_quantiles() -> None:
+    """Los percentiles se interpolan dentro del bucket que los contiene."""
+    histogram = Histogram(bounds=(0.1, 0.2, 0.4))
+    for _ in range(50):
+        histogram.observe(0.05)
+    for _ in range(50):
+        histogram.observe(0.3)
+
+    assert histogram.count == 100
+    assert histogram.quantile(0.5) == pytest.approx(0.1)
+    assert histogram.quantile(0.99) == pytest.approx(0.396)
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_llm_calls_are_tracked_per_node() -> None:
+    """Las llamadas fallidas se cuentan como errores y se propagan."""
+    registry = MetricsRegistry()
+    with registry.track_llm_call("generate_question"):
+        pass
+    with pytest.raises(RuntimeError):
+        with registry.track_llm_call("generate_question"):
+            raise RuntimeError("timeout")
+
+    text = registry.render()
+    assert 'llm_call_duration_seconds_count{node="generate_question"} 2' in text
+    assert 'llm_call_errors_total{node="generate_question"} 1' in text
+
+
+def test_metrics_endpoint_groups_by_route(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Las peticiones se agrupan por plantilla de ruta y cuentan sus consultas."""
+    monkeypatch.setitem(settings.__dict__, "METRICS_TOKEN", "token-de-prometheus")
+    metrics.reset()
+    client.get("/api/characters/00000000-0000-0000-0000-000000000000")
+    client.post("/api/auth/refresh", json={"refresh_token": "desconocido"})
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer otro"}).status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer token-de-prometheus"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    route = 'method="GET",route="/api/characters/{character_id}"'
+    assert f"http_request_duration_seconds_count{{{route}}} 1" in text
+    assert f'http_request_duration_quantile_seconds{{{route},quantile="0.99"}}' in text
+    refresh = 'http_request_db_queries_total{method="POST",route="/api/auth/refresh"} '
+    queries = next(line for line in text.splitlines() if line.startswith(refresh))
+    assert int(queries[len(refresh):]) >= 1
+    assert 'password_hasher{stat="workers"}' in text
+
+
+def test_multiprocess_render_sums_all_workers(tmp_path) -> None:
+    """Con el modo multiproceso se suman los contadores de los ficheros de cada worker."""
+    registry = MetricsRegistry()
+    registry.register_collector("pool", "Conexiones del pool.", lambda: {"size": 5})
+    registry.enable_multiprocess(str(tmp_path))
+    registry.observe_request("GET", "/api/artifacts", 200, 0.01, RequestStats())
+    registry.flush()
+
+    # Otro worker (ya terminado) con las mismas métricas
+    (tmp_path / "999999999.json").write_text((tmp_path / f"{os.getpid()}.json").read_text())
+
+    text = registry.render()
+    route = 'method="GET",route="/api/artifacts"'
+    assert f"http_request_duration_seconds_count{{{route}}} 2" in text
+    assert f'http_responses_total{{{route},status="2xx"}} 2' in text
+    # Los valores instantáneos solo son de los workers vivos
+    assert f'pool{{stat="size",worker="{os.getpid()}"}} 5.0' in text
+    assert 'worker="999999999"' not in text
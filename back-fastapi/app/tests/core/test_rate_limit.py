@@ -0,0 +1,42 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.rate_limit import LoginRateLimiter, MemoryBucketStore, SQLiteBucketStore
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_token_bucket_limits_bursts(backend: str, tmp_path) -> None:
+    """Tras agotar la ráfaga se rechaza el intento e indica cuánto esperar."""
+    store = MemoryBucketStore() if backend == "memory" else SQLiteBucketStore(str(tmp_path / "limits.db"))
+
+    assert [store.acquire("ip:1.2.3.4", 3, 1 / 60) for _ in range(3)] == [0.0, 0.0, 0.0]
+    retry_after = store.acquire("ip:1.2.3.4", 3, 1 / 60)
+    assert 0 < retry_after <= 60
+    assert store.acquire("ip:5.6.7.8", 3, 1 / 60) == 0.0
+
+
+def test_purge_keeps_partially_drained_buckets_of_other_limits(monkeypatch: pytest.MonkeyPatch) -> None:
+    """La purga usa la capacidad de cada bucket, no la del bucket que la dispara."""
+    store = MemoryBucketStore()
+    monkeypatch.setattr(MemoryBucketStore, "_MAX_BUCKETS", 2)
+
+    for _ in range(15):
+        store.acquire("ip:1.2.3.4", 30, 30 / 60)
+    store.acquire("email:a@example.com", 10, 10 / 60)
+    store.acquire("email:b@example.com", 10, 10 / 60)
+
+    assert "ip:1.2.3.4" in store._buckets
+    assert store._buckets["ip:1.2.3.4"][0] < 16
+
+
+def test_login_is_rejected_before_hashing(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Al superar el límite por email el login responde 429 sin verificar la contraseña."""
+    limiter = LoginRateLimiter(MemoryBucketStore(), per_ip_per_minute=0, per_email_per_minute=2)
+    monkeypatch.setattr("app.api.endpoints.auth.login_rate_limiter", limiter)
+
+    form = {"username": "nadie@example.com", "password": "incorrecta"}
+    assert [client.post("/api/auth/login", data=form).status_code for _ in range(2)] == [401, 401]
+
+    response = client.post("/api/auth/login", data={**form, "username": "NADIE@example.com"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from jose import JWTError
+from sqlalchemy.orm import Session
+
+from app.api.schemas.user import UserCreate
+from app.core import security
+from app.core.security import (
+    KeySet, PasswordHasher, PasswordHasherBusyError, create_access_token, decode_access_token, pwd_context
+)
+from app.db.repositories.user import user_repository
+
+
+def test_tokens_survive_key_rotation(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Los tokens firmados con una clave anterior siguen siendo válidos mientras se conserve."""
+    monkeypatch.setattr(security, "key_set", KeySet({"2024": "clave-antigua"}))
+    old_token = create_access_token("usuario-1")
+
+    monkeypatch.setattr(security, "key_set", KeySet({"2024": "clave-antigua", "2025": "clave-nueva"}, "2025"))
+    new_token = create_access_token("usuario-2")
+
+    assert decode_access_token(old_token)["sub"] == "usuario-1"
+    assert decode_access_token(new_token)["sub"] == "usuario-2"
+
+    monkeypatch.setattr(security, "key_set", KeySet({"2025": "clave-nueva"}))
+    with pytest.raises(JWTError):
+        decode_access_token(old_token)
+
+
+def test_key_file_is_created_once(tmp_path) -> None:
+    """Si varios procesos generan el fichero de claves, todos usan el primero."""
+    path = str(tmp_path / "jwt_keys.json")
+
+    security._create_key_file(path)
+    first = json.loads(open(path).read())
+    security._create_key_file(path)
+
+    assert json.loads(open(path).read()) == first
+    assert security._read_key_file(path).active_key == first["keys"][first["active_kid"]]
+    assert [p.name for p in tmp_path.iterdir()] == ["jwt_keys.json"]
+
+
+def test_password_hasher_rejects_when_queue_is_full() -> None:
+    """Con todos los hilos ocupados y la cola llena se rechaza la operación."""
+    hasher = PasswordHasher(workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        busy = asyncio.ensure_future(hasher.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(PasswordHasherBusyError):
+            await hasher.run(lambda: None)
+        release.set()
+        await busy
+
+    asyncio.run(scenario())
+    stats = hasher.stats()
+    assert stats["completed"] == 1
+    assert stats["rejected"] == 1
+    assert stats["pending"] == 0
+
+
+def test_login_rehashes_outdated_password(db: Session) -> None:
+    """Un hash con menos rondas de las configuradas se actualiza al autenticarse."""
+    user = user_repository.create(
+        db,
+        obj_in=UserCreate(name="Glorbax", email="glorbax@example.com", password="secreto"),
+        hashed_password=pwd_context.hash("secreto", rounds=4),
+    )
+    assert pwd_context.needs_update(user.password)
+
+    authenticated = asyncio.run(
+        user_repository.authenticate_async(db, email="glorbax@example.com", password="secreto")
+    )
+    assert authenticated.id == user.id
+    assert not pwd_context.needs_update(authenticated.password)
+    assert pwd_context.verify("secreto", authenticated.password)
@@ -0,0 +1,3 @@
+"""
+Tests para la capa de base de datos.
+"""
\ No newline at end of file
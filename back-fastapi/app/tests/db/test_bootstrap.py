@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, func, inspect, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.bootstrap import LEGACY_REVISION, MIGRATIONS_DIR, SchemaOutOfDateError, bootstrap_database
+from app.db.models.user import User
+import init_db_script
+
+
+def test_bootstrap_creates_stamps_and_seeds_once(tmp_path: Path) -> None:
+    """Una base de datos vacía se crea, se marca en la última revisión y se siembra una vez."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'bootstrap.db'}")
+    session_factory = sessionmaker(bind=engine)
+    try:
+        bootstrap_database(engine, session_factory)
+        bootstrap_database(engine, session_factory)
+
+        with engine.connect() as connection:
+            revision = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        with session_factory() as db:
+            users = db.scalar(select(func.count()).select_from(User))
+
+        assert revision == ScriptDirectory(str(MIGRATIONS_DIR)).get_current_head()
+        assert users == 1
+        assert (tmp_path / "bootstrap.db.lock").exists()
+
+        with engine.begin() as connection:
+            connection.execute(text("UPDATE alembic_version SET version_num = 'c3d9a1e5f2b7'"))
+        with pytest.raises(SchemaOutOfDateError):
+            bootstrap_database(engine, session_factory)
+    finally:
+        engine.dispose()
+
+
+def test_bootstrap_migrates_legacy_database_without_revision(tmp_path: Path) -> None:
+    """Una base de datos sin revisión se marca como LEGACY_REVISION y se migra a la última."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    session_factory = sessionmaker(bind=engine)
+    try:
+        bootstrap_database(engine, session_factory)
+        # Dejar el esquema como lo creaban las versiones anteriores, sin revisión
+        config = Config()
+        config.set_main_option("script_location", str(MIGRATIONS_DIR))
+        with engine.begin() as connection:
+            config.attributes["connection"] = connection
+            command.downgrade(config, LEGACY_REVISION)
+            connection.execute(text("DROP TABLE alembic_version"))
+        assert not inspect(engine).has_table("cache_versions")
+
+        bootstrap_database(engine, session_factory)
+
+        with engine.connect() as connection:
+            revision = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+            constraints = inspect(connection).get_unique_constraints("character_progress")
+        assert revision == ScriptDirectory(str(MIGRATIONS_DIR)).get_current_head()
+        assert "uq_character_progress_character_adventure" in {c["name"] for c in constraints}
+    finally:
+        engine.dispose()
+
+
+def test_bootstrap_after_init_db_script(tmp_path: Path) -> None:
+    """Una base de datos creada con init_db_script.py arranca sin volver a migrarse."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'script.db'}")
+    session_factory = sessionmaker(bind=engine)
+    head = ScriptDirectory(str(MIGRATIONS_DIR)).get_current_head()
+    try:
+        init_db_script.init_db(engine, session_factory)
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT version_num FROM alembic_version")).scalar() == head
+
+        # Base de datos creada con create_all sin revisión (versiones anteriores del script)
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE alembic_version"))
+
+        bootstrap_database(engine, session_factory)
+
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT version_num FROM alembic_version")).scalar() == head
+    finally:
+        engine.dispose()
@@ -0,0 +1,99 @@
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app.api.schemas.adventure import AdventureCreate, CharacterProgressCreate
+from app.api.schemas.artifact import ArtifactCreate, CharacterArtifactCreate
+from app.api.schemas.character import CharacterCreate
+from app.api.schemas.user import UserCreate
+from app.db.models.adventure import CharacterProgress
+from app.db.models.artifact import CharacterArtifact
+from app.db.repositories.adventure import adventure_repository, character_progress_repository
+from app.db.repositories.artifact import artifact_repository, character_artifact_repository
+from app.db.repositories.character import character_repository
+from app.db.repositories.user import user_repository
+
+
+def _create_character(db: Session):
+    user = user_repository.create(
+        db, obj_in=UserCreate(name="Zortblob", email="zortblob@example.com", password="secreto")
+    )
+    return character_repository.create_with_user(
+        db, obj_in=CharacterCreate(name="Zortblob", character_class="Bardo cuántico"), user_id=user.id
+    )
+
+
+def test_progress_create_or_update_is_an_upsert(db: Session) -> None:
+    """Guardar dos veces el progreso de la misma aventura actualiza la misma fila."""
+    character = _create_character(db)
+    adventure = adventure_repository.create(
+        db, obj_in=AdventureCreate(title="La Anomalía Temporal", steps=[{"narrative": "..."}])
+    )
+
+    first = character_progress_repository.create_or_update(
+        db, obj_in=CharacterProgressCreate(
+            character_id=character.id, adventure_id=adventure.id, current_step=1, choices=[0]
+        )
+    )
+    second = character_progress_repository.create_or_update(
+        db, obj_in=CharacterProgressCreate(
+            character_id=character.id, adventure_id=adventure.id, current_step=2, choices=[0, 1]
+        )
+    )
+
+    assert second.id == first.id
+    assert second.current_step == 2
+    assert second.choices == [0, 1]
+    assert db.query(CharacterProgress).count() == 1
+
+
+def test_character_artifact_create_ignores_duplicates(db: Session) -> None:
+    """Asignar dos veces el mismo artefacto no crea una segunda relación."""
+    character = _create_character(db)
+    artifact = artifact_repository.create(
+        db, obj_in=ArtifactCreate(name="Escudo de Absurdidad", effect={"stat": "absurdity_resistance", "bonus": 20})
+    )
+    obj_in = CharacterArtifactCreate(artifact_id=artifact.id)
+
+    created = character_artifact_repository.create(db, obj_in=obj_in, character_id=character.id)
+    duplicated = character_artifact_repository.create(db, obj_in=obj_in, character_id=character.id)
+
+    assert created is not None
+    assert created.is_active is False
+    assert duplicated is None
+    assert db.query(CharacterArtifact).count() == 1
+
+
+def test_create_many_and_upsert_many(db: Session) -> None:
+    """Los artefactos se crean y actualizan por lotes, conservando el orden."""
+    artifacts = artifact_repository.create_many(
+        db,
+        objs_in=[
+            ArtifactCreate(name=f"Artefacto {i}", effect={"stat": "cosmic_luck", "bonus": i})
+            for i in range(3)
+        ],
+    )
+    assert [artifact.name for artifact in artifacts] == ["Artefacto 0", "Artefacto 1", "Artefacto 2"]
+    assert all(artifact.id is not None and artifact.created_at is not None for artifact in artifacts)
+
+    upserted = artifact_repository.upsert_many(
+        db,
+        objs_in=[
+            {"id": artifacts[0].id, "name": "Artefacto renombrado", "effect": {"stat": "cosmic_luck", "bonus": 9}},
+            {"name": "Artefacto nuevo", "effect": {"stat": "sarcasm_level", "bonus": 1}},
+        ],
+    )
+    assert [artifact.name for artifact in upserted] == ["Artefacto renombrado", "Artefacto nuevo"]
+    assert upserted[0].id == artifacts[0].id
+    assert upserted[0].effect["bonus"] == 9
+    assert len(artifact_repository.get_multi(db)) == 4
+
+
+def test_add_experience_increments_in_database(db: Session) -> None:
+    """La experiencia se suma en la base de datos y actualiza el personaje cargado."""
+    character = _create_character(db)
+
+    assert character_repository.add_experience(db, character_id=character.id, amount=50) == 50
+    assert character_repository.add_experience(db, character_id=character.id, amount=25) == 75
+    assert character.experience == 75
+    assert character_repository.add_experience(db, character_id=uuid4(), amount=10) is None
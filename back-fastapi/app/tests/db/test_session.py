@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import session as db_session
+from app.db.models.user import User
+from app.db.session import LAST_WRITE_COOKIE, LAST_WRITE_HEADER, RESPONSE_KEY, Base, ReadReplicaRouter
+
+
+def _sessionmaker(path: Path) -> sessionmaker:
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def test_reads_go_to_replica_except_right_after_a_write(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Con dos ficheros SQLite (primario y réplica sin replicar), las lecturas van
+    a la réplica salvo para el cliente que envía el instante de su escritura.
+    """
+    primary = _sessionmaker(tmp_path / "primary.db")
+    replica = _sessionmaker(tmp_path / "replica.db")
+    router = ReadReplicaRouter(primary, [replica], sticky_seconds=60)
+    monkeypatch.setattr(db_session, "read_router", router)
+
+    response = Response()
+    with primary() as db:
+        db.info[RESPONSE_KEY] = response
+        db.add(User(name="Quirkton", email="quirkton@example.com", password="x"))
+        db.commit()
+
+    # El commit anota el instante de la escritura en la respuesta
+    last_write = float(response.headers[LAST_WRITE_HEADER])
+    assert f"{LAST_WRITE_COOKIE}=" in response.headers["set-cookie"]
+
+    # El cliente que lo envía lee del primario y ve su escritura (en cualquier worker)
+    with router.read_session(last_write) as db:
+        assert db.query(User).count() == 1
+
+    # Otros clientes (o peticiones sin el instante) leen de la réplica
+    with router.read_session(None) as db:
+        assert db.query(User).count() == 0
+
+    # Pasada la ventana de stickiness, o con un instante falso en el futuro, se usa la réplica
+    with router.read_session(last_write - 120) as db:
+        assert db.query(User).count() == 0
+    with router.read_session(last_write + 3600) as db:
+        assert db.query(User).count() == 0
+
+
+def test_without_replicas_reads_use_primary(tmp_path: Path) -> None:
+    primary = _sessionmaker(tmp_path / "primary.db")
+    router = ReadReplicaRouter(primary, [])
+
+    with router.read_session() as db:
+        assert db.get_bind() is primary.kw["bind"]
@@ -0,0 +1,47 @@
+import uuid
+
+import pytest
+from sqlalchemy import Column, MetaData, Table, create_engine, select, text
+
+from app.core.config import settings
+from app.db.utils import UUID, JSONB
+
+
+def _roundtrip():
+    metadata = MetaData()
+    table = Table(
+        "things", metadata,
+        Column("id", UUID, primary_key=True),
+        Column("data", JSONB),
+    )
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+
+    thing_id = uuid.uuid4()
+    payload = {"stats": {"cosmic_luck": 7}, "choices": [1, 2, 3]}
+    with engine.begin() as conn:
+        conn.execute(table.insert().values(id=thing_id, data=payload))
+        row = conn.execute(select(table).where(table.c.id == thing_id)).one()
+        raw = conn.execute(text("SELECT id, json_extract(data, '$.stats.cosmic_luck') FROM things")).one()
+    return thing_id, payload, row, raw
+
+
+def test_uuid_and_json_roundtrip_as_text() -> None:
+    """Por defecto los UUID se guardan como texto y el JSON es consultable con JSON1."""
+    thing_id, payload, row, raw = _roundtrip()
+
+    assert row.id == thing_id
+    assert row.data == payload
+    assert raw[0] == str(thing_id)
+    assert raw[1] == 7
+
+
+def test_uuid_roundtrip_as_binary(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Con SQLITE_BINARY_UUID los UUID se guardan como BLOB de 16 bytes."""
+    # La configuración es inmutable: se cambia el valor sobre la instancia
+    monkeypatch.setitem(settings.__dict__, "SQLITE_BINARY_UUID", True)
+    thing_id, payload, row, raw = _roundtrip()
+
+    assert row.id == thing_id
+    assert row.data == payload
+    assert raw[0] == thing_id.bytes
@@ -0,0 +1,3 @@
+"""
+Tests para los servicios de la aplicación.
+"""
\ No newline at end of file
@@ -0,0 +1,56 @@
+from app.services.rewards import calculate_rewards, compile_reward_rules
+
+
+STEPS = [
+    {
+        "narrative": "Te despiertas en una nave espacial desconocida.",
+        "options": [
+            {"text": "Explorar la nave", "next_step": 1, "rewards": [{"type": "experience", "value": 25}]},
+            {"text": "Volver a dormir", "next_step": 2},
+        ],
+    },
+    {
+        "narrative": "La sala de control tiene un objeto brillante.",
+        "rewards": [{"type": "experience", "value": 50}],
+        "options": [
+            {"text": "Tocar el objeto", "next_step": 2, "artifact_id": "artefacto-1"},
+            {"text": "Ignorarlo", "rewards": [{"type": "experience", "value": -10}, "no es una regla"]},
+        ],
+    },
+    {"narrative": "Fin.", "rewards": [{"type": "experience", "value": 100}], "options": []},
+]
+
+
+def test_compile_reward_rules_indexes_transitions() -> None:
+    """Cada (paso, opción) acumula las recompensas de la opción y del paso de destino."""
+    table = compile_reward_rules(STEPS)
+
+    assert [dict(r) for r in table[(0, 0)]] == [
+        {"type": "experience", "value": 25},
+        {"type": "experience", "value": 50},
+    ]
+    assert [dict(r) for r in table[(0, 1)]] == [{"type": "experience", "value": 100}]
+    assert [dict(r) for r in table[(1, 0)]] == [
+        {"type": "artifact", "id": "artefacto-1"},
+        {"type": "experience", "value": 100},
+    ]
+    # Las reglas inválidas se descartan; sin next_step se pasa al paso siguiente
+    assert [dict(r) for r in table[(1, 1)]] == [{"type": "experience", "value": 100}]
+
+
+def test_calculate_rewards_uses_step_of_the_choice() -> None:
+    """Se recompensa la transición (paso de la elección, opción), no el paso de destino."""
+    table = compile_reward_rules(STEPS)
+
+    assert calculate_rewards(table, step=0, choice=0) == [
+        {"type": "experience", "value": 25},
+        {"type": "experience", "value": 50},
+    ]
+    # La opción 1 del paso 0 lleva al paso 2: no se paga la regla de (1, 1)
+    assert calculate_rewards(table, step=0, choice=1) == [{"type": "experience", "value": 100}]
+    assert calculate_rewards(table, step=1, choice=0)[0] == {"type": "artifact", "id": "artefacto-1"}
+    assert calculate_rewards(table, step=9, choice=0) == []
+
+    rewards = calculate_rewards(table, step=0, choice=0)
+    rewards[0]["value"] = 0
+    assert calculate_rewards(table, step=0, choice=0)[0]["value"] == 25
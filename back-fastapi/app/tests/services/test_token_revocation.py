@@ -0,0 +1,45 @@
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+
+from app.services import token_revocation
+from app.services.token_revocation import RevocationIndex
+
+
+def test_stale_index_rebuilds_once_in_background(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Con el índice caducado se responde con el anterior y se reconstruye una sola vez, en otro hilo."""
+    threads = []
+    release = threading.Event()
+
+    class SlowSession:
+        def __enter__(self):
+            threads.append(threading.current_thread().name)
+            release.wait(timeout=5)
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+    monkeypatch.setattr(
+        token_revocation.refresh_token_repository, "get_revoked_since", lambda db, since: ["new-session"]
+    )
+    index = RevocationIndex(SlowSession, access_token_ttl=timedelta(minutes=15), refresh_seconds=0)
+    index._revoked = frozenset({"old-session"})
+    index._built_at = time.monotonic()
+
+    started = time.monotonic()
+    for _ in range(10):
+        assert index.is_revoked("old-session")
+        assert not index.is_revoked("new-session")
+    # Ninguna comprobación ha esperado a la reconstrucción en curso
+    assert time.monotonic() - started < 1
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while index._revoked != frozenset({"new-session"}) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert index._revoked == frozenset({"new-session"})
+    assert threads == ["revocation-index-rebuild"]
@@ -4,9 +4,11 @@ Script para inicializar la base de datos con los datos actualizados.
 """
 
 import logging
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
-from app.db.session import Base, engine, SessionLocal
+from app.db.bootstrap import prepare_schema
+from app.db.session import engine, SessionLocal
 from app.db.models import *  # Importar todos los modelos
 from app.api.schemas.personality import PersonalityQuestionCreate, PersonalityOptionBase
 from app.db.repositories.personality import personality_repository
@@ -15,15 +17,19 @@ from app.db.repositories.personality import personality_repository
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def init_db():
+def init_db(db_engine: Engine = engine, session_factory=SessionLocal):
     """
     Inicializa la base de datos con datos de ejemplo.
+    
+    Args:
+        db_engine: Motor de la base de datos.
+        session_factory: Factoría de sesiones.
     """
-    # Crear tablas
-    Base.metadata.create_all(bind=engine)
+    # Crear o migrar el esquema y marcar la revisión de Alembic, igual que al arrancar
+    prepare_schema(db_engine)
     
     # Crear sesión
-    db = SessionLocal()
+    db = session_factory()
     
     try:
         # Limpiar datos existentes
@@ -176,9 +182,9 @@ def init_db():
             )
         ]
         
-        for question_data in questions:
-            question = personality_repository.create(db=db, obj_in=question_data)
-            logger.info(f"Pregunta de personalidad creada: {question.question[:30]}...")
+        # Un único INSERT por lote en lugar de una transacción por pregunta
+        personality_repository.create_many(db=db, objs_in=questions)
+        logger.info(f"Preguntas de personalidad creadas: {len(questions)}")
         
         logger.info("Inicialización de la base de datos completada.")
     finally:
@@ -2,22 +2,59 @@
 Punto de entrada principal para la aplicación FastAPI.
 """
 
+import asyncio
 import uvicorn
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from fastapi.responses import JSONResponse
 
+from app.api.endpoints import metrics as metrics_endpoint
+from app.api.middlewares.cors import CORSMiddleware, cors_policy
+from app.api.middlewares.metrics import MetricsMiddleware
 from app.api.router import router as api_router
 from app.core.config import settings
-from app.db.session import SessionLocal
-from app.db.init_db import init_db
+from app.core.logging import setup_logging
+from app.db.bootstrap import bootstrap_database
+from app.db.session import SessionLocal, engine
+from app.services.runtime_config import runtime_config
+from app.services.warmup import warm_caches
 
-# Configurar logging
+# Configurar logging (cola + JSON, niveles por módulo desde la configuración)
+setup_logging()
 logger = logging.getLogger("cosmic-chaos")
-logging.basicConfig(level=logging.INFO)
+
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """
+    Arranque y parada de la aplicación.
+    
+    Al arrancar prepara la base de datos (comprobación de la revisión de
+    Alembic y datos iniciales, bajo un lock entre workers), precarga las
+    cachés en paralelo y lanza la comprobación periódica de la configuración en
+    caliente. Al parar la detiene y cierra las conexiones del pool.
+    """
+    await asyncio.to_thread(bootstrap_database)
+    await warm_caches()
+    runtime_config_poller = asyncio.create_task(runtime_config.poll(SessionLocal))
+    
+    # Mostrar la URL de la aplicación
+    port = 8000
+    logger.info("="*60)
+    logger.info(f"🚀 Cosmic Chaos Adventure API está funcionando en:")
+    logger.info(f"🌐 http://localhost:{port}")
+    logger.info(f"🌐 http://localhost:{port}/docs - Documentación Swagger")
+    logger.info(f"🌐 http://localhost:{port}/redoc - Documentación ReDoc")
+    logger.info(f"🔍 La base de datos está utilizando: {'SQLite' if settings.USE_SQLITE else 'PostgreSQL'}")
+    logger.info("="*60)
+    
+    yield
+    
+    runtime_config_poller.cancel()
+    engine.dispose()
+
 
 def create_application() -> FastAPI:
     """
@@ -26,31 +63,17 @@ def create_application() -> FastAPI:
     application = FastAPI(
         title=settings.APP_NAME,
         version=settings.APP_VERSION,
-        debug=settings.DEBUG
-    )
-    
-    # Configurar CORS - con opciones más permisivas para desarrollo
-    application.add_middleware(
-        CORSMiddleware,
-        allow_origins=["*"],  # Permitir todos los orígenes
-        allow_credentials=True,
-        allow_methods=["*"],  # Permitir todos los métodos
-        allow_headers=["*"],  # Permitir todos los headers
-        expose_headers=["*"],  # Exponer todos los headers en la respuesta
-        max_age=86400,       # Tiempo de caché para preflight
+        debug=settings.DEBUG,
+        lifespan=lifespan,
     )
     
-    # Middleware para añadir explicitamente headers CORS en cada respuesta (para ngrok)
-    @application.middleware("http")
-    async def add_cors_headers(request: Request, call_next):
-        response = await call_next(request)
-        response.headers["Access-Control-Allow-Origin"] = "*"
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-        response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
-        return response
+    # Configurar CORS (orígenes y cabeceras desde la configuración)
+    application.add_middleware(CORSMiddleware, policy=cors_policy)
+    # Métricas por ruta (el último middleware añadido es el más externo)
+    application.add_middleware(MetricsMiddleware)
     
-    # Middleware para manejar excepciones y añadir headers CORS
+    # Manejador de excepciones no controladas. Su respuesta se envía por fuera de
+    # la pila de middlewares, así que las cabeceras CORS se añaden aquí
     @application.exception_handler(Exception)
     async def global_exception_handler(request: Request, exc: Exception):
         logger.error(f"Error no manejado: {str(exc)}")
@@ -58,12 +81,13 @@ def create_application() -> FastAPI:
             status_code=500,
             content={"detail": "Error interno del servidor"}
         )
-        response.headers["Access-Control-Allow-Origin"] = "*"
-        response.headers["Access-Control-Allow-Credentials"] = "true"
+        cors_policy.apply(response, request.headers.get("origin"))
         return response
     
     # Incluir routers
     application.include_router(api_router, prefix=settings.API_PREFIX)
+    # Métricas en formato Prometheus, fuera del prefijo de la API
+    application.include_router(metrics_endpoint.router, tags=["metrics"])
     
     @application.get("/")
     async def root():
@@ -85,28 +109,6 @@ def create_application() -> FastAPI:
 
 app = create_application()
 
-# Inicializar la base de datos con datos de ejemplo
-@app.on_event("startup")
-async def startup_db_client():
-    """
-    Inicializa la base de datos al iniciar la aplicación.
-    """
-    db = SessionLocal()
-    try:
-        init_db(db)
-        # Mostrar la URL de la aplicación
-        host = "0.0.0.0"
-        port = 8000
-        logger.info("="*60)
-        logger.info(f"🚀 Cosmic Chaos Adventure API está funcionando en:")
-        logger.info(f"🌐 http://localhost:{port}")
-        logger.info(f"🌐 http://localhost:{port}/docs - Documentación Swagger")
-        logger.info(f"🌐 http://localhost:{port}/redoc - Documentación ReDoc")
-        logger.info(f"🔍 La base de datos está utilizando: {'SQLite' if settings.USE_SQLITE else 'PostgreSQL'}")
-        logger.info("="*60)
-    finally:
-        db.close()
-
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
     
\ No newline at end of file
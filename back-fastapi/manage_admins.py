@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+Script para conceder o retirar permisos de administrador.
+
+Los permisos de administrador no se pueden asignar desde la API; se gestionan
+desde aquí, con acceso directo a la base de datos:
+
+    python manage_admins.py grant admin@example.com
+    python manage_admins.py revoke admin@example.com
+    python manage_admins.py list
+"""
+
+import argparse
+import logging
+import sys
+
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.db.repositories.user import user_repository
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Gestiona los administradores de Cosmic Chaos")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command in ("grant", "revoke"):
+        subparser = subparsers.add_parser(command)
+        subparser.add_argument("email")
+    subparsers.add_parser("list")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "list":
+            for user in db.query(User).filter(User.is_admin.is_(True)).order_by(User.email):
+                print(user.email)
+            return 0
+
+        user = user_repository.set_admin(db, email=args.email, is_admin=args.command == "grant")
+        if user is None:
+            logger.error(f"No existe ningún usuario con el email {args.email}")
+            return 1
+        # Los workers en marcha pueden tener el usuario en caché hasta USER_CACHE_TTL_SECONDS
+        logger.info(f"{user.email}: is_admin={user.is_admin}")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+"""
+Servidor de producción con varios workers (pre-fork).
+
+El proceso maestro abre el socket de escucha y lanza N workers con fork; todos
+aceptan conexiones del mismo socket. Con --preload la aplicación se importa en
+el maestro antes del fork, de modo que los workers comparten su memoria
+(copy-on-write) y arrancan más rápido.
+
+Al recibir SIGTERM o SIGINT el maestro lo reenvía a los workers, que dejan de
+aceptar conexiones y terminan las peticiones en curso (hasta
+--graceful-timeout segundos); pasado ese tiempo se les envía SIGKILL. Si un
+worker termina inesperadamente se lanza otro.
+
+Los workers vuelcan sus métricas en un directorio compartido
+(METRICS_MULTIPROCESS_DIR o uno temporal), así que /metrics devuelve las de
+todos ellos lo atienda el worker que lo atienda.
+
+Uso:
+    python serve.py --workers 4 --port 8000
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.core.metrics import metrics
+
+logger = logging.getLogger("cosmic-chaos.serve")
+
+APP_PATH = "main:app"
+
+
+def default_workers() -> int:
+    """Un worker por CPU (la aplicación es asíncrona y el trabajo pesado va a pools)."""
+    return max(1, os.cpu_count() or 1)
+
+
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Servidor de producción de Cosmic Chaos Adventure API")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument(
+        "--workers", type=int, default=settings.SERVER_WORKERS or default_workers(),
+        help="Número de workers (por defecto, uno por CPU)",
+    )
+    parser.add_argument(
+        "--backlog", type=int, default=settings.SERVER_BACKLOG,
+        help="Conexiones pendientes de aceptar en el socket de escucha",
+    )
+    parser.add_argument(
+        "--keep-alive", type=int, default=settings.SERVER_KEEP_ALIVE_SECONDS,
+        help="Segundos que se mantiene abierta una conexión inactiva",
+    )
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        help="Segundos para terminar las peticiones en curso al parar",
+    )
+    parser.add_argument(
+        "--preload", action=argparse.BooleanOptionalAction, default=settings.SERVER_PRELOAD,
+        help="Importar la aplicación en el maestro antes del fork",
+    )
+    return parser.parse_args(argv)
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """
+    Abre el socket de escucha compartido por los workers.
+
+    Args:
+        host: Dirección de escucha.
+        port: Puerto.
+        backlog: Tamaño de la cola de conexiones pendientes.
+
+    Returns:
+        El socket, ya en escucha y heredable por los workers.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def after_fork_in_child() -> None:
+    """
+    Reinicia en el worker el estado que no puede compartirse con el maestro.
+
+    Las conexiones del pool de SQLAlchemy se descartan sin cerrarlas (siguen
+    siendo del maestro), el hilo del logging no existe tras el fork y la
+    conexión SQLite del limitador de login es por proceso.
+    """
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(sig, signal.SIG_DFL)
+    setup_logging()
+
+    from app.core.rate_limit import login_rate_limiter
+    from app.db.session import engine, read_router
+
+    engine.dispose(close=False)
+    for replica in read_router.replicas:
+        replica.kw["bind"].dispose(close=False)
+    if hasattr(login_rate_limiter.store, "_local"):
+        login_rate_limiter.store._local.__dict__.clear()
+
+
+def build_config(args: argparse.Namespace, app) -> uvicorn.Config:
+    """
+    Configuración de uvicorn para un worker.
+
+    Usa uvloop y httptools si están instalados.
+    """
+    return uvicorn.Config(
+        app,
+        loop="uvloop" if _has_module("uvloop") else "asyncio",
+        http="httptools" if _has_module("httptools") else "h11",
+        lifespan="on",
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        backlog=args.backlog,
+        proxy_headers=True,
+        server_header=False,
+        access_log=False,
+        log_config=None,
+    )
+
+
+def run_worker(args: argparse.Namespace, sock: socket.socket, app) -> None:
+    """Ejecuta un worker de uvicorn sobre el socket compartido (no retorna)."""
+    after_fork_in_child()
+    server = uvicorn.Server(build_config(args, app))
+    code = 0
+    try:
+        server.run(sockets=[sock])
+    except BaseException:
+        logger.exception("El worker %s ha terminado con un error", os.getpid())
+        code = 1
+    finally:
+        try:
+            metrics.flush()
+        except OSError:
+            logger.warning("No se han podido volcar las métricas del worker %s", os.getpid())
+        logging.shutdown()
+        os._exit(code)
+
+
+class Arbiter:
+    """Proceso maestro: lanza los workers, los reemplaza y reenvía las señales."""
+
+    def __init__(self, args: argparse.Namespace, sock: socket.socket, app):
+        self.args = args
+        self.sock = sock
+        self.app = app
+        self.workers: Dict[int, float] = {}
+        self.stop_signal: Optional[int] = None
+        self.stopping_since: Optional[float] = None
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.args, self.sock, self.app)
+        self.workers[pid] = time.monotonic()
+
+    def handle_stop(self, signum, frame) -> None:
+        # Solo se anota la señal: loguear desde el manejador podría bloquearse
+        # si la señal llega mientras el hilo principal tiene tomado el lock del log
+        self.stop_signal = signum
+
+    def stop(self) -> None:
+        logger.info("Señal %s recibida: parando %d workers", self.stop_signal, len(self.workers))
+        self.stopping_since = time.monotonic()
+        self.signal_workers(signal.SIGTERM)
+
+    def signal_workers(self, signum: int) -> None:
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+
+    def reap(self) -> None:
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            started_at = self.workers.pop(pid, None)
+            if started_at is None or self.stop_signal is not None:
+                continue
+            logger.warning("El worker %s ha terminado (estado %s); lanzando otro", pid, status)
+            # Evitar un bucle de reinicios si el worker falla al arrancar
+            if time.monotonic() - started_at < 1:
+                time.sleep(1)
+            self.spawn()
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+        for _ in range(self.args.workers):
+            self.spawn()
+        logger.info(
+            "Escuchando en %s:%s con %d workers (pid maestro %s)",
+            self.args.host, self.args.port, self.args.workers, os.getpid(),
+        )
+
+        while self.workers:
+            if self.stop_signal is not None and self.stopping_since is None:
+                self.stop()
+            self.reap()
+            if self.stopping_since is not None:
+                if time.monotonic() - self.stopping_since > self.args.graceful_timeout + 5:
+                    logger.warning("Workers sin terminar tras el tiempo de gracia: SIGKILL")
+                    self.signal_workers(signal.SIGKILL)
+            time.sleep(0.2)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    setup_logging()
+
+    if args.preload:
+        from main import app
+    else:
+        app = APP_PATH
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+
+    if args.workers <= 1 or not hasattr(os, "fork"):
+        # Un solo proceso: uvicorn gestiona las señales directamente
+        server = uvicorn.Server(build_config(args, app))
+        server.run(sockets=[sock])
+        return
+
+    # Los workers suman sus métricas a través de un directorio compartido
+    metrics_dir = settings.METRICS_MULTIPROCESS_DIR or tempfile.mkdtemp(prefix="cosmic-chaos-metrics-")
+    metrics.enable_multiprocess(metrics_dir)
+    try:
+        Arbiter(args, sock, app).run()
+    finally:
+        if not settings.METRICS_MULTIPROCESS_DIR:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())